@@ -1,30 +1,40 @@
 import os
-import hashlib
 import platform
+import queue
+import threading
 import tkinter
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import Tk, filedialog, Label, Button, ttk, messagebox, font, simpledialog
-from openpyxl import load_workbook
 from datetime import datetime
-from PyPDF2 import PdfReader
-from PIL import Image
-from PIL.ExifTags import TAGS
-from tkcalendar import DateEntry
-from docx import Document
-from docx.opc.coreprops import CoreProperties
 import tkinter as tk
-from tkinter import ttk
-from Foundation import NSDate, NSFileManager, NSURL
-from win32_setctime import setctime
-from openpyxl.packaging.core import DocumentProperties
-from dateutil import parser as date_parser
-import pytz
+from ooxml_props import (read_core_properties, write_core_properties, next_revision, CorePropertiesError,
+                         CORE_PROPERTIES, DATE_PROPERTIES)
+from metadata_core import get_metadata, calculate_hash, compare_to_industry_standards, UnsupportedFileError
+from scanner import scan_tree, ScanStats
+from results_view import ResultsView
+from timestamps import set_file_times
+from tracing import span
+from audit_log import recording
+
+# Scan records handed to the results view per update
+SCAN_EMIT_BATCH = 256
+
+# Table values that leave a property unchanged when saving
+UNSET_VALUES = ('', 'None', None)
+
+# What display_metadata put in the table, so on_save only writes what was edited
+displayed_values = {}
+
+
+class TaskCancelled(Exception):
+    """Raised inside a background task when the user presses Cancel."""
 
 
 class ProgressDialog:
-    def __init__(self, parent, title="Processing"):
+    def __init__(self, parent, title="Processing", on_cancel=None):
         self.top = tk.Toplevel(parent)
         self.top.title(title)
-        self.top.geometry("300x100")
+        self.top.geometry("300x130")
         self.top.transient(parent)
         self.top.grab_set()
 
@@ -34,19 +44,124 @@ class ProgressDialog:
         self.label = ttk.Label(self.top, text="Please wait...")
         self.label.pack()
 
+        if on_cancel is not None:
+            self.cancel_button = ttk.Button(self.top, text="Cancel", command=on_cancel)
+            self.cancel_button.pack(pady=5)
+            self.top.protocol("WM_DELETE_WINDOW", on_cancel)
+
     def start(self):
         self.progress.start()
 
+    def update_progress(self, done, total, text=None):
+        """Switch to a determinate bar showing done out of total."""
+        if str(self.progress['mode']) != 'determinate':
+            self.progress.stop()
+            self.progress.configure(mode='determinate')
+        self.progress.configure(maximum=max(total, 1), value=min(done, total))
+        if text:
+            self.label.config(text=text)
+
     def stop(self):
         self.progress.stop()
         self.top.destroy()
 
+
+class BackgroundTask:
+    """Run work on the worker executor and hand its progress and result back to Tk.
+
+    work is called on a worker thread with this task as its only argument;
+    it reports through set_total/advance/set_stage, may hand partial results
+    to on_batch through emit, and must not touch any widget. Messages travel
+    through a queue that root.after polls on the main thread, where
+    on_done(result) or on_error(exception) is finally called.
+    """
+    POLL_MS = 50
+
+    def __init__(self, parent, title, work, on_done, on_error, on_batch=None):
+        self.parent = parent
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_batch = on_batch
+        self.messages = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.done = 0
+        self.total = 0
+        self.stage = None
+        self.dialog = ProgressDialog(parent, title, on_cancel=self.cancel)
+        self.dialog.start()
+        executor.submit(self._run, work)
+        parent.after(self.POLL_MS, self._poll)
+
+    def cancel(self):
+        self.cancel_event.set()
+        self.dialog.label.config(text="Cancelling...")
+
+    def set_total(self, total):
+        self.done = 0
+        self.total = total
+
+    def set_stage(self, text):
+        self.stage = text
+        self._check_cancelled()
+        self.messages.put(('progress', self.done, self.total, text))
+
+    def advance(self, n):
+        """Count n more bytes (or files) as processed; raises TaskCancelled once cancelled."""
+        self._check_cancelled()
+        self.done += n
+        self.messages.put(('progress', self.done, self.total, self.stage))
+
+    def emit(self, items):
+        """Send a batch of partial results to on_batch on the main thread."""
+        self._check_cancelled()
+        self.messages.put(('batch', items))
+
+    def _check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise TaskCancelled()
+
+    def _run(self, work):
+        try:
+            self.messages.put(('done', work(self)))
+        except Exception as e:
+            self.messages.put(('error', e))
+
+    def _poll(self):
+        progress = None
+        while True:
+            try:
+                message = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] == 'progress':
+                # Only the latest progress matters; skip the ones in between
+                progress = message
+                continue
+            if message[0] == 'batch':
+                self.on_batch(message[1])
+                continue
+            self.dialog.stop()
+            if message[0] == 'done':
+                self.on_done(message[1])
+            else:
+                self.on_error(message[1])
+            return
+        if progress is not None:
+            _, done, total, text = progress
+            if total:
+                self.dialog.update_progress(done, total, text)
+            elif text:
+                self.dialog.label.config(text=text)
+        self.parent.after(self.POLL_MS, self._poll)
+
+
 class DateTimeDialog(simpledialog.Dialog):
     def __init__(self, parent, title, initial_date=None):
         self.initial_date = initial_date or datetime.now()
         super().__init__(parent, title)
 
     def body(self, master):
+        from tkcalendar import DateEntry
         self.calendar = DateEntry(master, width=12, background='darkblue',
                                   foreground='white', borderwidth=2, date_pattern='y-mm-dd',
                                   year=self.initial_date.year, month=self.initial_date.month, day=self.initial_date.day)
@@ -72,7 +187,10 @@ class DateTimeDialog(simpledialog.Dialog):
         minute = int(self.minute.get())
         self.result = datetime(date.year, date.month, date.day, hour, minute)
 
+
 def parse_date(date_string):
+    from dateutil import parser as date_parser
+    import pytz
     try:
         # Parse the date string, forcing it to UTC
         parsed_date = date_parser.parse(date_string)
@@ -86,144 +204,94 @@ def parse_date(date_string):
         # If parsing fails, return None
         return None
 
-def get_excel_metadata(file_path):
-    """Retrieve metadata from an Excel file."""
-    wb = load_workbook(file_path)
-    metadata = wb.properties
-    
-    metadata_dict = {
-        'Title': metadata.title,
-        'Subject': metadata.subject,
-        'Creator': metadata.creator,
-        'Keywords': metadata.keywords,
-        'Description': metadata.description,
-        'Last Modified By': metadata.lastModifiedBy,
-        'Revision': metadata.revision,
-        'Created': metadata.created,
-        'Modified': metadata.modified,
-        'Category': metadata.category,
-        'Content Status': metadata.contentStatus,
-        'Language': metadata.language,
-        'Identifier': metadata.identifier
-    }
-    
-    return metadata_dict
-
-def get_pdf_metadata(file_path):
-    """Retrieve metadata from a PDF file."""
-    with open(file_path, 'rb') as f:
-        reader = PdfReader(f)
-        metadata = reader.metadata
-    
-    metadata_dict = {key[1:]: value for key, value in metadata.items()}
-    return metadata_dict
-
-def get_image_metadata(file_path):
-    """Retrieve metadata from an image file."""
-    image = Image.open(file_path)
-    info = image._getexif()
-    
-    metadata_dict = {TAGS.get(tag): value for tag, value in info.items()} if info else {}
-    return metadata_dict
-
-def get_docx_metadata(file_path):
-    """Retrieve metadata from a DOCX file."""
-    doc = Document(file_path)
-    core_props = doc.core_properties
-    
-    metadata_dict = {
-        'Title': core_props.title,
-        'Subject': core_props.subject,
-        'Creator': core_props.author,
-        'Keywords': core_props.keywords,
-        'Description': core_props.comments,
-        'Last Modified By': core_props.last_modified_by,
-        'Revision': core_props.revision,
-        'Created': core_props.created,
-        'Modified': core_props.modified,
-        'Category': core_props.category,
-        'Content Status': core_props.content_status,
-        'Language': core_props.language,
-        'Identifier': core_props.identifier
-    }
-    
-    return metadata_dict
 
 def update_file_system_dates(file_path, created, modified):
-    """Update file system creation and modification dates to match file metadata."""
-    if modified:
-        os.utime(file_path, (modified.timestamp(), modified.timestamp()))
-    
-    if created:
-        if platform.system() == 'Darwin':  # macOS
-            try:
-                from Foundation import NSDate, NSFileManager, NSURL
-            except ImportError:
-                pass  # Handle the case when pyobjc is not installed
-        elif platform.system() == 'Windows':
-            try:
-                from win32_setctime import setctime
-            except ImportError:
-                pass  # Handle the case when win32-setctime is not installed
-
-def calculate_hash(file_path, algorithm='sha256'):
-    """Calculate and return the hash of the file."""
-    hash_func = hashlib.new(algorithm)
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(4096), b''):
-            hash_func.update(chunk)
-    return hash_func.hexdigest()
-
-def compare_to_industry_standards(metadata):
-    """Compare metadata to industry standards and identify potential issues."""
-    issues = {}
-    if metadata.get('Creator') is None:
-        issues['Creator'] = 'Missing creator'
-    if metadata.get('Revision') is None or not str(metadata['Revision']).isdigit():
-        issues['Revision'] = 'Invalid revision number'
-    
-    return issues
+    """Update file system creation and modification dates to match file metadata (naive dates are UTC)."""
+    return set_file_times(file_path, created, modified)
+
 
 def display_metadata(metadata, issues):
     """Display metadata in a table with potential issues."""
-    for item in tree.get_children():
-        tree.delete(item)
+    tree.delete(*tree.get_children())
+    displayed_values.clear()
     for key, value in metadata.items():
-        print(f"Displaying metadata: {key} = {value}")  # Debug print
-        tree.insert("", "end", values=(key, str(value), issues.get(key, '')))
-    
-    # Debug print of all treeview items
-    print("All treeview items:")
-    for item in tree.get_children():
-        print(tree.item(item, 'values'))
+        text = '' if value is None else str(value)
+        displayed_values[key] = text
+        tree.insert("", "end", values=(key, text, issues.get(key, '')))
+
+
+def edited_values(displayed, current):
+    """Return the table values the user changed; '' and 'None' mean leave the property as it is."""
+    return {key: value for key, value in current.items()
+            if value != displayed.get(key) and value not in UNSET_VALUES}
+
 
 def on_select_file():
-    try:
-        file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx"), ("PDF files", "*.pdf"), ("Image files", "*.jpg *.jpeg *.png *.gif"), ("Word files", "*.docx")])
-        if not file_path:
-            messagebox.showwarning("No Selection", "No file was selected.")
-            return
+    file_path = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx"), ("PDF files", "*.pdf"), ("Image files", "*.jpg *.jpeg *.png *.gif"), ("Word files", "*.docx"), ("PowerPoint files", "*.pptx")])
+    if not file_path:
+        messagebox.showwarning("No Selection", "No file was selected.")
+        return
 
-        if file_path.endswith('.xlsx'):
-            metadata = get_excel_metadata(file_path)
-        elif file_path.endswith('.pdf'):
-            metadata = get_pdf_metadata(file_path)
-        elif file_path.lower().endswith(('.jpg', '.jpeg', '.png', '.gif')):
-            metadata = get_image_metadata(file_path)
-        elif file_path.endswith('.docx'):
-            metadata = get_docx_metadata(file_path)
-        else:
-            messagebox.showerror("Unsupported File", "The selected file type is not supported.")
-            return
+    def work(task):
+        task.set_stage("Reading metadata...")
+        metadata = get_metadata(file_path)
+        return metadata, compare_to_industry_standards(metadata)
 
-        issues = compare_to_industry_standards(metadata)
+    def on_done(result):
+        global selected_file
+        metadata, issues = result
         display_metadata(metadata, issues)
         file_label.config(text=f"Selected file: {file_path}")
-        global selected_file
+        hash_label.config(text="File Hash (SHA-256): N/A")
         selected_file = file_path
 
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred while selecting the file: {str(e)}")
+    def on_error(e):
+        if isinstance(e, UnsupportedFileError):
+            messagebox.showerror("Unsupported File", "The selected file type is not supported.")
+        elif not isinstance(e, TaskCancelled):
+            messagebox.showerror("Error", f"An error occurred while selecting the file: {str(e)}")
+
+    BackgroundTask(root, "Reading Metadata", work, on_done, on_error)
+
+
+def on_scan_folder():
+    folder = filedialog.askdirectory()
+    if not folder:
+        return
+    results_view.clear()
+
+    def work(task):
+        stats = ScanStats()
+        batch = []
+        task.set_stage("Scanning...")
+        for record in scan_tree(folder, stats=stats):
+            batch.append(record)
+            if len(batch) >= SCAN_EMIT_BATCH:
+                task.emit(batch)
+                task.set_stage(f"Scanned {stats.files} files...")
+                batch = []
+        if batch:
+            task.emit(batch)
+        return stats
+
+    def on_done(stats):
+        file_label.config(text=f"Scanned {folder}: {stats.files} files, {stats.errors} errors "
+                               f"in {stats.elapsed:.1f}s ({stats.files_per_second:.0f} files/s)")
+
+    def on_error(e):
+        if not isinstance(e, TaskCancelled):
+            messagebox.showerror("Error", f"An error occurred while scanning the folder: {str(e)}")
+
+    BackgroundTask(root, "Scanning Folder", work, on_done, on_error, on_batch=results_view.add_records)
+
+
+def on_select_result(record):
+    """Show the metadata of a file picked in the results view."""
+    global selected_file
+    display_metadata(record.metadata(), record.issues_dict())
+    file_label.config(text=f"Selected file: {record.path}")
+    hash_label.config(text="File Hash (SHA-256): N/A")
+    selected_file = record.path
 
 
 def on_double_click(event):
@@ -274,177 +342,255 @@ def on_double_click(event):
             root.after(100, entry_edit.focus_force)
 
 
-def on_save():
-    progress = ProgressDialog(root, "Saving Metadata")
-    progress.start()
-    root.update()
+def core_property_updates(new_metadata, revision, created, modified):
+    """Build the core.xml changes for on_save from the edited table values."""
+    updates = {key: value for key, value in new_metadata.items()
+               if key in CORE_PROPERTIES and key not in DATE_PROPERTIES}
+    if revision is not None:
+        updates['Revision'] = revision
+    if created:
+        updates['Created'] = created
+    if modified:
+        updates['Modified'] = modified
+    return updates
+
+
+def save_workbook_properties(file_path, new_metadata, revision, created, modified):
+    """Save metadata by re-serializing the whole workbook (fallback for on_save)."""
+    from openpyxl import load_workbook
+    from openpyxl.packaging.core import DocumentProperties
+    with span('parse', file_path):
+        wb = load_workbook(file_path)
     
+    # Create a new DocumentProperties object
+    new_props = DocumentProperties()
+    
+    # Update all properties
+    new_props.title = new_metadata.get('Title', wb.properties.title)
+    new_props.subject = new_metadata.get('Subject', wb.properties.subject)
+    new_props.creator = new_metadata.get('Creator', wb.properties.creator)
+    new_props.keywords = new_metadata.get('Keywords', wb.properties.keywords)
+    new_props.description = new_metadata.get('Description', wb.properties.description)
+    new_props.lastModifiedBy = new_metadata.get('Last Modified By', wb.properties.lastModifiedBy)
+    new_props.revision = revision if revision is not None else next_revision(wb.properties.revision)
+    new_props.category = new_metadata.get('Category', wb.properties.category)
+    new_props.contentStatus = new_metadata.get('Content Status', wb.properties.contentStatus)
+    new_props.language = new_metadata.get('Language', wb.properties.language)
+    new_props.identifier = new_metadata.get('Identifier', wb.properties.identifier)
+    if created:
+        new_props.created = created
+    if modified:
+        new_props.modified = modified
+    
+    # Assign the new properties to the workbook
+    wb.properties = new_props
+    with span('serialize', file_path):
+        wb.save(file_path)
+
+
+def save_document_properties(file_path, new_metadata, revision, created, modified):
+    """Save metadata by re-serializing the whole document (fallback for on_save)."""
+    from docx import Document
+    with span('parse', file_path):
+        doc = Document(file_path)
+    core_props = doc.core_properties
+    
+    core_props.title = new_metadata.get('Title', core_props.title)
+    core_props.subject = new_metadata.get('Subject', core_props.subject)
+    core_props.author = new_metadata.get('Creator', core_props.author)
+    core_props.keywords = new_metadata.get('Keywords', core_props.keywords)
+    core_props.comments = new_metadata.get('Description', core_props.comments)
+    core_props.last_modified_by = new_metadata.get('Last Modified By', core_props.last_modified_by)
+    if revision is not None:
+        core_props.revision = revision
+    core_props.category = new_metadata.get('Category', core_props.category)
+    core_props.content_status = new_metadata.get('Content Status', core_props.content_status)
+    core_props.language = new_metadata.get('Language', core_props.language)
+    core_props.identifier = new_metadata.get('Identifier', core_props.identifier)
+    if created:
+        core_props.created = created
+    if modified:
+        core_props.modified = modified
+    
+    with span('serialize', file_path):
+        doc.save(file_path)
+
+
+def save_metadata(file_path, new_metadata, task):
+    """Write the edited metadata, sync the file dates and hash the result.
+
+    Runs on a worker thread; progress is reported in bytes through task,
+    for hashing the original (for the audit log), the copy made by the
+    OOXML writer and then the hash of the result.
+    """
+    if not file_path.endswith(('.xlsx', '.docx')):
+        raise UnsupportedFileError("Saving metadata is only supported for Excel and Word files in this version.")
+    new_metadata = {key: value for key, value in new_metadata.items() if value not in UNSET_VALUES}
+
+    with span('save', file_path):
+        size = os.path.getsize(file_path)
+        task.set_total(size)
+        task.set_stage("Recording original state...")
+        with recording(file_path, 'gui', progress=task.advance) as change:
+            change['sha256'] = _write_metadata(file_path, new_metadata, task, size)
+        return change['sha256']
+
+
+def _write_metadata(file_path, new_metadata, task, size):
+    task.set_total(size * 2)
+
+    if file_path.endswith('.xlsx'):
+        created = new_metadata.get('Created')
+        modified = new_metadata.get('Modified')
+
+        if created:
+            try:
+                created = datetime.strptime(created, "%Y-%m-%d %H:%M:%S")
+            except ValueError as e:
+                raise ValueError(f"Incorrect date format for 'Created': {e}") from e
+
+        if modified:
+            try:
+                modified = datetime.strptime(modified, "%Y-%m-%d %H:%M:%S")
+            except ValueError as e:
+                raise ValueError(f"Incorrect date format for 'Modified': {e}") from e
+
+        # An edited revision is written as typed; otherwise it counts up, as in set_excel_metadata and bulk_edit
+        revision = new_metadata.get('Revision')
+        if revision is None:
+            try:
+                revision = next_revision(read_core_properties(file_path)['Revision'])
+            except CorePropertiesError:
+                pass  # save_workbook_properties counts it up from the workbook
+
+        task.set_stage("Saving metadata...")
+        try:
+            write_core_properties(file_path, core_property_updates(new_metadata, revision, created, modified),
+                                  progress=task.advance)
+        except CorePropertiesError:
+            save_workbook_properties(file_path, new_metadata, revision, created, modified)
+
+    else:
+        # Handle revision number
+        revision = new_metadata.get('Revision')
+        if revision is not None:
+            revision = int(revision) if revision.isdigit() else 0
+
+        # Handle dates
+        created = parse_date(new_metadata['Created']) if 'Created' in new_metadata else None
+        modified = parse_date(new_metadata['Modified']) if 'Modified' in new_metadata else None
+
+        task.set_stage("Saving metadata...")
+        try:
+            write_core_properties(file_path, core_property_updates(new_metadata, revision, created, modified),
+                                  progress=task.advance)
+        except CorePropertiesError:
+            save_document_properties(file_path, new_metadata, revision, created, modified)
+
+    task.set_stage("Updating file dates...")
+    update_file_system_dates(file_path, created, modified)
+
+    task.set_total(os.path.getsize(file_path))
+    task.set_stage("Calculating hash...")
+    return calculate_hash(file_path, progress=task.advance)
+
+
+def on_save():
     if not selected_file:
         messagebox.showerror("Error", "No file selected")
-        progress.stop()
         return
 
-    new_metadata = {}
+    current = {}
     for child in tree.get_children():
         key = tree.item(child, 'values')[0]
         value = tree.item(child, 'values')[1]
-        new_metadata[key] = value
-    
-    try:
-        if selected_file.endswith('.xlsx'):
-            wb = load_workbook(selected_file)
-            
-            # Create a new DocumentProperties object
-            new_props = DocumentProperties()
-            
-            # Update all properties
-            new_props.title = new_metadata.get('Title', wb.properties.title)
-            new_props.subject = new_metadata.get('Subject', wb.properties.subject)
-            new_props.creator = new_metadata.get('Creator', wb.properties.creator)
-            new_props.keywords = new_metadata.get('Keywords', wb.properties.keywords)
-            new_props.description = new_metadata.get('Description', wb.properties.description)
-            new_props.lastModifiedBy = new_metadata.get('Last Modified By', wb.properties.lastModifiedBy)
-            
-            # Update revision number
-            revision = new_metadata.get('Revision', '0')
-            new_props.revision = str(int(revision)) if revision.isdigit() else '0'
-            
-            new_props.category = new_metadata.get('Category', wb.properties.category)
-            new_props.contentStatus = new_metadata.get('Content Status', wb.properties.contentStatus)
-            new_props.language = new_metadata.get('Language', wb.properties.language)
-            new_props.identifier = new_metadata.get('Identifier', wb.properties.identifier)
-            
-            created = new_metadata.get('Created')
-            modified = new_metadata.get('Modified')
-
-            if created:
-                try:
-                    created = datetime.strptime(created, "%Y-%m-%d %H:%M:%S")
-                    new_props.created = created
-                except ValueError as e:
-                    messagebox.showerror("Error", f"Incorrect date format for 'Created': {e}")
-                    progress.stop()
-                    return
-
-            if modified:
-                try:
-                    modified = datetime.strptime(modified, "%Y-%m-%d %H:%M:%S")
-                    new_props.modified = modified
-                except ValueError as e:
-                    messagebox.showerror("Error", f"Incorrect date format for 'Modified': {e}")
-                    progress.stop()
-                    return
-            
-            # Assign the new properties to the workbook
-            wb.properties = new_props
-            
-            wb.save(selected_file)
-            
-            update_file_system_dates(selected_file, created, modified)
-
-        elif selected_file.endswith('.docx'):
-            doc = Document(selected_file)
-            core_props = doc.core_properties
-            
-            core_props.title = new_metadata.get('Title', core_props.title)
-            core_props.subject = new_metadata.get('Subject', core_props.subject)
-            core_props.author = new_metadata.get('Creator', core_props.author)
-            core_props.keywords = new_metadata.get('Keywords', core_props.keywords)
-            core_props.comments = new_metadata.get('Description', core_props.comments)
-            core_props.last_modified_by = new_metadata.get('Last Modified By', core_props.last_modified_by)
-            
-            # Handle revision number
-            revision = new_metadata.get('Revision', '0')
-            core_props.revision = int(revision) if revision.isdigit() else 0
-            
-            core_props.category = new_metadata.get('Category', core_props.category)
-            core_props.content_status = new_metadata.get('Content Status', core_props.content_status)
-            core_props.language = new_metadata.get('Language', core_props.language)
-            core_props.identifier = new_metadata.get('Identifier', core_props.identifier)
-            
-            # Handle dates
-            created = parse_date(new_metadata.get('Created'))
-            modified = parse_date(new_metadata.get('Modified'))
-
-            if created:
-                core_props.created = created
-            if modified:
-                core_props.modified = modified
-            
-            doc.save(selected_file)
-            
-            update_file_system_dates(selected_file, created, modified)
-            
-        else:
-            messagebox.showerror("Unsupported File", "Saving metadata is only supported for Excel and Word files in this version.")
-            progress.stop()
-            return
+        current[key] = value
+    new_metadata = edited_values(displayed_values, current)
 
-        file_hash = calculate_hash(selected_file)
+    def on_done(file_hash):
         hash_label.config(text=f"File Hash (SHA-256): {file_hash}")
-
-        progress.stop()
         messagebox.showinfo("Success", "File metadata updated successfully")
-    except Exception as e:
-        progress.stop()
-        messagebox.showerror("Error", f"An error occurred while saving the metadata: {str(e)}")
-        print(f"Error details: {e}")
-
-# GUI setup
-root = Tk()
-root.title("Forensic Audit Tool")
-root.geometry("800x600")
-
-# Mac-specific adjustments
-if platform.system() == 'Darwin':  # Darwin is the system name for macOS
-    try:
-        from tkmacosx import Button as MacButton
-        Button = MacButton  # Use tkmacosx Button if available
-    except ImportError:
-        pass  # Fall back to standard tkinter Button if tkmacosx is not installed
-    
-    # Adjust font size for better readability on Mac
-    default_font = font.nametofont("TkDefaultFont")
-    default_font.configure(size=12)
-    root.option_add("*Font", default_font)
 
-    # Try to set native macOS appearance
-    try:
-        root.tk.call('::tk::unsupported::MacWindowStyle', 'useTheme', 'true')
-    except tkinter.TclError:
-        pass  # Ignore if the command is not available
-
-selected_file = None
-
-# File selection
-file_label = Label(root, text="No file selected")
-file_label.pack(pady=10)
-select_button = Button(root, text="Select File", command=on_select_file)
-select_button.pack(pady=10)
-
-# Metadata table
-style = ttk.Style()
-style.configure("Treeview", rowheight=25)  # Adjust row height for better touch/click targets
-
-columns = ('Property', 'Value', 'Issues')
-tree = ttk.Treeview(root, columns=columns, show='headings', selectmode='browse')
-tree.heading('Property', text='Property')
-tree.heading('Value', text='Value')
-tree.heading('Issues', text='Issues')
-tree.column('Property', width=150)
-tree.column('Value', width=300)
-tree.column('Issues', width=200)
-tree.pack(pady=20, fill='both', expand=True)
-
-# Bind the double click event to the handler
-tree.bind('<Double-1>', on_double_click)
-
-# Save button
-save_button = Button(root, text="Save Changes", command=on_save)
-save_button.pack(pady=10)
-
-# Hash label
-hash_label = Label(root, text="File Hash (SHA-256): N/A")
-hash_label.pack(pady=10)
-
-root.mainloop()
\ No newline at end of file
+    def on_error(e):
+        if isinstance(e, TaskCancelled):
+            messagebox.showwarning("Cancelled", "The operation was cancelled before it finished.")
+        elif isinstance(e, UnsupportedFileError):
+            messagebox.showerror("Unsupported File", str(e))
+        else:
+            messagebox.showerror("Error", f"An error occurred while saving the metadata: {str(e)}")
+
+    file_path = selected_file
+    BackgroundTask(root, "Saving Metadata", lambda task: save_metadata(file_path, new_metadata, task),
+                   on_done, on_error)
+
+
+# The guard keeps worker processes started by the scanner from opening windows
+if __name__ == '__main__':
+    # File I/O, parsing, saving and hashing run here, never on the Tk main thread
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    # GUI setup
+    root = Tk()
+    root.title("Forensic Audit Tool")
+    root.geometry("1000x800")
+
+    # Mac-specific adjustments
+    if platform.system() == 'Darwin':  # Darwin is the system name for macOS
+        try:
+            from tkmacosx import Button as MacButton
+            Button = MacButton  # Use tkmacosx Button if available
+        except ImportError:
+            pass  # Fall back to standard tkinter Button if tkmacosx is not installed
+
+        # Adjust font size for better readability on Mac
+        default_font = font.nametofont("TkDefaultFont")
+        default_font.configure(size=12)
+        root.option_add("*Font", default_font)
+
+        # Try to set native macOS appearance
+        try:
+            root.tk.call('::tk::unsupported::MacWindowStyle', 'useTheme', 'true')
+        except tkinter.TclError:
+            pass  # Ignore if the command is not available
+
+    selected_file = None
+
+    # File selection
+    file_label = Label(root, text="No file selected")
+    file_label.pack(pady=10)
+    select_button = Button(root, text="Select File", command=on_select_file)
+    select_button.pack(pady=10)
+    scan_button = Button(root, text="Scan Folder", command=on_scan_folder)
+    scan_button.pack(pady=(0, 10))
+
+    # Metadata table
+    style = ttk.Style()
+    style.configure("Treeview", rowheight=25)  # Adjust row height for better touch/click targets
+
+    # Results of a folder scan, one row per file
+    results_view = ResultsView(root, on_activate=on_select_result)
+    results_view.pack(padx=10, fill='both', expand=True)
+
+    columns = ('Property', 'Value', 'Issues')
+    tree = ttk.Treeview(root, columns=columns, show='headings', selectmode='browse')
+    tree.heading('Property', text='Property')
+    tree.heading('Value', text='Value')
+    tree.heading('Issues', text='Issues')
+    tree.column('Property', width=150)
+    tree.column('Value', width=300)
+    tree.column('Issues', width=200)
+    tree.pack(pady=20, fill='both', expand=True)
+
+    # Bind the double click event to the handler
+    tree.bind('<Double-1>', on_double_click)
+
+    # Save button
+    save_button = Button(root, text="Save Changes", command=on_save)
+    save_button.pack(pady=10)
+
+    # Hash label
+    hash_label = Label(root, text="File Hash (SHA-256): N/A")
+    hash_label.pack(pady=10)
+
+    root.mainloop()
+    executor.shutdown(wait=False, cancel_futures=True)
\ No newline at end of file
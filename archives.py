@@ -0,0 +1,197 @@
+"""Read metadata from the documents inside zip and tar archives without extracting them.
+
+Each member is read once, in chunks: the chunks are hashed as they go past
+and written to a spool that stays in memory up to SPOOL_SIZE and moves to
+a temporary file beyond that, so memory stays bounded however large the
+member is. Metadata is then read from the spool, which the format readers
+accept like any seekable file. Tar archives (plain, gzip, bzip2 or xz) are
+read as a stream, member by member; archives inside archives (a zip inside
+a .tar.gz, say) are recursed into up to --max-depth levels. OOXML
+documents are zips too, but are read as documents rather than opened as
+archives.
+
+A member's path is the archive path and the member name joined by '!/',
+e.g. evidence.tar.gz!/mail/attachments.zip!/report.docx. Nested archives
+get a record of their own (with digests, but no metadata) after their
+members.
+
+Usage: python archives.py ARCHIVE [ARCHIVE ...] [--max-depth N] [--all] [--algorithms sha256,md5]
+                          [--output FILE.csv|.jsonl|.parquet]
+"""
+import argparse
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+from metadata_core import get_metadata, compare_to_industry_standards, SUPPORTED_EXTENSIONS
+from timestamps import to_ns
+import tracing
+
+SEPARATOR = '!/'
+
+ZIP_EXTENSIONS = ('.zip',)
+TAR_EXTENSIONS = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+ARCHIVE_EXTENSIONS = ZIP_EXTENSIONS + TAR_EXTENSIONS
+
+DEFAULT_ALGORITHMS = ('sha256',)
+DEFAULT_MAX_DEPTH = 3
+
+# Members up to this size are spooled in memory; larger ones go to a temporary file
+SPOOL_SIZE = 16 * 1024 * 1024
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def is_archive(name):
+    """Return True if name has a zip or tar extension this module opens."""
+    return name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def _zip_mtime_ns(info):
+    """A zip member's time as UTC nanoseconds, or None when its DOS date is not a real date (e.g. all zeros)."""
+    try:
+        # Zip stores the local wall-clock time of the machine that wrote it; take it as this machine's
+        return to_ns(datetime.datetime(*info.date_time).astimezone())
+    except (ValueError, OverflowError):
+        return None
+
+
+def _zip_members(source):
+    with zipfile.ZipFile(source) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            yield info.filename, info.file_size, _zip_mtime_ns(info), lambda info=info: zf.open(info)
+
+
+def _tar_members(source):
+    # 'r|*' reads the archive strictly front to back, so a compressed tar is
+    # decompressed once, as a stream, and nothing has to be seekable
+    if hasattr(source, 'read'):
+        tf = tarfile.open(fileobj=source, mode='r|*')
+    else:
+        tf = tarfile.open(source, mode='r|*')
+    with tf:
+        for member in tf:
+            if not member.isfile():
+                continue
+            yield member.name, member.size, int(member.mtime) * 1000000000, \
+                lambda member=member: tf.extractfile(member)
+
+
+def iter_members(source, name=None):
+    """Yield (member name, size, mtime_ns, open) for every file in a zip or tar archive.
+
+    source is a path or a binary file; name (default: source) decides
+    between zip and tar. open() returns the member's stream and, for tar,
+    must be called before the next member is taken.
+    """
+    name = name if name is not None else source
+    if name.lower().endswith(ZIP_EXTENSIONS) or (not hasattr(source, 'read') and zipfile.is_zipfile(source)):
+        return _zip_members(source)
+    return _tar_members(source)
+
+
+@contextlib.contextmanager
+def spool_member(stream, path, algorithms=DEFAULT_ALGORITHMS):
+    """Copy stream into a bounded spool while hashing it; yields (spool, {algorithm: hexdigest})."""
+    hashers = [hashlib.new(algorithm) for algorithm in algorithms]
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+        with tracing.span('hash', path) as s:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                for hasher in hashers:
+                    hasher.update(chunk)
+                spool.write(chunk)
+                s.add_bytes(len(chunk))
+        spool.seek(0)
+        yield spool, {algorithm: hasher.hexdigest() for algorithm, hasher in zip(algorithms, hashers)}
+
+
+def _scan_members(source, name, algorithms, max_depth, all_members, depth):
+    for member, size, mtime_ns, open_member in iter_members(source, name):
+        path = name + SEPARATOR + member
+        nested = depth < max_depth and is_archive(member)
+        readable = os.path.splitext(member)[1].lower() in SUPPORTED_EXTENSIONS
+        if not (nested or readable or all_members):
+            continue
+        start = time.perf_counter()
+        record = {'path': path, 'size': size, 'mtime_ns': mtime_ns, 'metadata': None, 'issues': {}, 'error': None,
+                  'digests': {}}
+        try:
+            with open_member() as stream, spool_member(stream, path, algorithms) as (spool, digests):
+                record['digests'] = digests
+                if nested:
+                    yield from _scan_members(spool, path, algorithms, max_depth, all_members, depth + 1)
+                elif readable:
+                    metadata = get_metadata(path, fileobj=spool)
+                    record['metadata'] = metadata
+                    record['issues'] = compare_to_industry_standards(metadata)
+        except Exception as e:
+            record['error'] = f"{type(e).__name__}: {e}"
+        record['elapsed'] = time.perf_counter() - start
+        yield record
+
+
+def scan_archive(source, name=None, algorithms=DEFAULT_ALGORITHMS, max_depth=DEFAULT_MAX_DEPTH, all_members=False):
+    """Yield a scan record for every supported document in an archive, nested archives included.
+
+    Records have the scanner's keys (path, size, mtime_ns, metadata, issues,
+    error) plus the member's digests. With all_members, files of other types
+    are hashed and listed too. An archive that cannot be read at all yields
+    one record with its error.
+
+    mtime_ns is UTC, like the scanner's. Zip members record local time
+    without a zone, so it is read as this machine's local time; a member
+    with an invalid date gets None.
+    """
+    name = name if name is not None else source
+    try:
+        yield from _scan_members(source, name, algorithms, max_depth, all_members, 0)
+    except Exception as e:
+        yield {'path': name, 'size': None, 'mtime_ns': None, 'metadata': None, 'issues': {},
+               'error': f"{type(e).__name__}: {e}", 'digests': {}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print one JSON record per document inside zip/tar archives.")
+    parser.add_argument('archives', nargs='+')
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH,
+                        help="how many levels of nested archives to open (default: %(default)s)")
+    parser.add_argument('--all', action='store_true', help="also hash and list members of unsupported types")
+    parser.add_argument('--algorithms', default=','.join(DEFAULT_ALGORITHMS),
+                        help="comma-separated digests computed per member (default: %(default)s)")
+    parser.add_argument('--output', metavar='FILE', default=None,
+                        help="write records to a .csv, .jsonl or .parquet file instead of stdout")
+    args = parser.parse_args(argv)
+
+    algorithms = tuple(args.algorithms.split(','))
+    counts = {'members': 0, 'errors': 0}
+
+    def records():
+        for archive in args.archives:
+            for record in scan_archive(archive, algorithms=algorithms, max_depth=args.max_depth,
+                                       all_members=args.all):
+                counts['members'] += 1
+                counts['errors'] += record['error'] is not None
+                yield record
+
+    if args.output:
+        from records import export_records
+        export_records(records(), args.output)
+    else:
+        for record in records():
+            print(json.dumps(record, default=str))
+    print(f"Read {counts['members']} members ({counts['errors']} errors) from {len(args.archives)} archive(s)",
+          file=sys.stderr)
+    return 1 if counts['errors'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""Asyncio facade over the metadata readers, writers and hashing.
+
+    async with AsyncMetadata(concurrency=16) as meta:
+        metadata = await meta.get_metadata('report.docx')
+        async for result in meta.iter_metadata(paths, hash=True):
+            ...
+
+Parsing is CPU-bound and holds the GIL, so readers and writers run in a
+process pool; hashing is I/O plus C code that releases the GIL, so it runs
+in a thread pool. A semaphore bounds how many operations are in flight, and
+iter_metadata only keeps a small window of tasks alive, so an iterator of a
+million paths never turns into a million tasks. Nothing blocking runs on
+the event loop itself.
+
+Cancelling a call removes it from the queue if it has not started. A hash
+that is already running stops at its next chunk; a parse already handed to
+a worker process finishes there and its result is dropped. Writes to the
+same path are serialized. Worker processes are started with 'spawn', so a
+script using this module needs the usual `if __name__ == '__main__':` guard.
+
+The module-level aget_metadata, ahash and aset_metadata share one default
+instance, created on first use.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from metadata_core import calculate_hash, get_metadata, set_metadata
+
+DEFAULT_CONCURRENCY = 8
+
+
+class HashCancelled(Exception):
+    """Raised inside a hashing thread to stop it when its caller was cancelled."""
+
+
+def _hash(file_path, algorithm, cancelled):
+    def progress(_):
+        if cancelled.is_set():
+            raise HashCancelled(file_path)
+    return calculate_hash(file_path, algorithm, progress)
+
+
+class AsyncMetadata:
+    """Bounded-concurrency async access to get_metadata, set_metadata and calculate_hash."""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, process_workers=None, thread_workers=None):
+        self.concurrency = concurrency
+        self.process_workers = process_workers or os.cpu_count() or 1
+        self.thread_workers = thread_workers or min(32, concurrency)
+        self._processes = None
+        self._threads = None
+        self._semaphore = None
+        self._loop = None
+        self._write_locks = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _limit(self):
+        # Created per event loop, so the instance can be built outside one and
+        # outlive an asyncio.run()
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._write_locks = {}
+        return self._semaphore
+
+    def _process_pool(self):
+        if self._processes is None:
+            # spawn rather than fork: forking a process that already runs the
+            # hashing threads and an event loop can deadlock in the child
+            self._processes = ProcessPoolExecutor(self.process_workers,
+                                                  mp_context=multiprocessing.get_context('spawn'))
+        return self._processes
+
+    def _thread_pool(self):
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(self.thread_workers, thread_name_prefix='ahash')
+        return self._threads
+
+    async def get_metadata(self, file_path):
+        """Read a file's metadata in the process pool."""
+        async with self._limit():
+            return await asyncio.get_running_loop().run_in_executor(self._process_pool(), get_metadata, file_path)
+
+    async def set_metadata(self, file_path, new_metadata):
+        """Write metadata in the process pool; concurrent writes to one path run one after another."""
+        key = os.path.abspath(file_path)
+        limit = self._limit()
+        # [lock, number of writes holding or waiting for it]; the entry goes once the last one is done,
+        # so a write arriving while others still wait can never get a lock of its own
+        entry = self._write_locks.get(key)
+        if entry is None:
+            entry = self._write_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0], limit:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self._process_pool(), set_metadata, file_path, new_metadata)
+        finally:
+            entry[1] -= 1
+            if not entry[1] and self._write_locks.get(key) is entry:
+                del self._write_locks[key]
+
+    async def hash(self, file_path, algorithm='sha256'):
+        """Hash a file in the thread pool; cancelling stops the read at the next chunk."""
+        cancelled = threading.Event()
+        async with self._limit():
+            future = asyncio.get_running_loop().run_in_executor(
+                self._thread_pool(), _hash, file_path, algorithm, cancelled)
+            try:
+                return await future
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+    async def _result(self, file_path, hash):
+        result = {'path': file_path, 'metadata': None, 'error': None}
+        if hash:
+            result['sha256'] = None
+        try:
+            if hash:
+                result['metadata'], result['sha256'] = await asyncio.gather(
+                    self.get_metadata(file_path), self.hash(file_path))
+            else:
+                result['metadata'] = await self.get_metadata(file_path)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+        return result
+
+    async def iter_metadata(self, paths, hash=False):
+        """Yield {'path', 'metadata', 'error'} (plus 'sha256' with hash) as each file finishes.
+
+        paths may be a plain or an async iterable. At most twice the
+        concurrency limit of tasks exist at once; leaving the loop early
+        cancels the ones still running.
+        """
+        window = self.concurrency * 2
+        pending = set()
+        try:
+            async for file_path in _aiter(paths):
+                pending.add(asyncio.ensure_future(self._result(file_path, hash)))
+                if len(pending) >= window:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def close(self):
+        """Shut the pools down without blocking the event loop."""
+        pools = [pool for pool in (self._processes, self._threads) if pool is not None]
+        self._processes = self._threads = None
+        loop = asyncio.get_running_loop()
+        for pool in pools:
+            await loop.run_in_executor(None, lambda pool=pool: pool.shutdown(cancel_futures=True))
+
+
+async def _aiter(iterable):
+    if hasattr(iterable, '__aiter__'):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+_default = None
+
+
+def _default_instance():
+    global _default
+    if _default is None:
+        _default = AsyncMetadata()
+    return _default
+
+
+async def aget_metadata(file_path):
+    return await _default_instance().get_metadata(file_path)
+
+
+async def aset_metadata(file_path, new_metadata):
+    return await _default_instance().set_metadata(file_path, new_metadata)
+
+
+async def ahash(file_path, algorithm='sha256'):
+    return await _default_instance().hash(file_path, algorithm)
+
+
+def aiter_metadata(paths, hash=False):
+    return _default_instance().iter_metadata(paths, hash)
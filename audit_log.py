@@ -0,0 +1,498 @@
+"""Append-only, hash-chained log of every metadata write, with indexed queries.
+
+Each write appends one entry: the path, when, by whom and through what
+(source), the properties that changed ({property: [old, new]}), and the
+SHA-256, size and mtime of the file before and after. An entry holds the
+hash of the entry before it and its own hash over its canonical JSON, so
+editing, removing or reordering any entry breaks the chain; verify()
+walks it. Recording head() somewhere else (case notes, a ticket) also
+makes truncating the log detectable.
+
+Entries are JSON lines in numbered segment files that are only ever
+appended to and roll over at SEGMENT_SIZE. A SQLite index next to them
+maps path, property and time to entries and keeps each property's old and
+new value, so queries such as every change to Creator never read the
+segments. The index is derived data: after a crash between appending and
+indexing it catches up from the segments on the next write, and
+--rebuild-index recreates it from scratch.
+
+Writes are logged to ~/.metatool/audit unless METADATA_AUDIT_LOG names
+another directory, or is 'off' to turn logging off (each logged write
+hashes and reads the file before and after).
+
+Usage: python audit_log.py [--log DIR] [--path FILE | --under DIR] [--property NAME] [--since T] [--until T]
+                           [--limit N] [--json]
+       python audit_log.py [--log DIR] --verify [--head SEQ:HASH]
+       python audit_log.py [--log DIR] --rebuild-index
+"""
+import argparse
+import contextlib
+import datetime
+import getpass
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from hashing import hash_file
+from metadata_cache import encode_value, decode_hook
+from timestamps import to_ns, from_ns
+
+DEFAULT_LOG_DIR = os.path.join(os.path.expanduser('~'), '.metatool', 'audit')
+AUDIT_ENV = 'METADATA_AUDIT_LOG'
+
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+# prev of the first entry
+GENESIS = '0' * 64
+
+# One decoder for every value; json.loads with an object_hook builds a new one per call
+_decode = json.JSONDecoder(object_hook=decode_hook).decode
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS paths (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS properties (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS entries (
+    seq INTEGER PRIMARY KEY,
+    time_ns INTEGER NOT NULL,
+    path_id INTEGER NOT NULL,
+    segment INTEGER NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    hash TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_path ON entries (path_id, seq);
+CREATE INDEX IF NOT EXISTS entries_time ON entries (time_ns);
+CREATE TABLE IF NOT EXISTS changes (
+    property_id INTEGER NOT NULL,
+    seq INTEGER NOT NULL,
+    old TEXT,
+    new TEXT,
+    PRIMARY KEY (property_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS changes_seq ON changes (seq);
+"""
+
+
+class AuditLogError(Exception):
+    """Raised when an entry does not continue the hash chain."""
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+
+def entry_hash(entry):
+    """Return the SHA-256 of an encoded entry's canonical JSON, leaving out its own 'hash'."""
+    body = {key: value for key, value in entry.items() if key != 'hash'}
+    return hashlib.sha256(_canonical(body).encode('utf-8')).hexdigest()
+
+
+def diff_metadata(old, new):
+    """Return {property: [old, new]} (JSON-safe) for every property whose value differs."""
+    old, new = encode_value(old or {}), encode_value(new or {})
+    return {key: [old.get(key), new.get(key)] for key in sorted(set(old) | set(new))
+            if old.get(key) != new.get(key)}
+
+
+def _identity(file_path):
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def snapshot(file_path, sha256=None, progress=None):
+    """Return the state logged for a file: metadata, sha256, size and mtime_ns.
+
+    Pass sha256 when the caller has just hashed the file, to save a read.
+    """
+    from metadata_core import get_metadata
+    st = os.stat(file_path)
+    if sha256 is None:
+        sha256 = hash_file(file_path, ('sha256',), progress)['sha256']
+    return {'metadata': get_metadata(file_path), 'sha256': sha256, 'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns, 'identity': (st.st_ino, st.st_size, st.st_mtime_ns)}
+
+
+def _user():
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return None
+
+
+class AuditLog:
+    """Segmented, hash-chained change log in a directory, with a SQLite index beside it.
+
+    Safe to share between threads; several processes may append to the
+    same directory, since each append holds the index's write lock.
+    """
+
+    def __init__(self, directory=DEFAULT_LOG_DIR, segment_size=SEGMENT_SIZE):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.segment_size = segment_size
+        self._lock = threading.Lock()
+        self._ids = {}
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _segment_path(self, segment):
+        return os.path.join(self.directory, f"{segment:08d}.log")
+
+    def _tip(self):
+        """(seq, hash, segment, end offset) of the last indexed entry."""
+        row = self._conn.execute(
+            'SELECT seq, hash, segment, offset + length FROM entries ORDER BY seq DESC LIMIT 1').fetchone()
+        return row if row is not None else (0, GENESIS, 1, 0)
+
+    def _id(self, table, column, value):
+        key = (table, value)
+        row_id = self._ids.get(key)
+        if row_id is None:
+            row = self._conn.execute(f'SELECT id FROM {table} WHERE {column} = ?', (value,)).fetchone()
+            if row is None:
+                row_id = self._conn.execute(f'INSERT INTO {table} ({column}) VALUES (?)', (value,)).lastrowid
+            else:
+                row_id = row[0]
+            self._ids[key] = row_id
+        return row_id
+
+    def _index(self, entry, segment, offset, length):
+        self._conn.execute('INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                           (entry['seq'], entry['time_ns'], self._id('paths', 'path', entry['path']),
+                            segment, offset, length, entry['hash']))
+        self._conn.executemany('INSERT INTO changes VALUES (?, ?, ?, ?)', [
+            (self._id('properties', 'name', name), entry['seq'], _canonical(old), _canonical(new))
+            for name, (old, new) in entry['changes'].items()])
+
+    def _catch_up(self):
+        """Index entries that reached the segments but not the index; drop a torn final line."""
+        seq, prev, segment, end = self._tip()
+        while True:
+            segment_path = self._segment_path(segment)
+            if os.path.exists(segment_path) and os.path.getsize(segment_path) > end:
+                with open(segment_path, 'rb+') as f:
+                    f.seek(end)
+                    for line in f:
+                        if not line.endswith(b'\n'):
+                            # Half-written when the writer died; it was never acknowledged
+                            f.truncate(end)
+                            break
+                        entry = json.loads(line)
+                        _check(entry, seq, prev)
+                        self._index(entry, segment, end, len(line))
+                        seq, prev, end = entry['seq'], entry['hash'], end + len(line)
+            if not os.path.exists(self._segment_path(segment + 1)):
+                return seq, prev, segment, end
+            segment, end = segment + 1, 0
+
+    def append_many(self, changes, time_ns=None):
+        """Append one entry per (file_path, before, after, source) and return the entries.
+
+        before and after are snapshot() dicts. All entries are written with
+        one fsync and indexed in one transaction.
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            # Another process may have rebuilt the index, renumbering paths and properties
+            self._ids.clear()
+            try:
+                entries = self._append(changes, time_ns)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return entries
+
+    def append(self, file_path, before, after, source=None, time_ns=None):
+        """Append the change from before to after (snapshot() dicts) and return the entry."""
+        return self.append_many([(file_path, before, after, source)], time_ns)[0]
+
+    def _append(self, changes, time_ns):
+        seq, prev, segment, end = self._catch_up()
+        user = _user()
+        entries = []
+        f = open(self._segment_path(segment), 'ab')
+        try:
+            for file_path, before, after, source in changes:
+                if end >= self.segment_size:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+                    segment, end = segment + 1, 0
+                    f = open(self._segment_path(segment), 'ab')
+                entry = {
+                    'seq': seq + 1,
+                    'time_ns': time_ns if time_ns is not None else time.time_ns(),
+                    'path': os.path.abspath(file_path),
+                    'source': source,
+                    'user': user,
+                    'changes': diff_metadata(before['metadata'], after['metadata']),
+                    'sha256_before': before['sha256'],
+                    'sha256_after': after['sha256'],
+                    'size_before': before['size'],
+                    'size_after': after['size'],
+                    'mtime_ns_before': before['mtime_ns'],
+                    'mtime_ns_after': after['mtime_ns'],
+                    'prev': prev,
+                }
+                entry['hash'] = entry_hash(entry)
+                line = (_canonical(entry) + '\n').encode('utf-8')
+                f.write(line)
+                self._index(entry, segment, end, len(line))
+                seq, prev, end = entry['seq'], entry['hash'], end + len(line)
+                entries.append(entry)
+            f.flush()
+            os.fsync(f.fileno())
+        finally:
+            f.close()
+        return entries
+
+    def head(self):
+        """Return (seq, hash) of the newest entry; (0, GENESIS) for an empty log."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                seq, prev, _, _ = self._catch_up()
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return seq, prev
+
+    def entry(self, seq):
+        """Return the full entry with sequence number seq, read from its segment."""
+        row = self._conn.execute('SELECT segment, offset, length FROM entries WHERE seq = ?', (seq,)).fetchone()
+        if row is None:
+            raise KeyError(seq)
+        with open(self._segment_path(row[0]), 'rb') as f:
+            f.seek(row[1])
+            return _decode(f.read(row[2]).decode('utf-8'))
+
+    def changes(self, path=None, under=None, prop=None, since=None, until=None, limit=None):
+        """Yield {seq, time_ns, path, property, old, new} per changed property, oldest first.
+
+        Filters: an exact path or every path under a directory, one property
+        name, and a time range (datetimes, naive as UTC, or nanoseconds).
+        Answered from the index alone.
+        """
+        where, params = [], []
+        if path is not None:
+            where.append('e.path_id = (SELECT id FROM paths WHERE path = ?)')
+            params.append(os.path.abspath(path))
+        if under is not None:
+            prefix = os.path.join(os.path.abspath(under), '')
+            # Resolved to path ids first, so the search runs on the paths and entries_path indexes
+            where.append('e.path_id IN (SELECT id FROM paths WHERE path >= ? AND path < ?)')
+            params += [prefix, prefix + '\U0010ffff']
+        if prop is not None:
+            # With a path filter, '+' keeps SQLite from walking every change to the property instead
+            column = 'c.property_id' if path is None and under is None else '+c.property_id'
+            where.append(f'{column} = (SELECT id FROM properties WHERE name = ?)')
+            params.append(prop)
+        for bound, op in ((since, '>='), (until, '<')):
+            if bound is not None:
+                where.append(f'e.time_ns {op} ?')
+                params.append(bound if isinstance(bound, int) else to_ns(bound))
+        sql = ('SELECT c.seq, e.time_ns, p.path, r.name, c.old, c.new FROM changes c '
+               'JOIN entries e ON e.seq = c.seq JOIN paths p ON p.id = e.path_id '
+               'JOIN properties r ON r.id = c.property_id')
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY c.seq'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        for seq, time_ns, file_path, name, old, new in self._conn.execute(sql, params):
+            yield {'seq': seq, 'time_ns': time_ns, 'path': file_path, 'property': name,
+                   'old': _decode(old), 'new': _decode(new)}
+
+    def iter_entries(self):
+        """Yield every entry in the segments, oldest first, as stored (dates still encoded)."""
+        segment = 1
+        while os.path.exists(self._segment_path(segment)):
+            with open(self._segment_path(segment), 'rb') as f:
+                for line in f:
+                    if line.endswith(b'\n'):
+                        yield json.loads(line)
+            segment += 1
+
+    def verify(self, head=None):
+        """Check the whole chain and that the index agrees with it; returns the (seq, hash) head.
+
+        With head=(seq, hash), also checks that entry seq still has that
+        hash, which catches a log truncated back past it. Raises
+        AuditLogError at the first entry that does not check out.
+        """
+        seq, prev = 0, GENESIS
+        # Index rows run from seq 1 without gaps, possibly lagging behind the segments
+        indexed = self._conn.execute('SELECT seq, hash FROM entries ORDER BY seq')
+        for entry in self.iter_entries():
+            _check(entry, seq, prev)
+            row = next(indexed, None)
+            if row is not None and row != (entry['seq'], entry['hash']):
+                raise AuditLogError(f"Entry {entry['seq']} does not match its index row; rebuild the index")
+            if head is not None and entry['seq'] == head[0] and entry['hash'] != head[1]:
+                raise AuditLogError(f"Entry {head[0]} has hash {entry['hash']}, expected {head[1]}")
+            seq, prev = entry['seq'], entry['hash']
+        if head is not None and seq < head[0]:
+            raise AuditLogError(f"Log ends at entry {seq}, before the recorded head {head[0]}")
+        if next(indexed, None) is not None:
+            raise AuditLogError(f"Index has entries beyond the last one in the segments ({seq})")
+        return seq, prev
+
+    def rebuild_index(self):
+        """Recreate the index from the segments; returns the number of entries indexed."""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                for table in ('changes', 'entries', 'paths', 'properties'):
+                    self._conn.execute(f'DELETE FROM {table}')
+                self._ids.clear()
+                seq = self._catch_up()[0]
+                self._conn.execute('COMMIT')
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+        return seq
+
+
+def _check(entry, seq, prev):
+    if entry.get('seq') != seq + 1:
+        raise AuditLogError(f"Entry {entry.get('seq')} follows entry {seq}")
+    if entry.get('prev') != prev:
+        raise AuditLogError(f"Entry {entry['seq']} does not chain to entry {seq}")
+    if entry_hash(entry) != entry.get('hash'):
+        raise AuditLogError(f"Entry {entry['seq']} has been altered")
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def _env_directory():
+    """The log directory: METADATA_AUDIT_LOG if set, else DEFAULT_LOG_DIR; None when it is 'off'."""
+    directory = os.environ.get(AUDIT_ENV) or DEFAULT_LOG_DIR
+    return None if directory == 'off' else directory
+
+
+def default_log():
+    """Return the process-wide AuditLog, or None when METADATA_AUDIT_LOG is 'off'."""
+    global _default
+    directory = _env_directory()
+    if directory is None:
+        return None
+    with _default_lock:
+        if _default is None or _default.directory != directory:
+            _default = AuditLog(directory)
+        return _default
+
+
+@contextlib.contextmanager
+def recording(file_path, source, log=None, progress=None):
+    """Log the metadata write made inside the with block.
+
+    The file's metadata and hash are taken on entry (progress sees the
+    bytes hashed) and again on exit. The block may set 'sha256' in the
+    yielded dict when it has hashed the written file itself. If the block
+    fails after the file was already replaced, the change is still logged
+    before the error propagates.
+    """
+    log = log if log is not None else default_log()
+    if log is None:
+        yield {}
+        return
+    before = snapshot(file_path, progress=progress)
+    after = {}
+    try:
+        yield after
+    except BaseException:
+        if _identity(file_path) not in (None, before['identity']):
+            log.append(file_path, before, snapshot(file_path), source)
+        raise
+    log.append(file_path, before, snapshot(file_path, after.get('sha256')), source)
+
+
+def _parse_time(text):
+    return to_ns(datetime.datetime.fromisoformat(text))
+
+
+def _format_value(value):
+    return value.isoformat(sep=' ') if isinstance(value, datetime.datetime) else repr(value)
+
+
+def _format_change(change):
+    when = from_ns(change['time_ns']).isoformat(sep=' ', timespec='seconds')
+    return (f"{change['seq']:>8} {when} {change['path']}  {change['property']}: "
+            f"{_format_value(change['old'])} -> {_format_value(change['new'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query and verify the metadata change log.")
+    parser.add_argument('--log', metavar='DIR', default=_env_directory() or DEFAULT_LOG_DIR,
+                        help="log directory (default: %(default)s)")
+    parser.add_argument('--path', help="changes to this file only")
+    parser.add_argument('--under', metavar='DIR', help="changes to files under DIR only")
+    parser.add_argument('--property', help="changes to this property only, e.g. Creator")
+    parser.add_argument('--since', type=_parse_time, help="ISO date/time (UTC unless it has an offset)")
+    parser.add_argument('--until', type=_parse_time)
+    parser.add_argument('--limit', type=int, default=None)
+    parser.add_argument('--json', action='store_true', help="print one JSON change per line")
+    parser.add_argument('--verify', action='store_true', help="check the hash chain and the index")
+    parser.add_argument('--head', metavar='SEQ:HASH', help="with --verify, a head recorded earlier")
+    parser.add_argument('--rebuild-index', action='store_true', help="recreate the index from the segments")
+    args = parser.parse_args(argv)
+
+    with AuditLog(args.log) as log:
+        if args.rebuild_index:
+            print(f"Indexed {log.rebuild_index()} entries")
+            return 0
+        if args.verify:
+            head = None
+            if args.head:
+                seq, _, digest = args.head.partition(':')
+                head = (int(seq), digest)
+            try:
+                seq, digest = log.verify(head)
+            except AuditLogError as e:
+                print(f"FAILED: {e}", file=sys.stderr)
+                return 1
+            print(f"OK: {seq} entries, head {seq}:{digest}")
+            return 0
+
+        start = time.perf_counter()
+        count = 0
+        for change in log.changes(args.path, args.under, args.property, args.since, args.until, args.limit):
+            count += 1
+            print(json.dumps(change, default=str) if args.json else _format_change(change))
+        print(f"{count} changes in {(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
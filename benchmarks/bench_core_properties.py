@@ -0,0 +1,73 @@
+"""Compare the zip-level core properties reader with the full openpyxl/python-docx loaders.
+
+Usage: python benchmarks/bench_core_properties.py [FILE ...] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ooxml_props import read_core_properties
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FILES = [
+    os.path.join(REPO_ROOT, 'Timesheet record CSCIL.xlsx'),
+    os.path.join(REPO_ROOT, 'Project TVI Planning Notes.docx'),
+]
+
+
+def full_loader(file_path):
+    """Return the loader the tool used before the zip-level reader, or None if unavailable."""
+    try:
+        if file_path.endswith('.xlsx'):
+            from openpyxl import load_workbook
+            return lambda path: load_workbook(path).properties
+        if file_path.endswith('.docx'):
+            from docx import Document
+            return lambda path: Document(path).core_properties
+    except ImportError:
+        pass
+    return None
+
+
+def measure(func, file_path, repeat):
+    """Return (best seconds, peak traced bytes) over repeat runs."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(file_path)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func(file_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='*', default=DEFAULT_FILES)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'file':40} {'reader':8} {'best ms':>10} {'peak KiB':>10}")
+    for file_path in args.files:
+        name = os.path.basename(file_path)[:40]
+        fast_time, fast_peak = measure(read_core_properties, file_path, args.repeat)
+        print(f"{name:40} {'zip':8} {fast_time * 1000:10.2f} {fast_peak / 1024:10.1f}")
+
+        loader = full_loader(file_path)
+        if loader is None:
+            print(f"{name:40} {'full':8} {'n/a (loader not installed)':>21}")
+            continue
+        full_time, full_peak = measure(loader, file_path, args.repeat)
+        print(f"{name:40} {'full':8} {full_time * 1000:10.2f} {full_peak / 1024:10.1f}"
+              f"  ({full_time / fast_time:.0f}x slower)")
+
+
+if __name__ == '__main__':
+    main()
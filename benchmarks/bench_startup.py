@@ -0,0 +1,74 @@
+"""Measure cold-start cost of the headless CLI and check it stays under target.
+
+Runs `python cli.py show FILE` in fresh interpreters and reports the best
+and median wall time, the time the interpreter alone needs, and whether any
+heavy GUI/parser module got imported on the way. Exits non-zero when the
+overhead above a bare interpreter exceeds --target-ms.
+
+Usage: python benchmarks/bench_startup.py [FILE] [--runs N] [--target-ms MS]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FILE = os.path.join(REPO_ROOT, 'Timesheet record CSCIL.xlsx')
+
+# Modules that must not be imported just to read OOXML core properties
+HEAVY_MODULES = ('tkinter', 'openpyxl', 'docx', 'PyPDF2', 'PIL', 'numpy', 'pandas')
+
+DEFAULT_TARGET_MS = 100
+
+
+def time_command(command, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), statistics.median(timings)
+
+
+def heavy_imports(file_path):
+    probe = (
+        "import sys, cli\n"
+        f"cli.main(['show', {file_path!r}])\n"
+        f"print('HEAVY:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, '-c', probe], cwd=REPO_ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    line = [line for line in output.splitlines() if line.startswith('HEAVY:')][-1]
+    return [name for name in line[len('HEAVY:'):].split(',') if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('file', nargs='?', default=DEFAULT_FILE)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--target-ms', type=float, default=DEFAULT_TARGET_MS,
+                        help="allowed startup overhead above a bare interpreter (default: %(default)s)")
+    args = parser.parse_args()
+
+    bare_best, bare_median = time_command([sys.executable, '-c', 'pass'], args.runs)
+    cli_best, cli_median = time_command([sys.executable, 'cli.py', 'show', args.file], args.runs)
+    overhead = cli_median - bare_median
+
+    print(f"bare interpreter   best {bare_best:7.1f} ms   median {bare_median:7.1f} ms")
+    print(f"cli.py show        best {cli_best:7.1f} ms   median {cli_median:7.1f} ms")
+    print(f"overhead           {overhead:7.1f} ms (target {args.target_ms:.0f} ms)")
+
+    heavy = heavy_imports(args.file)
+    if heavy:
+        print(f"heavy modules imported: {', '.join(heavy)}")
+
+    if overhead > args.target_ms or heavy:
+        print("FAIL")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,286 @@
+"""Throughput and peak memory of every reader, writer, hash and scan over a synthetic corpus.
+
+Builds the corpus with benchmarks/corpus.py (or reuses --corpus DIR), then
+runs each case in a fresh interpreter so its peak RSS is its own. Cases
+that modify a file work on a fresh copy per repeat; the copy is not timed.
+Results are written as JSON. --compare checks a run against a saved
+baseline and exits non-zero when any case got slower or bigger by more
+than --threshold.
+
+Usage: python benchmarks/bench_suite.py [--tiers small,medium] [--repeat N] [--output RESULTS.json]
+       python benchmarks/bench_suite.py --compare BASELINE.json [--against RESULTS.json] [--threshold 0.15]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_THRESHOLD = 0.15
+
+# Timing noise below this is ignored when comparing, however large in relative terms
+MIN_SECONDS = 0.002
+
+
+class _Task:
+    """Stands in for the GUI's Task so save_metadata can run headless."""
+
+    def set_total(self, total):
+        pass
+
+    def set_stage(self, stage):
+        pass
+
+    def advance(self, amount):
+        pass
+
+
+NEW_METADATA = {'Title': 'Benchmark Title', 'Creator': 'Bench Runner', 'Keywords': 'bench, suite',
+                'Last Modified By': 'Bench Runner'}
+
+
+def _save_metadata(file_path):
+    """The GUI's on_save path: write properties, sync file dates, hash the result."""
+    from MetaToolGui import save_metadata
+    metadata = dict(NEW_METADATA, Revision='7', Created='2020-01-02 03:04:05', Modified='2021-01-02 03:04:05')
+    return save_metadata(file_path, metadata, _Task())
+
+
+# Case name -> (file kinds it runs on, whether it modifies the file)
+CASES = {
+    'read.get_metadata': (corpus.KINDS, False),
+    'read.get_excel_metadata': (('xlsx',), False),
+    'read.get_docx_metadata': (('docx',), False),
+    'read.get_pdf_metadata': (('pdf',), False),
+    'read.get_image_metadata': (('png', 'jpg'), False),
+    'read.read_core_properties': (('xlsx', 'docx'), False),
+    'write.set_excel_metadata': (('xlsx',), True),
+    'write.write_core_properties': (('xlsx', 'docx'), True),
+    'write.save_metadata': (('xlsx', 'docx'), True),
+    'hash.calculate_hash': (corpus.KINDS, False),
+    'hash.hash_file': (corpus.KINDS, False),
+}
+
+
+def _case_function(name):
+    """Return the callable for a case; imports happen in the case's own process."""
+    import metadata_core
+    if name.startswith('read.get_'):
+        return getattr(metadata_core, name.split('.', 1)[1])
+    if name == 'read.read_core_properties':
+        from ooxml_props import read_core_properties
+        return read_core_properties
+    if name == 'write.set_excel_metadata':
+        from excel_metadata import set_excel_metadata
+        return lambda path: set_excel_metadata(path, NEW_METADATA)
+    if name == 'write.write_core_properties':
+        from ooxml_props import write_core_properties
+        return lambda path: write_core_properties(path, NEW_METADATA)
+    if name == 'write.save_metadata':
+        return _save_metadata
+    if name == 'hash.calculate_hash':
+        return metadata_core.calculate_hash
+    if name == 'hash.hash_file':
+        from hashing import hash_file
+        return hash_file
+    raise ValueError(f"Unknown benchmark case {name!r}")
+
+
+def _scan(directory, tier):
+    from scanner import scan_tree
+    return sum(1 for _ in scan_tree(directory, include=[f"{tier}.*"], workers=1))
+
+
+def _max_rss_bytes():
+    """Peak resident set size of this process and its finished children, in bytes."""
+    import resource
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    try:
+        # Linux keeps ru_maxrss across exec, so a child would report its parent's peak;
+        # VmHWM belongs to this process image only
+        with open('/proc/self/status') as f:
+            own = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+    except (OSError, StopIteration):
+        own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    scale = 1 if sys.platform == 'darwin' else 1024  # ru_maxrss is KiB on Linux, bytes on macOS
+    return max(own, children) * scale
+
+
+def run_case(name, target, repeat):
+    """Run one case in this process; returns {'times': [...], 'rss_before': bytes, 'rss_peak': bytes}."""
+    if name == 'scan.scan_tree':
+        directory, tier = target.rsplit(os.sep, 1)
+        func, modifies = (lambda _: _scan(directory, tier)), False
+    else:
+        func, modifies = _case_function(name), CASES[name][1]
+    workdir = tempfile.mkdtemp(prefix='bench-') if modifies else None
+    if workdir:
+        # Writes are audited; keep the benchmark's entries out of the user's log
+        os.environ['METADATA_AUDIT_LOG'] = os.path.join(workdir, 'audit')
+    try:
+        def prepare():
+            if not modifies:
+                return target
+            copy = os.path.join(workdir, os.path.basename(target))
+            shutil.copyfile(target, copy)
+            return copy
+
+        # One untimed call warms imports and the page cache so repeats measure steady state
+        func(prepare())
+        rss_before = _max_rss_bytes()
+        times = []
+        for _ in range(repeat):
+            path = prepare()
+            start = time.perf_counter()
+            func(path)
+            times.append(time.perf_counter() - start)
+        return {'times': times, 'rss_before': rss_before, 'rss_peak': _max_rss_bytes()}
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _run_isolated(name, target, repeat):
+    command = [sys.executable, os.path.abspath(__file__), '--case', name, target, '--repeat', str(repeat)]
+    result = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {'error': (result.stderr.strip().splitlines() or ['failed'])[-1]}
+    return json.loads(result.stdout)
+
+
+def run_suite(files, directory, tiers, repeat, cases=None):
+    """Run every case over the corpus; returns a list of result dicts."""
+    plan = []
+    for name, (kinds, _) in CASES.items():
+        plan += [(name, entry['path'], entry['name'], entry['size']) for entry in files if entry['kind'] in kinds]
+    for tier in tiers:
+        size = sum(entry['size'] for entry in files if entry['tier'] == tier)
+        plan.append(('scan.scan_tree', os.path.join(directory, tier), f"{tier}.*", size))
+
+    results = []
+    for name, target, label, size in plan:
+        if cases and not any(name.startswith(prefix) for prefix in cases):
+            continue
+        measured = _run_isolated(name, target, repeat)
+        result = {'case': name, 'file': label, 'size': size}
+        if 'error' in measured:
+            result['error'] = measured['error']
+        else:
+            median = statistics.median(measured['times'])
+            result.update({
+                'median_s': median,
+                'min_s': min(measured['times']),
+                'ops_per_s': 1 / median if median else None,
+                'mb_per_s': size / median / 1e6 if median else None,
+                'rss_before_mb': measured['rss_before'] / 2 ** 20,
+                'peak_rss_mb': measured['rss_peak'] / 2 ** 20,
+            })
+        print(format_result(result), flush=True)
+        results.append(result)
+    return results
+
+
+def format_result(result):
+    if 'error' in result:
+        return f"{result['case']:30} {result['file']:12} ERROR {result['error']}"
+    return (f"{result['case']:30} {result['file']:12} {result['median_s'] * 1000:10.2f} ms "
+            f"{result['ops_per_s'] or 0:9.0f}/s {result['mb_per_s'] or 0:10.1f} MB/s "
+            f"{result['peak_rss_mb']:8.1f} MiB peak")
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """Return (case, file, message) for every case that regressed by more than threshold."""
+    before = {(result['case'], result['file']): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = before.get((result['case'], result['file']))
+        if old is None or 'error' in old:
+            continue
+        if 'error' in result:
+            regressions.append((result['case'], result['file'], f"now fails: {result['error']}"))
+            continue
+        if result['median_s'] > old['median_s'] * (1 + threshold) and result['median_s'] - old['median_s'] > MIN_SECONDS:
+            regressions.append((result['case'], result['file'],
+                                f"time {old['median_s'] * 1000:.2f} -> {result['median_s'] * 1000:.2f} ms "
+                                f"({result['median_s'] / old['median_s'] - 1:+.0%})"))
+        # Compare memory above the interpreter's own footprint, so import changes don't swamp it
+        old_growth = old['peak_rss_mb'] - old['rss_before_mb']
+        growth = result['peak_rss_mb'] - result['rss_before_mb']
+        if growth > max(old_growth, 1.0) * (1 + threshold):
+            regressions.append((result['case'], result['file'],
+                                f"memory growth {old_growth:.1f} -> {growth:.1f} MiB"))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tiers', default=','.join(corpus.DEFAULT_TIERS), help=f"comma list of {', '.join(corpus.TIERS)}")
+    parser.add_argument('--kinds', default=','.join(corpus.KINDS))
+    parser.add_argument('--cases', help="comma list of case name prefixes, e.g. read,hash.hash_file")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--corpus', metavar='DIR', help="generate the corpus here and keep it (default: a temp dir)")
+    parser.add_argument('--output', default='bench_results.json', help="results file (default: %(default)s)")
+    parser.add_argument('--compare', metavar='BASELINE.json', help="flag regressions against a saved run")
+    parser.add_argument('--against', metavar='RESULTS.json', help="with --compare, use saved results instead of running")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown/memory growth as a fraction (default: %(default)s)")
+    parser.add_argument('--case', nargs=2, metavar=('NAME', 'TARGET'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(args.case[0], args.case[1], args.repeat)))
+        return 0
+
+    if args.against:
+        with open(args.against) as f:
+            current = json.load(f)
+    else:
+        tiers, kinds = args.tiers.split(','), args.kinds.split(',')
+        directory = args.corpus or tempfile.mkdtemp(prefix='bench-corpus-')
+        try:
+            files = corpus.generate(directory, tiers, kinds)
+            results = run_suite(files, directory, tiers, args.repeat,
+                                args.cases.split(',') if args.cases else None)
+        finally:
+            if not args.corpus:
+                shutil.rmtree(directory, ignore_errors=True)
+        current = {
+            'meta': {
+                'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'machine': platform.machine(),
+                'cpus': os.cpu_count(),
+                'tiers': tiers,
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(current, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    regressions = compare(baseline, current, args.threshold)
+    for case, file_name, message in regressions:
+        print(f"REGRESSION {case} {file_name}: {message}")
+    print(f"{len(regressions)} regression(s) against {args.compare} (threshold {args.threshold:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
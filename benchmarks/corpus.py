@@ -0,0 +1,326 @@
+"""Generate a reproducible synthetic corpus of documents and images for benchmarks.
+
+Files are built directly (zipfile for OOXML, a minimal PDF writer, zlib for
+PNG), so the corpus does not depend on openpyxl, python-docx or PyPDF2.
+JPEG needs Pillow for encoding and is skipped without it. Every tier uses a
+fixed seed, so two runs on the same tier produce identical bytes.
+
+Usage: python benchmarks/corpus.py DIR [--tiers small,medium] [--kinds xlsx,docx,pdf,png,jpg]
+"""
+import argparse
+import datetime
+import os
+import random
+import struct
+import sys
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ooxml_props import build_core_xml
+
+MIB = 1024 * 1024
+
+# Size knobs per tier. 'padding' adds an incompressible stored part (OOXML),
+# stream (PDF) or ancillary chunk (PNG) so large tiers reach their target size.
+TIERS = {
+    'small': {'sheets': 1, 'rows': 100, 'paragraphs': 50, 'pages': 2, 'pixels': (320, 240),
+              'exif_bytes': 1024, 'padding': 0},
+    'medium': {'sheets': 20, 'rows': 2000, 'paragraphs': 5000, 'pages': 500, 'pixels': (2000, 1500),
+               'exif_bytes': 16 * 1024, 'padding': 10 * MIB},
+    'large': {'sheets': 50, 'rows': 5000, 'paragraphs': 20000, 'pages': 5000, 'pixels': (6000, 4000),
+              'exif_bytes': 60 * 1024, 'padding': 100 * MIB},
+    'huge': {'sheets': 100, 'rows': 5000, 'paragraphs': 50000, 'pages': 20000, 'pixels': (8000, 6000),
+             'exif_bytes': 60 * 1024, 'padding': 1024 * MIB},
+}
+DEFAULT_TIERS = ('small', 'medium')
+KINDS = ('xlsx', 'docx', 'pdf', 'png', 'jpg')
+
+SEED = 20240627
+WORDS = ('audit', 'ledger', 'timesheet', 'invoice', 'project', 'review', 'budget', 'planning', 'notes', 'record')
+
+EMPTY_CORE_XML = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/core-properties"'
+    b' xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:dcterms="http://purl.org/dc/terms/"'
+    b' xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance"/>'
+)
+
+RELS_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+OFFICE_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+CONTENT_TYPES_NS = 'http://schemas.openxmlformats.org/package/2006/content-types'
+
+
+def _core_metadata(rng):
+    created = datetime.datetime(2015, 1, 1) + datetime.timedelta(seconds=rng.randrange(5 * 365 * 86400))
+    return {
+        'Title': ' '.join(rng.choice(WORDS) for _ in range(3)).title(),
+        'Subject': rng.choice(WORDS),
+        'Creator': rng.choice(('Ann Example', 'Bob Sample', 'Carol Test')),
+        'Keywords': ', '.join(rng.sample(WORDS, 3)),
+        'Description': 'Synthetic benchmark document',
+        'Last Modified By': rng.choice(('Ann Example', 'Bob Sample', 'Carol Test')),
+        'Revision': str(rng.randrange(1, 50)),
+        'Created': created,
+        'Modified': created + datetime.timedelta(seconds=rng.randrange(365 * 86400)),
+        'Category': rng.choice(('Finance', 'Engineering', 'HR')),
+    }
+
+
+def _padding_chunks(rng, size, chunk_size=MIB):
+    """Yield `size` pseudo-random (incompressible, reproducible) bytes in chunks."""
+    while size > 0:
+        n = min(chunk_size, size)
+        yield rng.randbytes(n)
+        size -= n
+
+
+def _write_padding(zf, name, rng, size):
+    info = zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_STORED
+    with zf.open(info, 'w', force_zip64=size > 2 ** 31) as f:
+        for chunk in _padding_chunks(rng, size):
+            f.write(chunk)
+
+
+def _writestr(zf, name, data):
+    info = zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    zf.writestr(info, data)
+
+
+def _content_types(overrides, media=False):
+    parts = ''.join(f'<Override PartName="{name}" ContentType="{kind}"/>' for name, kind in overrides)
+    default_media = '<Default Extension="bin" ContentType="application/octet-stream"/>' if media else ''
+    return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Types xmlns="{CONTENT_TYPES_NS}">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            f'<Default Extension="xml" ContentType="application/xml"/>{default_media}{parts}'
+            '<Override PartName="/docProps/core.xml" '
+            'ContentType="application/vnd.openxmlformats-package.core-properties+xml"/>'
+            '<Override PartName="/docProps/app.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.extended-properties+xml"/></Types>')
+
+
+def _root_rels(main_part):
+    return (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{RELS_NS}">'
+            f'<Relationship Id="rId1" Type="{OFFICE_REL}/officeDocument" Target="{main_part}"/>'
+            '<Relationship Id="rId2" '
+            'Type="http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties" '
+            'Target="docProps/core.xml"/>'
+            f'<Relationship Id="rId3" Type="{OFFICE_REL}/extended-properties" Target="docProps/app.xml"/>'
+            '</Relationships>')
+
+
+def _app_xml(application):
+    return ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/extended-properties">'
+            f'<Application>{application}</Application><Company>Example Ltd</Company></Properties>')
+
+
+def write_xlsx(path, rng, sheets, rows, padding=0):
+    with zipfile.ZipFile(path, 'w') as zf:
+        sheet_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml'
+        overrides = [('/xl/workbook.xml', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml')]
+        overrides += [(f'/xl/worksheets/sheet{i}.xml', sheet_type) for i in range(1, sheets + 1)]
+        _writestr(zf, '[Content_Types].xml', _content_types(overrides, media=bool(padding)))
+        _writestr(zf, '_rels/.rels', _root_rels('xl/workbook.xml'))
+        _writestr(zf, 'docProps/core.xml', build_core_xml(EMPTY_CORE_XML, _core_metadata(rng)))
+        _writestr(zf, 'docProps/app.xml', _app_xml('Microsoft Excel'))
+        sheet_list = ''.join(f'<sheet name="Sheet{i}" sheetId="{i}" r:id="rId{i}"/>' for i in range(1, sheets + 1))
+        _writestr(zf, 'xl/workbook.xml',
+                  '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                  '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                  f'xmlns:r="{OFFICE_REL}"><sheets>{sheet_list}</sheets></workbook>')
+        rels = ''.join(f'<Relationship Id="rId{i}" Type="{OFFICE_REL}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                       for i in range(1, sheets + 1))
+        _writestr(zf, 'xl/_rels/workbook.xml.rels',
+                  f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><Relationships xmlns="{RELS_NS}">'
+                  f'{rels}</Relationships>')
+        for i in range(1, sheets + 1):
+            body = ''.join(
+                f'<row r="{r}"><c r="A{r}" t="inlineStr"><is><t>{rng.choice(WORDS)}</t></is></c>'
+                f'<c r="B{r}"><v>{rng.random() * 1000:.2f}</v></c><c r="C{r}"><v>{rng.randrange(10 ** 6)}</v></c></row>'
+                for r in range(1, rows + 1))
+            _writestr(zf, f'xl/worksheets/sheet{i}.xml',
+                      '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                      '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                      f'<sheetData>{body}</sheetData></worksheet>')
+        if padding:
+            _write_padding(zf, 'xl/media/padding.bin', rng, padding)
+
+
+def write_docx(path, rng, paragraphs, padding=0):
+    with zipfile.ZipFile(path, 'w') as zf:
+        overrides = [('/word/document.xml',
+                      'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml')]
+        _writestr(zf, '[Content_Types].xml', _content_types(overrides, media=bool(padding)))
+        _writestr(zf, '_rels/.rels', _root_rels('word/document.xml'))
+        _writestr(zf, 'docProps/core.xml', build_core_xml(EMPTY_CORE_XML, _core_metadata(rng)))
+        _writestr(zf, 'docProps/app.xml', _app_xml('Microsoft Office Word'))
+        body = ''.join(f'<w:p><w:r><w:t>{escape(" ".join(rng.choice(WORDS) for _ in range(12)))}</w:t></w:r></w:p>'
+                       for _ in range(paragraphs))
+        _writestr(zf, 'word/document.xml',
+                  '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                  '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                  f'<w:body>{body}</w:body></w:document>')
+        if padding:
+            _write_padding(zf, 'word/media/padding.bin', rng, padding)
+
+
+def _pdf_date(value):
+    return value.strftime("D:%Y%m%d%H%M%SZ")
+
+
+def write_pdf(path, rng, pages, padding=0):
+    """Write a PDF with `pages` text pages, an Info dictionary and optional padding stream."""
+    metadata = _core_metadata(rng)
+    offsets = []
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+        def obj(body):
+            offsets.append(f.tell())
+            f.write(f"{len(offsets)} 0 obj\n".encode() + body + b"\nendobj\n")
+
+        # 1 catalog, 2 pages, 3 font, 4 info, then (page, content) pairs, then padding
+        page_ids = [5 + 2 * i for i in range(pages)]
+        obj(b"<< /Type /Catalog /Pages 2 0 R >>")
+        obj(f"<< /Type /Pages /Count {pages} /Kids [{' '.join(f'{n} 0 R' for n in page_ids)}] >>".encode())
+        obj(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+        obj(f"<< /Title ({metadata['Title']}) /Author ({metadata['Creator']}) /Subject ({metadata['Subject']}) "
+            f"/Keywords ({metadata['Keywords']}) /Producer (benchmarks/corpus.py) "
+            f"/CreationDate ({_pdf_date(metadata['Created'])}) /ModDate ({_pdf_date(metadata['Modified'])}) >>"
+            .encode())
+        for page_id in page_ids:
+            obj(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >> "
+                f"/Contents {page_id + 1} 0 R >>".encode())
+            text = ' '.join(rng.choice(WORDS) for _ in range(10))
+            stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+            obj(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        if padding:
+            offsets.append(f.tell())
+            f.write(f"{len(offsets)} 0 obj\n<< /Length {padding} >>\nstream\n".encode())
+            for chunk in _padding_chunks(rng, padding):
+                f.write(chunk)
+            f.write(b"\nendstream\nendobj\n")
+
+        xref = f.tell()
+        f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode())
+        f.write(''.join(f"{offset:010d} 00000 n \n" for offset in offsets).encode())
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R /Info 4 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+                .encode())
+
+
+def build_exif(rng, comment_bytes):
+    """Return a little-endian TIFF/EXIF block with IFD0, Exif and GPS IFDs and a large UserComment."""
+    when = _core_metadata(rng)['Created'].strftime('%Y:%m:%d %H:%M:%S').encode() + b'\x00'
+    make, model = b'BenchCam\x00', b'Model 1\x00'
+    comment = b'ASCII\x00\x00\x00' + bytes(rng.choice(b'abcdefgh ') for _ in range(comment_bytes))
+
+    def ifd(entries, start, next_ifd=0):
+        """entries: (tag, type, count, payload bytes); returns (ifd bytes, data bytes)."""
+        data = b''
+        table = struct.pack('<H', len(entries))
+        data_offset = start + 2 + 12 * len(entries) + 4
+        for tag, kind, count, payload in entries:
+            if len(payload) <= 4:
+                table += struct.pack('<HHL', tag, kind, count) + payload.ljust(4, b'\x00')
+            else:
+                table += struct.pack('<HHLL', tag, kind, count, data_offset + len(data))
+                data += payload + (b'\x00' if len(payload) % 2 else b'')
+        return table + struct.pack('<L', next_ifd), data
+
+    # IFD0 at 8; sizes are computed in two passes since pointers depend on them
+    ifd0_entries = [(0x010f, 2, len(make), make), (0x0110, 2, len(model), model), (0x0132, 2, len(when), when),
+                    (0x8769, 4, 1, b'\x00' * 4), (0x8825, 4, 1, b'\x00' * 4)]
+    ifd0, ifd0_data = ifd(ifd0_entries, 8)
+    exif_start = 8 + len(ifd0) + len(ifd0_data)
+    exif_entries = [(0x9003, 2, len(when), when), (0x8827, 3, 1, struct.pack('<H', 100)),
+                    (0x9286, 7, len(comment), comment)]
+    exif, exif_data = ifd(exif_entries, exif_start)
+    gps_start = exif_start + len(exif) + len(exif_data)
+    gps_entries = [(0x0001, 2, 2, b'N\x00'),
+                   (0x0002, 5, 3, struct.pack('<6L', 51, 1, 30, 1, 1234, 100))]
+    gps, gps_data = ifd(gps_entries, gps_start)
+
+    ifd0_entries[3] = (0x8769, 4, 1, struct.pack('<L', exif_start))
+    ifd0_entries[4] = (0x8825, 4, 1, struct.pack('<L', gps_start))
+    ifd0, ifd0_data = ifd(ifd0_entries, 8)
+    return b'II*\x00' + struct.pack('<L', 8) + ifd0 + ifd0_data + exif + exif_data + gps + gps_data
+
+
+def _png_chunk(kind, data):
+    return struct.pack('>L', len(data)) + kind + data + struct.pack('>L', zlib.crc32(kind + data))
+
+
+def write_png(path, rng, pixels, exif_bytes, padding=0):
+    width, height = pixels
+    with open(path, 'wb') as f:
+        f.write(b'\x89PNG\r\n\x1a\n')
+        f.write(_png_chunk(b'IHDR', struct.pack('>LLBBBBB', width, height, 8, 0, 0, 0, 0)))
+        f.write(_png_chunk(b'eXIf', build_exif(rng, exif_bytes)))
+        f.write(_png_chunk(b'tEXt', b'Author\x00' + _core_metadata(rng)['Creator'].encode('latin-1')))
+        row = bytes(x % 256 for x in range(width))
+        compressor = zlib.compressobj(6)
+        data = b''.join(compressor.compress(b'\x00' + row[y % 256:] + row[:y % 256]) for y in range(height))
+        data += compressor.flush()
+        for start in range(0, len(data), MIB):
+            f.write(_png_chunk(b'IDAT', data[start:start + MIB]))
+        for chunk in _padding_chunks(rng, padding):
+            f.write(_png_chunk(b'pdNg', chunk))  # private ancillary chunk, ignored by readers
+        f.write(_png_chunk(b'IEND', b''))
+
+
+def write_jpeg(path, rng, pixels, exif_bytes):
+    """Write a JPEG with a large EXIF block; returns False when Pillow is not installed."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return False
+    # APP1 segments are limited to 64 KiB
+    exif = build_exif(rng, min(exif_bytes, 60 * 1024))
+    image = Image.linear_gradient('L').resize(pixels).convert('RGB')
+    image.save(path, 'JPEG', quality=85, exif=b'Exif\x00\x00' + exif)
+    return True
+
+
+def generate(directory, tiers=DEFAULT_TIERS, kinds=KINDS):
+    """Create the corpus under directory; returns [{'name', 'path', 'kind', 'tier', 'size'}]."""
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for tier in tiers:
+        spec = TIERS[tier]
+        for kind in kinds:
+            rng = random.Random(f"{SEED}-{tier}-{kind}")
+            path = os.path.join(directory, f"{tier}.{kind}")
+            if kind == 'xlsx':
+                write_xlsx(path, rng, spec['sheets'], spec['rows'], spec['padding'])
+            elif kind == 'docx':
+                write_docx(path, rng, spec['paragraphs'], spec['padding'])
+            elif kind == 'pdf':
+                write_pdf(path, rng, spec['pages'], spec['padding'])
+            elif kind == 'png':
+                write_png(path, rng, spec['pixels'], spec['exif_bytes'], spec['padding'])
+            elif kind == 'jpg':
+                if not write_jpeg(path, rng, spec['pixels'], spec['exif_bytes']):
+                    print(f"skipping {tier}.jpg: Pillow is not installed", file=sys.stderr)
+                    continue
+            files.append({'name': f"{tier}.{kind}", 'path': path, 'kind': kind, 'tier': tier,
+                          'size': os.path.getsize(path)})
+    return files
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('directory')
+    parser.add_argument('--tiers', default=','.join(DEFAULT_TIERS), help=f"comma list of {', '.join(TIERS)}")
+    parser.add_argument('--kinds', default=','.join(KINDS))
+    args = parser.parse_args(argv)
+    for entry in generate(args.directory, args.tiers.split(','), args.kinds.split(',')):
+        print(f"{entry['name']:14} {entry['size'] / MIB:10.2f} MiB  {entry['path']}")
+
+
+if __name__ == '__main__':
+    main()
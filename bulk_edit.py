@@ -0,0 +1,186 @@
+"""Apply metadata from a CSV or JSON manifest to many OOXML files at once.
+
+A CSV manifest has a `path` column (a file path or glob, relative to the
+manifest's directory unless --root is given) and one column per property,
+e.g. `Creator`, `Company`, `Category`; empty cells leave a property alone.
+A JSON manifest is a list of {"path": ..., "properties": {...}} objects.
+When several rows match a file, later rows win.
+
+Usage: python bulk_edit.py MANIFEST [--root DIR] [--workers N] [--dry-run] [--report FILE]
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from ooxml_props import (read_core_properties, write_core_properties, next_revision, CORE_PROPERTIES,
+                         APP_PROPERTIES, DATE_PROPERTIES, OOXML_EXTENSIONS)
+from audit_log import recording
+
+DEFAULT_WORKERS = 4
+
+
+def load_manifest(manifest_path):
+    """Return a list of (path or glob, {property: value}) rules from a CSV or JSON manifest."""
+    rules = []
+    if manifest_path.lower().endswith('.json'):
+        with open(manifest_path, encoding='utf-8') as f:
+            for entry in json.load(f):
+                rules.append((entry['path'], dict(entry.get('properties', {}))))
+    else:
+        with open(manifest_path, newline='', encoding='utf-8-sig') as f:
+            for row in csv.DictReader(f):
+                pattern = row.pop('path')
+                rules.append((pattern, {key: value for key, value in row.items() if value not in ('', None)}))
+    return rules
+
+
+def resolve_manifest(rules, root):
+    """Expand globs and merge the rules into {file path: properties}, in first-match order."""
+    targets = {}
+    for pattern, properties in rules:
+        full_pattern = pattern if os.path.isabs(pattern) else os.path.join(root, pattern)
+        if glob.has_magic(full_pattern):
+            matches = sorted(glob.glob(full_pattern, recursive=True))
+        else:
+            matches = [full_pattern]
+        for file_path in matches:
+            if not file_path.lower().endswith(OOXML_EXTENSIONS):
+                continue
+            targets.setdefault(file_path, {}).update(properties)
+    return targets
+
+
+def _parse_date(key, value):
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).strip())
+        except ValueError:
+            raise ValueError(f"Incorrect date format for '{key}': {value}") from None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def plan_changes(current, properties, bump_revision=True):
+    """Return {property: (old, new)} for the properties that would actually change.
+
+    With bump_revision, Revision moves on as ooxml_props.next_revision says.
+    """
+    changes = {}
+    for key, value in properties.items():
+        if key not in CORE_PROPERTIES and key not in APP_PROPERTIES:
+            raise ValueError(f"Unknown property '{key}'")
+        if key in DATE_PROPERTIES:
+            value = _parse_date(key, value)
+        else:
+            value = str(value)
+        if current.get(key) != value:
+            changes[key] = (current.get(key), value)
+    if changes and bump_revision and 'Revision' not in properties:
+        revision = current.get('Revision')
+        if next_revision(revision) != revision:
+            changes['Revision'] = (revision, next_revision(revision))
+    return changes
+
+
+def edit_file(file_path, properties, dry_run=False, bump_revision=True):
+    """Apply properties to one file and return a report record; errors are captured, not raised."""
+    start = time.perf_counter()
+    record = {'path': file_path, 'status': None, 'changes': {}, 'error': None}
+    try:
+        current = read_core_properties(file_path, include_app=True)
+        changes = plan_changes(current, properties, bump_revision)
+        record['changes'] = changes
+        if not changes:
+            record['status'] = 'unchanged'
+        elif dry_run:
+            record['status'] = 'dry-run'
+        else:
+            with recording(file_path, 'bulk_edit'):
+                write_core_properties(file_path, {key: new for key, (_, new) in changes.items()})
+            record['status'] = 'changed'
+    except Exception as e:
+        record['status'] = 'failed'
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['elapsed'] = time.perf_counter() - start
+    return record
+
+
+def bulk_edit(targets, workers=DEFAULT_WORKERS, dry_run=False, bump_revision=True):
+    """Edit every file in targets ({path: properties}) on a bounded thread pool.
+
+    Records are yielded in the order of targets. Each write goes through
+    write_core_properties, so a file is either fully updated or untouched.
+    """
+    items = iter(targets.items())
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for file_path, properties in items:
+            pending.append(executor.submit(edit_file, file_path, properties, dry_run, bump_revision))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            yield pending.popleft().result()
+            item = next(items, None)
+            if item is not None:
+                pending.append(executor.submit(edit_file, *item, dry_run, bump_revision))
+
+
+def _show(value):
+    return repr(str(value)) if isinstance(value, datetime) else repr(value)
+
+
+def format_diff(record):
+    lines = [f"{record['path']} [{record['status']}] {record['elapsed'] * 1000:.1f} ms"]
+    for key, (old, new) in record['changes'].items():
+        lines.append(f"  {key}: {_show(old)} -> {_show(new)}")
+    if record['error']:
+        lines.append(f"  error: {record['error']}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Apply metadata from a CSV/JSON manifest to .xlsx/.docx files.")
+    parser.add_argument('manifest')
+    parser.add_argument('--root', default=None, help="base directory for relative paths (default: manifest's)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--dry-run', action='store_true', help="print the changes without writing anything")
+    parser.add_argument('--keep-revision', action='store_true', help="do not increment Revision on change")
+    parser.add_argument('--report', metavar='FILE', help="write the per-file report as JSON")
+    args = parser.parse_args(argv)
+
+    root = args.root or os.path.dirname(os.path.abspath(args.manifest))
+    targets = resolve_manifest(load_manifest(args.manifest), root)
+
+    start = time.perf_counter()
+    records = []
+    for record in bulk_edit(targets, args.workers, args.dry_run, not args.keep_revision):
+        records.append(record)
+        if record['changes'] or record['error']:
+            print(format_diff(record))
+    elapsed = time.perf_counter() - start
+
+    counts = {}
+    for record in records:
+        counts[record['status']] = counts.get(record['status'], 0) + 1
+    summary = ', '.join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"{len(records)} files in {elapsed:.2f}s: {summary or 'nothing to do'}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'elapsed': elapsed, 'files': records}, f, indent=2, default=str)
+
+    sys.exit(1 if counts.get('failed') else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""Headless command line for the metadata tool; never imports tkinter.
+
+Usage:
+    python cli.py show FILE [FILE ...] [--json] [--app]
+    python cli.py set FILE KEY=VALUE [KEY=VALUE ...]
+    python cli.py hash FILE [FILE ...] [...]       (see hashing.py)
+    python cli.py scan ROOT [...]                  (see scanner.py)
+    python cli.py bulk MANIFEST [...]              (see bulk_edit.py)
+    python cli.py pdf FILE [--revisions] [--xmp]   (see pdf_info.py)
+    python cli.py check RECORDS [--rules FILE]     (see rules.py)
+    python cli.py timeline RECORDS [...]           (see timeline.py)
+    python cli.py sync-dates FILE [FILE ...]       (see timestamps.py)
+    python cli.py trace TRACE.jsonl [...]          (see tracing.py)
+    python cli.py watch ROOT [...]                 (see watcher.py)
+    python cli.py dedup ROOT [...]                 (see dedup.py)
+    python cli.py archive ARCHIVE [...]            (see archives.py)
+    python cli.py audit [--property NAME] [...]    (see audit_log.py)
+"""
+import json
+import sys
+
+# Sub-commands that forward their arguments to another module's main()
+FORWARDED = {
+    'hash': 'hashing',
+    'scan': 'scanner',
+    'bulk': 'bulk_edit',
+    'pdf': 'pdf_info',
+    'check': 'rules',
+    'timeline': 'timeline',
+    'sync-dates': 'timestamps',
+    'trace': 'tracing',
+    'watch': 'watcher',
+    'dedup': 'dedup',
+    'archive': 'archives',
+    'audit': 'audit_log',
+}
+
+
+def show(argv):
+    import argparse
+    from metadata_core import get_metadata, compare_to_industry_standards
+
+    parser = argparse.ArgumentParser(prog='cli.py show', description="Print the metadata of one or more files.")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--json', action='store_true', help="print one JSON object per file")
+    parser.add_argument('--app', action='store_true', help="include docProps/app.xml values for OOXML files")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for file_path in args.files:
+        try:
+            if args.app:
+                from ooxml_props import read_core_properties, OOXML_EXTENSIONS
+                if file_path.lower().endswith(OOXML_EXTENSIONS):
+                    metadata = read_core_properties(file_path, include_app=True)
+                else:
+                    metadata = get_metadata(file_path)
+            else:
+                metadata = get_metadata(file_path)
+        except Exception as e:
+            failed = True
+            print(f"{file_path}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+
+        issues = compare_to_industry_standards(metadata)
+        if args.json:
+            print(json.dumps({'path': file_path, 'metadata': metadata, 'issues': issues}, default=str))
+            continue
+        print(f"{file_path}:")
+        for key, value in metadata.items():
+            issue = f"  [{issues[key]}]" if key in issues else ''
+            print(f"  {key}: {value}{issue}")
+    return 1 if failed else 0
+
+
+def set_(argv):
+    import argparse
+    from datetime import datetime
+    from metadata_core import set_metadata
+    from ooxml_props import DATE_PROPERTIES
+
+    parser = argparse.ArgumentParser(prog='cli.py set', description="Write properties to an OOXML file.")
+    parser.add_argument('file')
+    parser.add_argument('properties', nargs='+', metavar='KEY=VALUE',
+                        help="dates (Created, Modified) as ISO 8601, e.g. 'Created=2024-01-01 10:00:00'; "
+                             "UTC unless an offset is given")
+    args = parser.parse_args(argv)
+
+    new_metadata = {}
+    for item in args.properties:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"expected KEY=VALUE, got {item!r}")
+        key = key.strip()
+        if key in DATE_PROPERTIES and value.strip():
+            # Accept the dates as show prints them, with a space as well as a 'T'
+            try:
+                value = datetime.fromisoformat(value.strip())
+            except ValueError:
+                parser.error(f"{key} must be an ISO 8601 date such as 2024-01-01 10:00:00, got {value!r}")
+        new_metadata[key] = value
+
+    updated = set_metadata(args.file, new_metadata)
+    for key, value in updated.items():
+        print(f"{key}: {value}")
+    return 0
+
+
+COMMANDS = {
+    'show': show,
+    'set': set_,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] in ('-h', '--help'):
+        print(__doc__.strip())
+        return 0 if argv else 2
+
+    command, rest = argv[0], argv[1:]
+    if command in COMMANDS:
+        return COMMANDS[command](rest)
+    if command in FORWARDED:
+        import importlib
+        return importlib.import_module(FORWARDED[command]).main(rest) or 0
+
+    print(f"Unknown command {command!r}\n\n{__doc__.strip()}", file=sys.stderr)
+    return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""Find duplicate and near-duplicate documents across a tree.
+
+Exact duplicates are narrowed down in stages, so most files are never read
+in full: files are grouped by size (from the directory walk alone), groups
+that share a size are compared by a head/tail partial hash, and only files
+that still collide get a full SHA-256 (on a thread pool, through the
+metadata cache when one is given).
+
+Near duplicates are OOXML files (.docx, .xlsx, .pptx) whose content is the
+same but whose document properties differ, e.g. one document saved several
+times with a new author or title. Their zip members are compared separately
+with the metadata parts (docProps/core.xml, app.xml, custom.xml) left out:
+first by the CRC-32 and size the central directory already records (no
+decompression; this also matches a file recompressed by another
+application), then candidates are confirmed by a SHA-256 of every content
+member. Each cluster lists the properties whose values differ.
+
+Usage: python dedup.py ROOT [--include GLOB] [--exclude GLOB] [--workers N] [--cache DB]
+                       [--no-near] [--json]
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from hashing import hash_files
+from ooxml_props import (read_core_properties, find_part, CorePropertiesError, CORE_PART, CORE_REL_TYPE,
+                         APP_PART, APP_REL_TYPE, OOXML_EXTENSIONS)
+from scanner import iter_files
+
+# Zip members holding document properties rather than content
+METADATA_PREFIX = 'docProps/'
+
+# OOXML files sent to a worker per task when computing member signatures
+SIGNATURE_BATCH_SIZE = 256
+
+
+class DedupStats:
+    """How many files survived each stage, and how many bytes were read in full."""
+
+    def __init__(self):
+        self.files = 0
+        self.same_size = 0
+        self.same_partial = 0
+        self.fully_hashed_bytes = 0
+        self.ooxml = 0
+        self.same_signature = 0
+        self.errors = 0
+
+    def as_dict(self):
+        return dict(vars(self))
+
+
+def _metadata_parts(zf):
+    parts = {name for name in zf.namelist() if name.startswith(METADATA_PREFIX)}
+    for default, rel_type in ((CORE_PART, CORE_REL_TYPE), (APP_PART, APP_REL_TYPE)):
+        name = find_part(zf, default, rel_type)
+        if name is not None:
+            parts.add(name)
+    return parts
+
+
+def member_signature(file_path):
+    """Return a digest of (name, CRC-32, size) for every non-metadata zip member, from the central directory."""
+    with zipfile.ZipFile(file_path) as zf:
+        skip = _metadata_parts(zf)
+        entries = sorted((info.filename, info.CRC, info.file_size) for info in zf.infolist()
+                         if info.filename not in skip and not info.is_dir())
+    return hashlib.sha256(repr(entries).encode('utf-8')).hexdigest()
+
+
+def content_digest(file_path):
+    """Return a SHA-256 over the decompressed bytes of every non-metadata zip member, in name order."""
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(file_path) as zf:
+        skip = _metadata_parts(zf)
+        for info in sorted(zf.infolist(), key=lambda info: info.filename):
+            if info.filename in skip or info.is_dir():
+                continue
+            member = hashlib.sha256()
+            with zf.open(info) as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    member.update(chunk)
+            digest.update(info.filename.encode('utf-8') + b'\0' + member.digest())
+    return digest.hexdigest()
+
+
+def _apply(func, paths):
+    """Run func over paths in a worker, returning (path, result or None) pairs."""
+    results = []
+    for file_path in paths:
+        try:
+            results.append((file_path, func(file_path)))
+        except (OSError, zipfile.BadZipFile, KeyError, ValueError):
+            results.append((file_path, None))
+    return results
+
+
+def _map_batches(func, paths, workers, batch_size=SIGNATURE_BATCH_SIZE):
+    """Yield (path, func(path)) for every path, on a process pool since zip parsing holds the GIL."""
+    batches = [paths[start:start + batch_size] for start in range(0, len(paths), batch_size)]
+    workers = workers or os.cpu_count() or 1
+    if len(batches) <= 1 or workers == 1:
+        for batch in batches:
+            yield from _apply(func, batch)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for results in executor.map(_apply, [func] * len(batches), batches):
+            yield from results
+
+
+def _collisions(pairs):
+    """Group (path, key) pairs by key and keep the groups with more than one path."""
+    groups = defaultdict(list)
+    for file_path, key in pairs:
+        if key is not None:
+            groups[key].append(file_path)
+    return {key: paths for key, paths in groups.items() if len(paths) > 1}
+
+
+def _hash_pairs(paths, workers, cache, partial, stats):
+    for record in hash_files(paths, ('sha256',), workers, cache=None if partial else cache, partial=partial):
+        if record['error']:
+            stats.errors += 1
+            continue
+        yield record['path'], record['digests']['partial' if partial else 'sha256']
+
+
+def exact_duplicates(files, workers=None, cache=None, stats=None):
+    """Return {sha256: [paths]} for identical files among (path, size) pairs.
+
+    Files are grouped by size, then by partial hash, and only the remaining
+    collisions are hashed in full.
+    """
+    stats = stats if stats is not None else DedupStats()
+    by_size = defaultdict(list)
+    for file_path, size in files:
+        by_size[size].append(file_path)
+    same_size = [file_path for paths in by_size.values() if len(paths) > 1 for file_path in paths]
+    stats.same_size = len(same_size)
+
+    by_partial = _collisions(_hash_pairs(same_size, workers, cache, True, stats))
+    same_partial = [file_path for paths in by_partial.values() for file_path in paths]
+    stats.same_partial = len(same_partial)
+    sizes = {file_path: size for size, paths in by_size.items() if len(paths) > 1 for file_path in paths}
+    stats.fully_hashed_bytes = sum(sizes[file_path] for file_path in same_partial)
+
+    return _collisions(_hash_pairs(same_partial, workers, cache, False, stats))
+
+
+def near_duplicates(paths, workers=None, stats=None):
+    """Return {content digest: [paths]} for OOXML files with identical content members."""
+    stats = stats if stats is not None else DedupStats()
+    signatures = _collisions(_map_batches(member_signature, list(paths), workers))
+    candidates = [file_path for group in signatures.values() for file_path in group]
+    stats.same_signature = len(candidates)
+    return _collisions(_map_batches(content_digest, candidates, workers))
+
+
+def metadata_differences(paths):
+    """Return {property: {path: value}} for the document properties that differ between paths."""
+    values = {}
+    for file_path in paths:
+        try:
+            values[file_path] = read_core_properties(file_path, include_app=True)
+        except (CorePropertiesError, OSError):
+            values[file_path] = {}
+    keys = dict.fromkeys(key for metadata in values.values() for key in metadata)
+    differences = {}
+    for key in keys:
+        per_file = {file_path: values[file_path].get(key) for file_path in paths}
+        if len(set(map(repr, per_file.values()))) > 1:
+            differences[key] = per_file
+    return differences
+
+
+def find_duplicates(root, include=None, exclude=None, workers=None, cache=None, near=True, stats=None):
+    """Return duplicate clusters under root as dicts with kind, key, size, paths and differences.
+
+    kind is 'exact' (byte-identical files; key is the SHA-256) or 'near'
+    (OOXML files with the same content but different properties; key is the
+    content digest). A near cluster made only of byte-identical copies is
+    left out, since the exact cluster already reports it.
+    """
+    stats = stats if stats is not None else DedupStats()
+    files = []
+    ooxml = []
+    for file_path, st in iter_files(root, include, exclude):
+        if st is None:
+            continue
+        files.append((file_path, st.st_size))
+        if file_path.lower().endswith(OOXML_EXTENSIONS):
+            ooxml.append(file_path)
+    stats.files = len(files)
+    stats.ooxml = len(ooxml)
+    sizes = dict(files)
+
+    clusters = []
+    exact_of = {}
+    for digest, paths in sorted(exact_duplicates(files, workers, cache, stats).items()):
+        paths.sort()
+        clusters.append({'kind': 'exact', 'key': digest, 'size': sizes[paths[0]], 'paths': paths,
+                         'differences': {}})
+        exact_of.update(dict.fromkeys(paths, digest))
+
+    if near:
+        for digest, paths in sorted(near_duplicates(ooxml, workers, stats).items()):
+            paths.sort()
+            if len({exact_of.get(file_path, file_path) for file_path in paths}) < 2:
+                continue
+            clusters.append({'kind': 'near', 'key': digest, 'size': None, 'paths': paths,
+                             'differences': metadata_differences(paths)})
+    return clusters
+
+
+def format_cluster(cluster):
+    if cluster['kind'] == 'exact':
+        lines = [f"exact {cluster['key'][:16]}  {len(cluster['paths'])} copies of {cluster['size']} bytes"]
+    else:
+        lines = [f"near  {cluster['key'][:16]}  {len(cluster['paths'])} files with the same content"]
+    lines += [f"  {file_path}" for file_path in cluster['paths']]
+    for key, per_file in cluster['differences'].items():
+        values = ', '.join(f"{os.path.basename(file_path)}={value!r}" for file_path, value in per_file.items())
+        lines.append(f"    {key}: {values}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report duplicate and near-duplicate documents under a tree.")
+    parser.add_argument('root')
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache', metavar='DB', default=None, help="SQLite cache of full-file digests")
+    parser.add_argument('--no-near', action='store_true', help="only report byte-identical files")
+    parser.add_argument('--json', action='store_true', help="print one JSON cluster per line")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        from metadata_cache import MetadataCache
+        cache = MetadataCache(args.cache)
+    stats = DedupStats()
+    clusters = find_duplicates(args.root, args.include, args.exclude, args.workers, cache, not args.no_near, stats)
+    if cache is not None:
+        cache.close()
+
+    for cluster in clusters:
+        print(json.dumps(cluster, default=str) if args.json else format_cluster(cluster))
+    summary = stats.as_dict()
+    print(f"{summary['files']} files: {summary['same_size']} share a size, {summary['same_partial']} a partial "
+          f"hash ({summary['fully_hashed_bytes'] / 1e6:.1f} MB hashed in full); {summary['ooxml']} OOXML, "
+          f"{summary['same_signature']} with matching members; "
+          f"{sum(c['kind'] == 'exact' for c in clusters)} exact and {sum(c['kind'] == 'near' for c in clusters)} "
+          f"near-duplicate clusters", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
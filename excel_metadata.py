@@ -1,39 +1,31 @@
 import os
-import subprocess
-from openpyxl import load_workbook
 from datetime import datetime
+from metadata_core import get_excel_metadata
+from ooxml_props import read_core_properties, write_core_properties, next_revision, CorePropertiesError
+from timestamps import set_file_times
+from audit_log import recording
 
-def get_excel_metadata(file_path):
-    """Retrieve metadata from an Excel file."""
+def set_excel_metadata(file_path, new_metadata):
+    """Set new metadata to an Excel file; the change is appended to the audit log."""
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"The file {file_path} does not exist.")
     
-    wb = load_workbook(file_path)
-    metadata = wb.properties
-    
-    metadata_dict = {
-        'Title': metadata.title,
-        'Subject': metadata.subject,
-        'Creator': metadata.creator,
-        'Keywords': metadata.keywords,
-        'Description': metadata.description,
-        'Last Modified By': metadata.lastModifiedBy,
-        'Revision': metadata.revision,
-        'Created': metadata.created,
-        'Modified': metadata.modified,
-        'Category': metadata.category,
-        'Content Status': metadata.contentStatus,
-        'Language': metadata.language,
-        'Identifier': metadata.identifier
-    }
-    
-    return metadata_dict
+    with recording(file_path, 'set_excel_metadata'):
+        _write_excel_metadata(file_path, new_metadata)
+    return get_excel_metadata(file_path)
 
-def set_excel_metadata(file_path, new_metadata):
-    """Set new metadata to an Excel file."""
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"The file {file_path} does not exist.")
+def _write_excel_metadata(file_path, new_metadata):
+    try:
+        current = read_core_properties(file_path)
+        updates = {key: value for key, value in new_metadata.items() if key != 'Revision'}
+        # Increment revision number automatically
+        updates['Revision'] = next_revision(current['Revision'])
+        write_core_properties(file_path, updates)
+        return
+    except CorePropertiesError:
+        pass  # Fall back to re-saving the whole workbook below
     
+    from openpyxl import load_workbook
     wb = load_workbook(file_path)
     
     # Set new properties
@@ -45,7 +37,7 @@ def set_excel_metadata(file_path, new_metadata):
     wb.properties.lastModifiedBy = new_metadata.get('Last Modified By', wb.properties.lastModifiedBy)
     
     # Increment revision number automatically
-    wb.properties.revision = str(int(wb.properties.revision) + 1) if wb.properties.revision else '1'
+    wb.properties.revision = next_revision(wb.properties.revision)
     
     wb.properties.created = new_metadata.get('Created', wb.properties.created)
     wb.properties.modified = new_metadata.get('Modified', wb.properties.modified)
@@ -55,7 +47,6 @@ def set_excel_metadata(file_path, new_metadata):
     wb.properties.identifier = new_metadata.get('Identifier', wb.properties.identifier)
     
     wb.save(file_path)
-    return get_excel_metadata(file_path)
 
 def prompt_for_metadata(existing_metadata):
     """Prompt user for new metadata."""
@@ -81,41 +72,36 @@ def prompt_for_metadata(existing_metadata):
     # Automatically handle the revision increment
     if 'Revision' in existing_metadata:
         print(f"Revision: {existing_metadata['Revision']}")
-        new_metadata['Revision'] = str(int(existing_metadata['Revision']) + 1) if existing_metadata['Revision'] else '1'
+        new_metadata['Revision'] = next_revision(existing_metadata['Revision'])
         print(f"New Revision: {new_metadata['Revision']}")
 
     return new_metadata
 
 def update_file_system_dates(file_path, created, modified):
-    """Update file system creation and modification dates to match Excel metadata."""
-    if created:
-        created_timestamp = datetime.timestamp(created)
-        subprocess.run(['touch', '-t', datetime.fromtimestamp(created_timestamp).strftime('%Y%m%d%H%M.%S'), file_path])
+    """Update file system creation and modification dates to match Excel metadata (naive dates are UTC)."""
+    return set_file_times(file_path, created, modified)
 
-    if modified:
-        modified_timestamp = datetime.timestamp(modified)
-        subprocess.run(['touch', '-mt', datetime.fromtimestamp(modified_timestamp).strftime('%Y%m%d%H%M.%S'), file_path])
+# Example usage (only when run as a script):
+if __name__ == '__main__':
+    file_path = 'Timesheet record CSCIL.xlsx'
 
-# Example usage:
-file_path = 'Timesheet record CSCIL.xlsx'
+    # Get current metadata
+    current_metadata = get_excel_metadata(file_path)
+    print("Current Metadata:")
+    for key, value in current_metadata.items():
+        print(f"{key}: {value}")
 
-# Get current metadata
-current_metadata = get_excel_metadata(file_path)
-print("Current Metadata:")
-for key, value in current_metadata.items():
-    print(f"{key}: {value}")
+    # Ask if user wants to change metadata
+    change_metadata = input("Do you want to change the metadata? (yes/no): ").strip().lower()
 
-# Ask if user wants to change metadata
-change_metadata = input("Do you want to change the metadata? (yes/no): ").strip().lower()
+    if change_metadata == 'yes':
+        new_metadata = prompt_for_metadata(current_metadata)
+        updated_metadata = set_excel_metadata(file_path, new_metadata)
+        print("\nUpdated Metadata:")
+        for key, value in updated_metadata.items():
+            print(f"{key}: {value}")
 
-if change_metadata == 'yes':
-    new_metadata = prompt_for_metadata(current_metadata)
-    updated_metadata = set_excel_metadata(file_path, new_metadata)
-    print("\nUpdated Metadata:")
-    for key, value in updated_metadata.items():
-        print(f"{key}: {value}")
-    
-    # Update file system dates to match Excel metadata
-    update_file_system_dates(file_path, updated_metadata['Created'], updated_metadata['Modified'])
-else:
-    print("Metadata not changed.")
+        # Update file system dates to match Excel metadata
+        update_file_system_dates(file_path, updated_metadata['Created'], updated_metadata['Modified'])
+    else:
+        print("Metadata not changed.")
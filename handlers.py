@@ -0,0 +1,138 @@
+"""Registry of format handlers, imported lazily on first use.
+
+A handler names its reader (and optional writer) as "module:function"
+strings, so registering every format costs nothing at startup; openpyxl,
+python-docx, PyPDF2 and PIL are only imported when a file that needs them
+is actually read.
+
+Readers take either a path or an open, seekable binary file (for example a
+member spooled out of an archive); open_binary() covers both.
+"""
+import contextlib
+import importlib
+import os
+import zipfile
+
+
+class FormatHandler:
+    """Reader/writer pair for one file format, resolved on first use."""
+
+    def __init__(self, name, extensions, reader, writer=None, magic=()):
+        self.name = name
+        self.extensions = tuple(extensions)
+        self.magic = tuple(magic)
+        self._reader_path = reader
+        self._writer_path = writer
+        self._reader = None
+        self._writer = None
+
+    def __repr__(self):
+        return f"FormatHandler({self.name!r}, {self.extensions!r})"
+
+    @staticmethod
+    def _resolve(path):
+        module_name, _, attribute = path.partition(':')
+        return getattr(importlib.import_module(module_name), attribute)
+
+    @property
+    def reader(self):
+        if self._reader is None:
+            self._reader = self._resolve(self._reader_path)
+        return self._reader
+
+    @property
+    def writer(self):
+        if self._writer is None and self._writer_path is not None:
+            self._writer = self._resolve(self._writer_path)
+        return self._writer
+
+
+_handlers = []
+_by_extension = {}
+
+# Bytes needed to recognise any registered magic number
+SNIFF_SIZE = 8
+
+# Top-level folder inside an OOXML zip -> handler name
+OOXML_FOLDERS = {'xl/': 'excel', 'word/': 'word', 'ppt/': 'powerpoint'}
+
+
+def register_handler(handler):
+    """Add a handler; later registrations win for a shared extension."""
+    _handlers.append(handler)
+    for extension in handler.extensions:
+        _by_extension[extension] = handler
+    return handler
+
+
+def get_handler(name):
+    for handler in _handlers:
+        if handler.name == name:
+            return handler
+    return None
+
+
+def supported_extensions():
+    return tuple(_by_extension)
+
+
+@contextlib.contextmanager
+def open_binary(source):
+    """Yield a binary file for a path, or the file-like itself rewound to its start (and left open)."""
+    if hasattr(source, 'read'):
+        source.seek(0)
+        yield source
+    else:
+        with open(source, 'rb') as f:
+            yield f
+
+
+def _sniff_zip(source):
+    try:
+        with zipfile.ZipFile(source) as zf:
+            for name in zf.namelist():
+                for folder, handler_name in OOXML_FOLDERS.items():
+                    if name.startswith(folder):
+                        return get_handler(handler_name)
+    except (OSError, zipfile.BadZipFile):
+        pass
+    return None
+
+
+def sniff_handler(source):
+    """Pick a handler from the leading magic bytes of a path or file-like, or None."""
+    try:
+        with open_binary(source) as f:
+            head = f.read(SNIFF_SIZE)
+    except OSError:
+        return None
+    if head.startswith(b'PK\x03\x04'):
+        return _sniff_zip(source)
+    for handler in _handlers:
+        if any(head.startswith(magic) for magic in handler.magic):
+            return handler
+    return None
+
+
+def handler_for(file_path, sniff=True, fileobj=None):
+    """Return the handler for file_path by extension, falling back to its magic bytes.
+
+    With fileobj, file_path is only a name and the magic bytes come from fileobj.
+    """
+    handler = _by_extension.get(os.path.splitext(file_path)[1].lower())
+    if handler is None and sniff:
+        handler = sniff_handler(fileobj if fileobj is not None else file_path)
+    return handler
+
+
+register_handler(FormatHandler('excel', ('.xlsx', '.xlsm'), 'metadata_core:get_excel_metadata',
+                               writer='ooxml_props:write_core_properties'))
+register_handler(FormatHandler('word', ('.docx', '.docm'), 'metadata_core:get_docx_metadata',
+                               writer='ooxml_props:write_core_properties'))
+register_handler(FormatHandler('powerpoint', ('.pptx', '.pptm'), 'metadata_core:get_pptx_metadata',
+                               writer='ooxml_props:write_core_properties'))
+register_handler(FormatHandler('pdf', ('.pdf',), 'metadata_core:get_pdf_metadata', magic=(b'%PDF-',)))
+register_handler(FormatHandler('image', ('.jpg', '.jpeg', '.png', '.gif', '.tif', '.tiff'),
+                               'metadata_core:get_image_metadata',
+                               magic=(b'\xff\xd8\xff', b'\x89PNG\r\n\x1a\n', b'GIF87a', b'GIF89a',
+                                      b'II*\x00', b'MM\x00*')))
@@ -0,0 +1,430 @@
+"""Read EXIF, IPTC and XMP metadata from image headers without decoding pixels.
+
+JPEG files are walked segment by segment up to the start of scan, PNG files
+chunk by chunk (image data chunks are skipped with a seek), GIF files up to
+the first image, and TIFF files IFD by IFD. Tag names match Pillow's
+PIL.ExifTags so results line up with the old Image._getexif() path; the GPS
+IFD is returned as a nested 'GPSInfo' dict and MakerNote as its file offset
+and length rather than its opaque bytes.
+
+Usage: python image_info.py FILE [FILE ...]
+"""
+import json
+import struct
+import sys
+import zlib
+
+from handlers import open_binary
+
+EXIF_TAGS = {
+    0x000b: 'ProcessingSoftware', 0x00fe: 'NewSubfileType', 0x0100: 'ImageWidth', 0x0101: 'ImageLength',
+    0x0102: 'BitsPerSample', 0x0103: 'Compression', 0x0106: 'PhotometricInterpretation',
+    0x010d: 'DocumentName', 0x010e: 'ImageDescription', 0x010f: 'Make', 0x0110: 'Model',
+    0x0111: 'StripOffsets', 0x0112: 'Orientation', 0x0115: 'SamplesPerPixel', 0x0116: 'RowsPerStrip',
+    0x0117: 'StripByteCounts', 0x011a: 'XResolution', 0x011b: 'YResolution', 0x011c: 'PlanarConfiguration',
+    0x0128: 'ResolutionUnit', 0x012d: 'TransferFunction', 0x0131: 'Software', 0x0132: 'DateTime',
+    0x013b: 'Artist', 0x013c: 'HostComputer', 0x013e: 'WhitePoint', 0x013f: 'PrimaryChromaticities',
+    0x0201: 'JpegIFOffset', 0x0202: 'JpegIFByteCount', 0x0211: 'YCbCrCoefficients',
+    0x0212: 'YCbCrSubSampling', 0x0213: 'YCbCrPositioning', 0x0214: 'ReferenceBlackWhite',
+    0x02bc: 'XMLPacket', 0x4746: 'Rating', 0x4749: 'RatingPercent', 0x8298: 'Copyright',
+    0x829a: 'ExposureTime', 0x829d: 'FNumber', 0x83bb: 'IptcNaaInfo', 0x8649: 'ImageResources',
+    0x8769: 'ExifOffset', 0x8773: 'InterColorProfile', 0x8822: 'ExposureProgram',
+    0x8824: 'SpectralSensitivity', 0x8825: 'GPSInfo', 0x8827: 'ISOSpeedRatings', 0x8828: 'OECF',
+    0x8830: 'SensitivityType', 0x8832: 'RecommendedExposureIndex', 0x9000: 'ExifVersion',
+    0x9003: 'DateTimeOriginal', 0x9004: 'DateTimeDigitized', 0x9010: 'OffsetTime',
+    0x9011: 'OffsetTimeOriginal', 0x9012: 'OffsetTimeDigitized', 0x9101: 'ComponentsConfiguration',
+    0x9102: 'CompressedBitsPerPixel', 0x9201: 'ShutterSpeedValue', 0x9202: 'ApertureValue',
+    0x9203: 'BrightnessValue', 0x9204: 'ExposureBiasValue', 0x9205: 'MaxApertureValue',
+    0x9206: 'SubjectDistance', 0x9207: 'MeteringMode', 0x9208: 'LightSource', 0x9209: 'Flash',
+    0x920a: 'FocalLength', 0x9214: 'SubjectLocation', 0x927c: 'MakerNote', 0x9286: 'UserComment',
+    0x9290: 'SubsecTime', 0x9291: 'SubsecTimeOriginal', 0x9292: 'SubsecTimeDigitized',
+    0x9c9b: 'XPTitle', 0x9c9c: 'XPComment', 0x9c9d: 'XPAuthor', 0x9c9e: 'XPKeywords', 0x9c9f: 'XPSubject',
+    0xa000: 'FlashPixVersion', 0xa001: 'ColorSpace', 0xa002: 'ExifImageWidth', 0xa003: 'ExifImageHeight',
+    0xa004: 'RelatedSoundFile', 0xa005: 'ExifInteroperabilityOffset', 0xa20b: 'FlashEnergy',
+    0xa20e: 'FocalPlaneXResolution', 0xa20f: 'FocalPlaneYResolution', 0xa210: 'FocalPlaneResolutionUnit',
+    0xa214: 'SubjectLocation', 0xa215: 'ExposureIndex', 0xa217: 'SensingMethod', 0xa300: 'FileSource',
+    0xa301: 'SceneType', 0xa302: 'CFAPattern', 0xa401: 'CustomRendered', 0xa402: 'ExposureMode',
+    0xa403: 'WhiteBalance', 0xa404: 'DigitalZoomRatio', 0xa405: 'FocalLengthIn35mmFilm',
+    0xa406: 'SceneCaptureType', 0xa407: 'GainControl', 0xa408: 'Contrast', 0xa409: 'Saturation',
+    0xa40a: 'Sharpness', 0xa40b: 'DeviceSettingDescription', 0xa40c: 'SubjectDistanceRange',
+    0xa420: 'ImageUniqueID', 0xa430: 'CameraOwnerName', 0xa431: 'BodySerialNumber',
+    0xa432: 'LensSpecification', 0xa433: 'LensMake', 0xa434: 'LensModel', 0xa435: 'LensSerialNumber',
+    0xa500: 'Gamma',
+}
+
+GPS_TAGS = {
+    0x00: 'GPSVersionID', 0x01: 'GPSLatitudeRef', 0x02: 'GPSLatitude', 0x03: 'GPSLongitudeRef',
+    0x04: 'GPSLongitude', 0x05: 'GPSAltitudeRef', 0x06: 'GPSAltitude', 0x07: 'GPSTimeStamp',
+    0x08: 'GPSSatellites', 0x09: 'GPSStatus', 0x0a: 'GPSMeasureMode', 0x0b: 'GPSDOP',
+    0x0c: 'GPSSpeedRef', 0x0d: 'GPSSpeed', 0x0e: 'GPSTrackRef', 0x0f: 'GPSTrack',
+    0x10: 'GPSImgDirectionRef', 0x11: 'GPSImgDirection', 0x12: 'GPSMapDatum',
+    0x13: 'GPSDestLatitudeRef', 0x14: 'GPSDestLatitude', 0x15: 'GPSDestLongitudeRef',
+    0x16: 'GPSDestLongitude', 0x17: 'GPSDestBearingRef', 0x18: 'GPSDestBearing',
+    0x19: 'GPSDestDistanceRef', 0x1a: 'GPSDestDistance', 0x1b: 'GPSProcessingMethod',
+    0x1c: 'GPSAreaInformation', 0x1d: 'GPSDateStamp', 0x1e: 'GPSDifferential', 0x1f: 'GPSHPositioningError',
+}
+
+INTEROP_TAGS = {0x0001: 'InteroperabilityIndex', 0x0002: 'InteroperabilityVersion'}
+
+# IPTC-IIM application record (record 2) dataset names
+IPTC_TAGS = {
+    5: 'ObjectName', 15: 'Category', 20: 'SupplementalCategories', 25: 'Keywords', 40: 'SpecialInstructions',
+    55: 'DateCreated', 60: 'TimeCreated', 80: 'By-line', 85: 'By-lineTitle', 90: 'City', 92: 'Sub-location',
+    95: 'Province-State', 100: 'Country-PrimaryLocationCode', 101: 'Country-PrimaryLocationName',
+    103: 'OriginalTransmissionReference', 105: 'Headline', 110: 'Credit', 115: 'Source',
+    116: 'CopyrightNotice', 118: 'Contact', 120: 'Caption-Abstract', 122: 'Writer-Editor',
+}
+
+# IPTC datasets that may repeat and are returned as lists
+IPTC_REPEATABLE = (20, 25, 80, 85, 118, 122)
+
+# Sub-IFD pointers followed while walking the chain
+EXIF_IFD = 0x8769
+GPS_IFD = 0x8825
+INTEROP_IFD = 0xa005
+SUB_IFDS = (EXIF_IFD, GPS_IFD, INTEROP_IFD)
+MAKER_NOTE = 0x927c
+
+# TIFF field type -> (struct code, size in bytes)
+TIFF_TYPES = {
+    1: ('B', 1), 2: ('s', 1), 3: ('H', 2), 4: ('L', 4), 5: ('LL', 8), 6: ('b', 1), 7: ('s', 1),
+    8: ('h', 2), 9: ('l', 4), 10: ('ll', 8), 11: ('f', 4), 12: ('d', 8), 13: ('L', 4),
+}
+
+# Undefined-type tags that hold ASCII text
+ASCII_UNDEFINED = (0x9000, 0xa000, 0x0002)
+
+# Windows XP* tags are UTF-16LE in BYTE arrays
+XP_TAGS = (0x9c9b, 0x9c9c, 0x9c9d, 0x9c9e, 0x9c9f)
+
+MAX_IFD_ENTRIES = 1000
+
+XMP_JPEG_HEADER = b'http://ns.adobe.com/xap/1.0/\x00'
+XMP_PNG_KEYWORD = 'XML:com.adobe.xmp'
+PHOTOSHOP_HEADER = b'Photoshop 3.0\x00'
+IPTC_RESOURCE_ID = 0x0404
+
+# Bytes read up front from a JPEG; EXIF and XMP segments almost always fit
+JPEG_HEAD_SIZE = 64 * 1024
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+TIFF_SIGNATURES = (b'II*\x00', b'MM\x00*')
+
+USER_COMMENT_CODES = {b'ASCII\x00\x00\x00': 'ascii', b'UNICODE\x00': 'utf-16', b'JIS\x00\x00\x00\x00\x00': 'shift_jis'}
+
+
+class ImageMetadataError(ValueError):
+    """Raised when a file is not an image this module understands."""
+
+
+def _rational(numerator, denominator):
+    return numerator / denominator if denominator else None
+
+
+class _TiffReader:
+    """Decode IFDs from TIFF data reached through read(offset, size)."""
+
+    def __init__(self, read, base=0):
+        self.read = read
+        # File offset of the TIFF header, so MakerNote offsets can be absolute
+        self.base = base
+        header = read(0, 8)
+        if header[:4] not in TIFF_SIGNATURES:
+            raise ImageMetadataError("Bad TIFF header")
+        self.endian = '<' if header[:2] == b'II' else '>'
+        self.entry = struct.Struct(self.endian + 'HHL4s')
+        self.pointer = struct.Struct(self.endian + 'L')
+        self.first_ifd = self.pointer.unpack(header[4:8])[0]
+        self.seen = set()
+
+    def _value(self, tag, field_type, count, value_bytes):
+        if field_type == 2:
+            return value_bytes.split(b'\x00', 1)[0].decode('utf-8', errors='replace').strip()
+        if tag in XP_TAGS:
+            return value_bytes.decode('utf-16-le', errors='replace').rstrip('\x00')
+        if field_type == 7:
+            if tag == 0x9286:
+                encoding = USER_COMMENT_CODES.get(value_bytes[:8])
+                if encoding:
+                    return value_bytes[8:].decode(encoding, errors='replace').rstrip('\x00 ')
+                return value_bytes[8:].rstrip(b'\x00 ').decode('latin-1')
+            if tag in ASCII_UNDEFINED:
+                return value_bytes.decode('ascii', errors='replace')
+            return value_bytes
+        values = struct.unpack(self.endian + TIFF_TYPES[field_type][0] * count, value_bytes)
+        if field_type in (5, 10):
+            values = tuple(_rational(values[i], values[i + 1]) for i in range(0, len(values), 2))
+        return values[0] if len(values) == 1 else values
+
+    def ifd(self, offset, names):
+        """Return ({name: value}, {sub-IFD tag: offset}, next IFD offset) for the IFD at offset."""
+        if not offset or offset in self.seen:
+            return {}, {}, 0
+        self.seen.add(offset)
+        head = self.read(offset, 2)
+        if len(head) < 2:
+            return {}, {}, 0
+        count = min(struct.unpack(self.endian + 'H', head)[0], MAX_IFD_ENTRIES)
+        table = self.read(offset + 2, count * 12 + 4)
+        count = min(count, len(table) // 12)
+        result = {}
+        pointers = {}
+        for tag, field_type, n, inline in self.entry.iter_unpack(table[:count * 12]):
+            field = TIFF_TYPES.get(field_type)
+            if field is None:
+                continue
+            size = field[1] * n
+            if size <= 4:
+                value_bytes = inline[:size]
+            else:
+                value_offset = self.pointer.unpack(inline)[0]
+                if tag == MAKER_NOTE:
+                    result['MakerNoteOffset'] = self.base + value_offset
+                    result['MakerNoteLength'] = size
+                    continue
+                value_bytes = self.read(value_offset, size)
+                if len(value_bytes) < size:
+                    continue  # points past the end of the data
+            if tag in SUB_IFDS:
+                pointers[tag] = self.pointer.unpack(inline)[0]
+                continue
+            result[names.get(tag) or f"0x{tag:04x}"] = self._value(tag, field_type, n, value_bytes)
+        tail = table[count * 12:count * 12 + 4]
+        next_offset = self.pointer.unpack(tail)[0] if len(tail) == 4 else 0
+        return result, pointers, next_offset
+
+    def metadata(self):
+        """Merge IFD0, the Exif and Interop IFDs, nest GPS, and put IFD1 under 'Thumbnail'."""
+        result, pointers, next_offset = self.ifd(self.first_ifd, EXIF_TAGS)
+        if EXIF_IFD in pointers:
+            exif, exif_pointers, _ = self.ifd(pointers[EXIF_IFD], EXIF_TAGS)
+            result.update(exif)
+            pointers.update(exif_pointers)
+        if INTEROP_IFD in pointers:
+            interop, _, _ = self.ifd(pointers[INTEROP_IFD], INTEROP_TAGS)
+            if interop:
+                result['Interoperability'] = interop
+        if GPS_IFD in pointers:
+            gps, _, _ = self.ifd(pointers[GPS_IFD], GPS_TAGS)
+            result['GPSInfo'] = gps
+        if next_offset:
+            thumbnail, _, _ = self.ifd(next_offset, EXIF_TAGS)
+            if thumbnail:
+                result['Thumbnail'] = thumbnail
+        return result
+
+
+def parse_tiff(data, base=0):
+    """Decode EXIF from an in-memory TIFF block (a JPEG APP1 or PNG eXIf payload)."""
+    return _TiffReader(lambda offset, size: data[offset:offset + size], base).metadata()
+
+
+def parse_iptc(data):
+    """Decode IPTC-IIM application records from a Photoshop APP13 payload."""
+    result = {}
+    pos = 0
+    while pos + 12 <= len(data) and data[pos:pos + 4] == b'8BIM':
+        resource_id = struct.unpack_from('>H', data, pos + 4)[0]
+        name_length = data[pos + 6]
+        pos += 7 + name_length + ((name_length + 1) % 2)  # Pascal string padded to even length
+        size = struct.unpack_from('>L', data, pos)[0]
+        pos += 4
+        block = data[pos:pos + size]
+        pos += size + (size % 2)
+        if resource_id != IPTC_RESOURCE_ID:
+            continue
+        i = 0
+        while i + 5 <= len(block) and block[i] == 0x1c:
+            record, dataset, length = block[i + 1], block[i + 2], struct.unpack_from('>H', block, i + 3)[0]
+            value = block[i + 5:i + 5 + length].decode('utf-8', errors='replace')
+            i += 5 + length
+            if record != 2 or dataset == 0:
+                continue
+            name = IPTC_TAGS.get(dataset, f"2:{dataset}")
+            if dataset in IPTC_REPEATABLE:
+                result.setdefault(name, []).append(value)
+            else:
+                result[name] = value
+    return result
+
+
+def _read_jpeg(f):
+    result = {}
+    f.seek(0)
+    data = f.read(JPEG_HEAD_SIZE)
+    base = 0  # file offset of data[0]
+    pos = 2
+    while True:
+        # Segments are parsed from memory; skipped ones are seeked past
+        if pos + 4 > len(data):
+            f.seek(base + pos)
+            base += pos
+            pos = 0
+            data = f.read(JPEG_HEAD_SIZE)
+            if len(data) < 4:
+                break
+        if data[pos] != 0xff:
+            break
+        kind = data[pos + 1]
+        if kind == 0xff:  # fill byte
+            pos += 1
+            continue
+        if kind in (0xd9, 0xda):  # end of image / start of scan: no more metadata
+            break
+        if 0xd0 <= kind <= 0xd7 or kind == 0x01:
+            pos += 2
+            continue
+        length = (data[pos + 2] << 8) | data[pos + 3]
+        end = pos + 2 + length
+        if kind not in (0xe1, 0xed, 0xfe):
+            pos = end
+            continue
+        if end > len(data):
+            data += f.read(end - len(data))
+        segment = data[pos + 4:end]
+        if kind == 0xe1:
+            if segment.startswith(b'Exif\x00\x00') and 'Exif' not in result:
+                result['Exif'] = parse_tiff(segment[6:], base=base + pos + 10)
+            elif segment.startswith(XMP_JPEG_HEADER):
+                result['XMP'] = segment[len(XMP_JPEG_HEADER):].decode('utf-8', errors='replace')
+        elif kind == 0xed:
+            if segment.startswith(PHOTOSHOP_HEADER):
+                iptc = parse_iptc(segment[len(PHOTOSHOP_HEADER):])
+                if iptc:
+                    result['IPTC'] = iptc
+        else:
+            result['Comment'] = segment.decode('utf-8', errors='replace')
+        pos = end
+    return result
+
+
+def _read_png(f):
+    result = {}
+    text = {}
+    f.seek(len(PNG_SIGNATURE))
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            break
+        length, kind = struct.unpack('>L4s', header)
+        if kind == b'IEND':
+            break
+        if kind not in (b'tEXt', b'zTXt', b'iTXt', b'eXIf'):
+            f.seek(length + 4, 1)  # skip data and CRC
+            continue
+        data = f.read(length)
+        f.seek(4, 1)
+        try:
+            if kind == b'eXIf':
+                result['Exif'] = parse_tiff(data)
+                continue
+            keyword, _, rest = data.partition(b'\x00')
+            keyword = keyword.decode('latin-1')
+            if kind == b'tEXt':
+                value = rest.decode('latin-1')
+            elif kind == b'zTXt':
+                value = zlib.decompress(rest[1:]).decode('latin-1')
+            else:
+                compressed, rest = rest[0], rest[2:]
+                _language, _, rest = rest.partition(b'\x00')
+                _translated, _, rest = rest.partition(b'\x00')
+                value = (zlib.decompress(rest) if compressed else rest).decode('utf-8', errors='replace')
+        except (zlib.error, IndexError, ImageMetadataError):
+            continue
+        if keyword == XMP_PNG_KEYWORD:
+            result['XMP'] = value
+        else:
+            text[keyword] = value
+    if text:
+        result['Text'] = text
+    return result
+
+
+def _read_gif(f):
+    result = {}
+    f.seek(0)
+    header = f.read(13)
+    flags = header[10]
+    if flags & 0x80:
+        f.seek(3 << ((flags & 0x07) + 1), 1)  # global colour table
+    while True:
+        introducer = f.read(1)
+        if introducer != b'\x21':
+            break  # image descriptor or trailer: no pixels are read
+        label = f.read(1)
+        blocks = bytearray()
+        first = None
+        while True:
+            size = f.read(1)
+            if not size or size == b'\x00':
+                break
+            block = f.read(size[0])
+            if first is None:
+                first = block
+            else:
+                blocks += block
+        if label == b'\xfe':
+            result['Comment'] = ((first or b'') + blocks).decode('latin-1')
+        elif label == b'\xff' and first == b'XMP DataXMP':
+            # XMP sub-blocks are stored raw; the magic trailer ends in \x01\x00
+            packet = bytes(blocks)
+            end = packet.rfind(b'<?xpacket end=')
+            end = packet.find(b'>', end) + 1 if end >= 0 else len(packet)
+            result['XMP'] = packet[:end].decode('utf-8', errors='replace')
+    return result
+
+
+def _read_tiff(f):
+    def read(offset, size):
+        f.seek(offset)
+        return f.read(size)
+    return {'Exif': _TiffReader(read).metadata()}
+
+
+def read_image_headers(file_path):
+    """Return {'Exif': {...}, 'XMP': str, 'IPTC': {...}, 'Text': {...}, 'Comment': str}, as present.
+
+    file_path may also be an open, seekable binary file.
+    """
+    with open_binary(file_path) as f:
+        head = f.read(8)
+        if head.startswith(b'\xff\xd8'):
+            return _read_jpeg(f)
+        if head.startswith(PNG_SIGNATURE):
+            return _read_png(f)
+        if head.startswith((b'GIF87a', b'GIF89a')):
+            return _read_gif(f)
+        if head.startswith(TIFF_SIGNATURES):
+            return _read_tiff(f)
+    raise ImageMetadataError(f"Unrecognised image format: {file_path}")
+
+
+def read_image_metadata(file_path):
+    """Flatten read_image_headers into one dict keyed like get_image_metadata."""
+    try:
+        headers = read_image_headers(file_path)
+    except (struct.error, IndexError) as e:
+        raise ImageMetadataError(f"Truncated or corrupt image header: {e}") from e
+    metadata = dict(headers.pop('Exif', {}))
+    metadata.update(headers.pop('Text', {}))
+    metadata.update(headers)
+    return metadata
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        return 2
+    for file_path in argv:
+        try:
+            metadata = read_image_metadata(file_path)
+        except (OSError, ImageMetadataError) as e:
+            print(f"{file_path}: {e}", file=sys.stderr)
+            continue
+        print(json.dumps({'path': file_path, 'metadata': metadata}, default=repr))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
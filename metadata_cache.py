@@ -0,0 +1,256 @@
+"""Persistent SQLite cache of extracted metadata keyed on file identity."""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.metatool', 'metadata_cache.sqlite')
+
+# Limits the command-line tools apply unless told otherwise
+DEFAULT_MAX_ENTRIES = 100000
+DEFAULT_MAX_AGE_DAYS = 90
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    sha256 TEXT,
+    metadata TEXT NOT NULL,
+    issues TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    PRIMARY KEY (dev, ino)
+);
+CREATE INDEX IF NOT EXISTS entries_path ON entries (path);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE TABLE IF NOT EXISTS digests (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    algorithm TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (dev, ino, algorithm)
+);
+"""
+
+
+def encode_value(value):
+    """Make a metadata value JSON-safe, keeping datetimes and bytes round-trippable."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, datetime):
+        return {'__datetime__': value.isoformat()}
+    if isinstance(value, bytes):
+        return {'__bytes__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, dict):
+        return {str(key): encode_value(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    # PyPDF2 string objects, PIL rationals and the like
+    return str(value)
+
+
+def decode_hook(obj):
+    """json object_hook turning the dicts encode_value made back into datetimes and bytes."""
+    if '__datetime__' in obj:
+        return datetime.fromisoformat(obj['__datetime__'])
+    if '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    return obj
+
+
+def dumps(metadata):
+    return json.dumps(encode_value(metadata), separators=(',', ':'))
+
+
+def loads(text):
+    return json.loads(text, object_hook=decode_hook)
+
+
+class MetadataCache:
+    """Cache of metadata dicts and issues, keyed on (device, inode, size, mtime_ns).
+
+    The row for a file is found by (device, inode), so a renamed file is
+    still a hit (its path is updated), while an in-place edit changes size
+    or mtime_ns and turns into a miss that is replaced on the next put.
+    Entries older than max_age seconds, or beyond the max_entries least
+    recently used, are dropped by evict().
+    """
+
+    def __init__(self, db_path=DEFAULT_CACHE_PATH, max_entries=None, max_age=None):
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self.digest_hits = 0
+        self.digest_misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.evict()
+        self.close()
+
+    def _lookup(self, file_path, st):
+        if st is None:
+            st = os.stat(file_path)
+        row = self._conn.execute(
+            'SELECT size, mtime_ns, path, sha256, metadata, issues FROM entries WHERE dev = ? AND ino = ?',
+            (st.st_dev, st.st_ino)).fetchone()
+        if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+            return st, None
+        return st, row
+
+    def get(self, file_path, st=None, verify_hash=False):
+        """Return (metadata, issues) for an unchanged file, or None on a miss.
+
+        st may be passed when the caller already has the file's stat result.
+        With verify_hash, a stored SHA-256 is recomputed and compared, which
+        guards against inode reuse at the cost of reading the file.
+        """
+        with self._lock:
+            st, row = self._lookup(file_path, st)
+            if row is not None and verify_hash and row[3]:
+                from metadata_core import calculate_hash
+                if calculate_hash(file_path) != row[3]:
+                    row = None
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            if row[2] != file_path:
+                self._conn.execute('UPDATE entries SET path = ?, accessed_at = ? WHERE dev = ? AND ino = ?',
+                                   (file_path, time.time(), st.st_dev, st.st_ino))
+            else:
+                self._conn.execute('UPDATE entries SET accessed_at = ? WHERE dev = ? AND ino = ?',
+                                   (time.time(), st.st_dev, st.st_ino))
+            return loads(row[4]), loads(row[5])
+
+    def get_hash(self, file_path, st=None):
+        """Return the stored SHA-256 of an unchanged file, or None."""
+        digests = self.get_digests(file_path, ('sha256',), st)
+        if digests is not None:
+            return digests['sha256']
+        with self._lock:
+            _, row = self._lookup(file_path, st)
+            return row[3] if row is not None else None
+
+    def get_digests(self, file_path, algorithms, st=None):
+        """Return {algorithm: hexdigest} if every requested digest is stored for the unchanged file."""
+        if st is None:
+            st = os.stat(file_path)
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT algorithm, digest FROM digests WHERE dev = ? AND ino = ? AND size = ? AND mtime_ns = ?',
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)).fetchall()
+            stored = dict(rows)
+            if not all(algorithm in stored for algorithm in algorithms):
+                self.digest_misses += 1
+                return None
+            self.digest_hits += 1
+        return {algorithm: stored[algorithm] for algorithm in algorithms}
+
+    def put_digests(self, file_path, digests, st=None):
+        """Store {algorithm: hexdigest} computed for file_path."""
+        if st is None:
+            st = os.stat(file_path)
+        now = time.time()
+        with self._lock:
+            # Digests of an older version of this inode are no longer valid
+            self._conn.execute(
+                'DELETE FROM digests WHERE dev = ? AND ino = ? AND (size != ? OR mtime_ns != ?)',
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, algorithm, digest, now)
+                 for algorithm, digest in digests.items()])
+
+    def put(self, file_path, metadata, issues, st=None, sha256=None):
+        """Store the metadata and issues extracted from file_path.
+
+        Pass the stat result taken before extraction so that an edit made
+        while the file was being parsed is seen as a change next time.
+        """
+        if st is None:
+            st = os.stat(file_path)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, file_path, sha256,
+                 dumps(metadata), dumps(issues), now, now))
+
+    def invalidate(self, file_path):
+        """Drop any entry for file_path, by identity and by path."""
+        with self._lock:
+            try:
+                st = os.stat(file_path)
+                self._conn.execute('DELETE FROM entries WHERE dev = ? AND ino = ?', (st.st_dev, st.st_ino))
+                self._conn.execute('DELETE FROM digests WHERE dev = ? AND ino = ?', (st.st_dev, st.st_ino))
+            except OSError:
+                pass
+            self._conn.execute('DELETE FROM entries WHERE path = ?', (file_path,))
+
+    def evict(self):
+        """Apply the age and size limits; returns the number of entries removed."""
+        removed = 0
+        with self._lock:
+            if self.max_age is not None:
+                cutoff = time.time() - self.max_age
+                removed += self._conn.execute('DELETE FROM entries WHERE stored_at < ?', (cutoff,)).rowcount
+                self._conn.execute('DELETE FROM digests WHERE stored_at < ?', (cutoff,))
+            if self.max_entries is not None:
+                removed += self._conn.execute(
+                    'DELETE FROM entries WHERE rowid IN (SELECT rowid FROM entries '
+                    'ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)', (self.max_entries,)).rowcount
+                self._conn.execute(
+                    'DELETE FROM digests WHERE (dev, ino) NOT IN (SELECT dev, ino FROM digests '
+                    'GROUP BY dev, ino ORDER BY MAX(stored_at) DESC LIMIT ?)', (self.max_entries,))
+            self._conn.commit()
+        return removed
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+
+    def stats(self):
+        """Entry count and lookup counters; digest lookups are counted apart from metadata lookups."""
+        with self._lock:
+            hits, misses = self.hits, self.misses
+            digest_hits, digest_misses = self.digest_hits, self.digest_misses
+        lookups = hits + misses
+        return {
+            'entries': len(self),
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'digest_hits': digest_hits,
+            'digest_misses': digest_misses,
+        }
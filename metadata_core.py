@@ -0,0 +1,160 @@
+"""Format-independent metadata API shared by the GUI, the CLI and the batch tools.
+
+Third-party parsers are imported inside the functions that need them so
+that importing this module stays cheap.
+"""
+from ooxml_props import read_core_properties, CorePropertiesError
+from pdf_info import read_pdf_info, PdfInfoError
+from image_info import read_image_metadata, ImageMetadataError
+from rules import DEFAULT_RULES
+from hashing import hash_file
+from tracing import span
+import handlers
+
+
+class UnsupportedFileError(ValueError):
+    """Raised when no metadata reader handles a file's extension."""
+
+
+def get_excel_metadata(file_path):
+    """Retrieve metadata from an Excel file."""
+    try:
+        return read_core_properties(file_path)
+    except CorePropertiesError:
+        pass  # Fall back to a full workbook load below
+
+    from openpyxl import load_workbook
+    wb = load_workbook(file_path)
+    metadata = wb.properties
+    
+    metadata_dict = {
+        'Title': metadata.title,
+        'Subject': metadata.subject,
+        'Creator': metadata.creator,
+        'Keywords': metadata.keywords,
+        'Description': metadata.description,
+        'Last Modified By': metadata.lastModifiedBy,
+        'Revision': metadata.revision,
+        'Created': metadata.created,
+        'Modified': metadata.modified,
+        'Category': metadata.category,
+        'Content Status': metadata.contentStatus,
+        'Language': metadata.language,
+        'Identifier': metadata.identifier
+    }
+    
+    return metadata_dict
+
+
+def get_pdf_metadata(file_path):
+    """Retrieve metadata from a PDF file."""
+    try:
+        return read_pdf_info(file_path)
+    except PdfInfoError:
+        pass  # Damaged or encrypted; let PyPDF2 reconstruct it below
+
+    from PyPDF2 import PdfReader
+    with handlers.open_binary(file_path) as f:
+        reader = PdfReader(f)
+        metadata = reader.metadata
+    
+    if metadata is None:
+        return {}
+    metadata_dict = {key[1:]: value for key, value in metadata.items()}
+    return metadata_dict
+
+
+def get_image_metadata(file_path):
+    """Retrieve metadata from an image file."""
+    try:
+        return read_image_metadata(file_path)
+    except ImageMetadataError:
+        pass  # Unknown or damaged header; let Pillow try below
+
+    from PIL import Image
+    from PIL.ExifTags import TAGS
+    with handlers.open_binary(file_path) as f, Image.open(f) as image:
+        exif = image.getexif()
+        info = dict(exif)
+        info.update(exif.get_ifd(0x8769))
+    
+    metadata_dict = {TAGS.get(tag, tag): value for tag, value in info.items()}
+    return metadata_dict
+
+
+def get_docx_metadata(file_path):
+    """Retrieve metadata from a DOCX file."""
+    try:
+        return read_core_properties(file_path)
+    except CorePropertiesError:
+        pass  # Fall back to a full document load below
+
+    from docx import Document
+    doc = Document(file_path)
+    core_props = doc.core_properties
+    
+    metadata_dict = {
+        'Title': core_props.title,
+        'Subject': core_props.subject,
+        'Creator': core_props.author,
+        'Keywords': core_props.keywords,
+        'Description': core_props.comments,
+        'Last Modified By': core_props.last_modified_by,
+        'Revision': core_props.revision,
+        'Created': core_props.created,
+        'Modified': core_props.modified,
+        'Category': core_props.category,
+        'Content Status': core_props.content_status,
+        'Language': core_props.language,
+        'Identifier': core_props.identifier
+    }
+    
+    return metadata_dict
+
+
+def get_pptx_metadata(file_path):
+    """Retrieve metadata from a PPTX file."""
+    return read_core_properties(file_path)
+
+
+def calculate_hash(file_path, algorithm='sha256', progress=None):
+    """Calculate and return the hash of the file."""
+    return hash_file(file_path, (algorithm,), progress)[algorithm]
+
+
+def compare_to_industry_standards(metadata, rules=None):
+    """Compare metadata to industry standards and identify potential issues.
+
+    `rules` is a rules.RuleSet; the default is the built-in Creator and
+    Revision checks.
+    """
+    return (rules or DEFAULT_RULES).check(metadata)
+
+
+SUPPORTED_EXTENSIONS = handlers.supported_extensions()
+
+
+def get_metadata(file_path, fileobj=None):
+    """Retrieve metadata from any supported file, picking the reader by extension or content.
+
+    With fileobj (an open, seekable binary file such as an archive member),
+    metadata is read from it and file_path only names it.
+    """
+    handler = handlers.handler_for(file_path, fileobj=fileobj)
+    if handler is None:
+        raise UnsupportedFileError(f"The file type of {file_path} is not supported.")
+    with span('read', file_path):
+        return handler.reader(fileobj if fileobj is not None else file_path)
+
+
+def set_metadata(file_path, new_metadata):
+    """Write new metadata to any file whose format has a writer; returns the metadata read back.
+
+    The change is appended to the audit log (see audit_log.py).
+    """
+    from audit_log import recording
+    handler = handlers.handler_for(file_path)
+    if handler is None or handler.writer is None:
+        raise UnsupportedFileError(f"Writing metadata to {file_path} is not supported.")
+    with span('save', file_path), recording(file_path, 'set_metadata'):
+        return handler.writer(file_path, new_metadata)
@@ -0,0 +1,391 @@
+"""Read and write OOXML (.xlsx/.docx/.pptx) document properties straight from the zip container."""
+import copy
+import os
+import re
+import tempfile
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+from tracing import span
+
+CORE_PART = 'docProps/core.xml'
+APP_PART = 'docProps/app.xml'
+
+NS = {
+    'cp': 'http://schemas.openxmlformats.org/package/2006/metadata/core-properties',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+    'dcterms': 'http://purl.org/dc/terms/',
+    'xsi': 'http://www.w3.org/2001/XMLSchema-instance',
+    'ep': 'http://schemas.openxmlformats.org/officeDocument/2006/extended-properties',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+    'vt': 'http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes',
+}
+
+CORE_REL_TYPE = 'http://schemas.openxmlformats.org/package/2006/relationships/metadata/core-properties'
+APP_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/extended-properties'
+APP_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.extended-properties+xml'
+
+CONTENT_TYPES_PART = '[Content_Types].xml'
+RELS_PART = '_rels/.rels'
+
+# Starting point for docProps/app.xml in packages written without one
+EMPTY_APP_XML = f'<Properties xmlns="{NS["ep"]}" xmlns:vt="{NS["vt"]}"/>'.encode()
+
+# Display key -> element in core.xml, in the order the GUI shows them.
+CORE_PROPERTIES = {
+    'Title': 'dc:title',
+    'Subject': 'dc:subject',
+    'Creator': 'dc:creator',
+    'Keywords': 'cp:keywords',
+    'Description': 'dc:description',
+    'Last Modified By': 'cp:lastModifiedBy',
+    'Revision': 'cp:revision',
+    'Created': 'dcterms:created',
+    'Modified': 'dcterms:modified',
+    'Category': 'cp:category',
+    'Content Status': 'cp:contentStatus',
+    'Language': 'dc:language',
+    'Identifier': 'dc:identifier',
+}
+
+DATE_PROPERTIES = ('Created', 'Modified')
+
+# Display key -> element in app.xml for the extended properties that can be edited.
+APP_PROPERTIES = {
+    'Company': 'ep:Company',
+    'Manager': 'ep:Manager',
+    'Application': 'ep:Application',
+    'App Version': 'ep:AppVersion',
+    'Template': 'ep:Template',
+    'Hyperlink Base': 'ep:HyperlinkBase',
+}
+
+OOXML_EXTENSIONS = ('.xlsx', '.xlsm', '.docx', '.docm', '.pptx', '.pptm')
+
+COPY_BUFFER_SIZE = 1024 * 1024
+
+for _prefix in ('cp', 'dc', 'dcterms', 'xsi'):
+    ET.register_namespace(_prefix, NS[_prefix])
+ET.register_namespace('vt', NS['vt'])
+
+
+class CorePropertiesError(ValueError):
+    """Raised when a file is not a readable OOXML package."""
+
+
+def _qname(name):
+    prefix, local = name.split(':')
+    return f"{{{NS[prefix]}}}{local}"
+
+
+def parse_w3cdtf(text):
+    """Parse a W3CDTF timestamp into a naive UTC datetime, or None."""
+    if not text:
+        return None
+    text = text.strip()
+    for fmt in ('%Y-%m-%dT%H:%M:%S.%f%z', '%Y-%m-%dT%H:%M:%S%z', '%Y-%m-%dT%H:%M%z',
+                '%Y-%m-%dT%H:%M:%S.%f', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d', '%Y-%m', '%Y'):
+        try:
+            value = datetime.strptime(text.replace('Z', '+00:00'), fmt)
+        except ValueError:
+            continue
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    return None
+
+
+def format_w3cdtf(value):
+    """Format a datetime as W3CDTF; naive values are taken to be UTC."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def next_revision(revision):
+    """Return the Revision to write after a change: a number counts up, a missing one starts at '1'.
+
+    Any other value (e.g. '1.2' or 'draft') is returned unchanged.
+    """
+    if not revision:
+        return '1'
+    text = str(revision).strip()
+    return str(int(text) + 1) if text.isdigit() else revision
+
+
+def _split_camel(name):
+    return re.sub(r'(?<=[a-z])(?=[A-Z])', ' ', name)
+
+
+def find_part(zf, default, rel_type):
+    """Locate a package part, following _rels/.rels when it is not in the default place."""
+    names = set(zf.namelist())
+    if default in names:
+        return default
+    if '_rels/.rels' not in names:
+        return None
+    rels = ET.fromstring(zf.read('_rels/.rels'))
+    for rel in rels.iter(f"{{{NS['rel']}}}Relationship"):
+        if rel.get('Type') == rel_type:
+            target = rel.get('Target', '').lstrip('/')
+            return target if target in names else None
+    return None
+
+
+def parse_core_xml(data):
+    """Turn the bytes of a core.xml part into the metadata dict."""
+    root = ET.fromstring(data)
+    metadata_dict = {}
+    for key, name in CORE_PROPERTIES.items():
+        element = root.find(_qname(name))
+        if element is None:
+            metadata_dict[key] = None
+        elif key in DATE_PROPERTIES:
+            metadata_dict[key] = parse_w3cdtf(element.text)
+        else:
+            metadata_dict[key] = element.text or ''
+    return metadata_dict
+
+
+def parse_app_xml(data):
+    """Turn the bytes of an app.xml part into a dict of the simple extended properties."""
+    root = ET.fromstring(data)
+    app_dict = {}
+    for element in root:
+        if len(element):
+            # HeadingPairs, TitlesOfParts and friends are vectors, not single values
+            continue
+        local = element.tag.rsplit('}', 1)[-1]
+        app_dict[_split_camel(local)] = element.text or ''
+    return app_dict
+
+
+def read_core_properties(file_path, include_app=False):
+    """Retrieve metadata from an OOXML file by parsing only docProps/core.xml.
+
+    Only the zip central directory and the (tiny) properties parts are read,
+    so the cost does not depend on how many sheets, pages or slides the file
+    holds. Returns the same keys as get_excel_metadata/get_docx_metadata;
+    with include_app the docProps/app.xml values are added as extra keys.
+
+    A property whose element is absent is None (python-docx reported ''
+    for absent text properties); an element that is present but empty is
+    ''. Callers that display or write values back must not turn None into
+    the text 'None'.
+    """
+    try:
+        with span('open', file_path):
+            zf = zipfile.ZipFile(file_path)
+        with zf, span('parse', file_path):
+            core_name = find_part(zf, CORE_PART, CORE_REL_TYPE)
+            if core_name is None:
+                metadata_dict = dict.fromkeys(CORE_PROPERTIES)
+            else:
+                metadata_dict = parse_core_xml(zf.read(core_name))
+
+            if include_app:
+                app_name = find_part(zf, APP_PART, APP_REL_TYPE)
+                if app_name is not None:
+                    for key, value in parse_app_xml(zf.read(app_name)).items():
+                        metadata_dict.setdefault(key, value)
+    except (zipfile.BadZipFile, ET.ParseError, KeyError) as e:
+        raise CorePropertiesError(f"Cannot read document properties from {file_path}: {e}") from e
+
+    return metadata_dict
+
+
+def build_core_xml(data, new_metadata):
+    """Return core.xml bytes with the properties in new_metadata replaced.
+
+    Keys missing from new_metadata keep their current value, a value of None
+    removes the element, and unknown keys are ignored.
+    """
+    root = ET.fromstring(data)
+    for key, value in new_metadata.items():
+        name = CORE_PROPERTIES.get(key)
+        if name is None:
+            continue
+        element = root.find(_qname(name))
+        if value is None:
+            if element is not None:
+                root.remove(element)
+            continue
+        if element is None:
+            element = ET.SubElement(root, _qname(name))
+        if key in DATE_PROPERTIES:
+            if isinstance(value, str):
+                parsed = parse_w3cdtf(value)
+                if parsed is None:
+                    raise ValueError(f"Incorrect date format for '{key}': {value}")
+                value = parsed
+            element.set(_qname('xsi:type'), 'dcterms:W3CDTF')
+            element.text = format_w3cdtf(value)
+        else:
+            element.text = str(value)
+    return ET.tostring(root, encoding='UTF-8', xml_declaration=True)
+
+
+def build_app_xml(data, new_metadata):
+    """Return app.xml bytes with the APP_PROPERTIES in new_metadata replaced."""
+    root = ET.fromstring(data)
+    for key, value in new_metadata.items():
+        name = APP_PROPERTIES.get(key)
+        if name is None:
+            continue
+        element = root.find(_qname(name))
+        if value is None:
+            if element is not None:
+                root.remove(element)
+            continue
+        if element is None:
+            element = ET.SubElement(root, _qname(name))
+        element.text = str(value)
+    return ET.tostring(root, encoding='UTF-8', xml_declaration=True, default_namespace=NS['ep'])
+
+
+def _append_element(data, root_tag, element):
+    """Insert element (bytes) as the last child of the root element of an XML part, leaving the rest untouched."""
+    head, closing, tail = data.rpartition(b'</' + root_tag + b'>')
+    if not closing:
+        raise CorePropertiesError(f"cannot add to a {root_tag.decode()} part without a closing tag")
+    return head + element + closing + tail
+
+
+def _add_app_part(zin):
+    """Return replacements that register a new docProps/app.xml in the package relationships and content types."""
+    names = set(zin.namelist())
+    if RELS_PART not in names or CONTENT_TYPES_PART not in names:
+        raise CorePropertiesError("package has no relationships or content types to add app.xml to")
+
+    rels = zin.read(RELS_PART)
+    ids = {rel.get('Id') for rel in ET.fromstring(rels)}
+    number = 1
+    while f"rId{number}" in ids:
+        number += 1
+    relationship = f'<Relationship Id="rId{number}" Type="{APP_REL_TYPE}" Target="{APP_PART}"/>'
+    override = f'<Override PartName="/{APP_PART}" ContentType="{APP_CONTENT_TYPE}"/>'
+    return {
+        RELS_PART: _append_element(rels, b'Relationships', relationship.encode()),
+        CONTENT_TYPES_PART: _append_element(zin.read(CONTENT_TYPES_PART), b'Types', override.encode()),
+    }
+
+
+def _copy_range(src, dst, start, end, progress=None):
+    src.seek(start)
+    remaining = end - start
+    while remaining:
+        chunk = src.read(min(COPY_BUFFER_SIZE, remaining))
+        if not chunk:
+            raise CorePropertiesError("Unexpected end of file while copying zip members")
+        dst.write(chunk)
+        remaining -= len(chunk)
+        if progress is not None:
+            progress(len(chunk))
+
+
+def _replace_members(zin, src, dst, replacements, progress=None):
+    """Copy zin to dst raw, swapping in new content for the members named in replacements.
+
+    Names in replacements that zin does not have are added after the existing members.
+    """
+    # Each member's raw span runs from its local header to the next member's
+    # header (or the central directory), which also covers any data
+    # descriptor that follows the compressed data.
+    members = sorted(zin.infolist(), key=lambda info: info.header_offset)
+    ends = [info.header_offset for info in members[1:]] + [zin.start_dir]
+    new_infos = {}
+    with zipfile.ZipFile(dst, 'w') as zout:
+        for info, end in zip(members, ends):
+            if info.filename in replacements:
+                continue
+            new_info = copy.copy(info)
+            new_info.header_offset = dst.tell()
+            _copy_range(src, dst, info.header_offset, end, progress)
+            new_infos[info.filename] = new_info
+        zout.start_dir = dst.tell()
+
+        existing = set(zin.namelist())
+        for name, data in replacements.items():
+            if name in existing:
+                old_info = zin.getinfo(name)
+                new_info = zipfile.ZipInfo(name, date_time=old_info.date_time)
+                new_info.external_attr = old_info.external_attr
+            else:
+                new_info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+                new_info.external_attr = 0o600 << 16
+            new_info.compress_type = zipfile.ZIP_DEFLATED
+            zout.writestr(new_info, data)
+            new_infos[name] = zout.getinfo(name)
+
+        # Keep the central directory in the original member order
+        zout.filelist = [new_infos[info.filename] for info in zin.infolist()]
+        zout.filelist += [new_infos[name] for name in replacements if name not in existing]
+        zout.NameToInfo = dict(new_infos)
+        zout.comment = zin.comment
+
+
+def write_core_properties(file_path, new_metadata, progress=None):
+    """Set new metadata on an OOXML file by rewriting only its properties parts.
+
+    docProps/core.xml is always rewritten, and docProps/app.xml too when
+    new_metadata holds APP_PROPERTIES keys such as 'Company'; a package
+    without app.xml gets one, with its relationship and content type. Every other
+    zip member is copied byte-for-byte (still compressed), so the edit costs
+    one sequential copy of the file and leaves the rest of the package
+    untouched. The result is written to a temporary file next to the
+    original and moved into place atomically. Returns the new metadata dict.
+
+    progress, if given, is called with the number of bytes copied after each
+    chunk; an exception raised from it aborts the write and leaves the
+    original file as it was.
+    """
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as dst:
+            try:
+                with span('open', file_path):
+                    zin = zipfile.ZipFile(file_path)
+                with zin, open(file_path, 'rb') as src, span('serialize', file_path) as s:
+                    core_name = find_part(zin, CORE_PART, CORE_REL_TYPE)
+                    if core_name is None:
+                        raise CorePropertiesError(f"{file_path} has no core properties part")
+                    core_xml = build_core_xml(zin.read(core_name), new_metadata)
+                    replacements = {core_name: core_xml}
+                    app_name = None
+
+                    if any(key in APP_PROPERTIES for key in new_metadata):
+                        app_name = find_part(zin, APP_PART, APP_REL_TYPE)
+                        if app_name is not None:
+                            replacements[app_name] = build_app_xml(zin.read(app_name), new_metadata)
+                        elif any(new_metadata.get(key) is not None for key in APP_PROPERTIES):
+                            app_name = APP_PART
+                            replacements.update(_add_app_part(zin))
+                            replacements[app_name] = build_app_xml(EMPTY_APP_XML, new_metadata)
+
+                    _replace_members(zin, src, dst, replacements, progress)
+                    s.add_bytes(dst.tell())
+            except (zipfile.BadZipFile, ET.ParseError, KeyError) as e:
+                raise CorePropertiesError(f"Cannot write document properties to {file_path}: {e}") from e
+            with span('fsync', file_path):
+                dst.flush()
+                os.fsync(dst.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(file_path).st_mode & 0o7777)
+        except OSError:
+            pass  # Permissions are best effort, the content is what matters
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    metadata_dict = parse_core_xml(core_xml)
+    if app_name in replacements:
+        for key, value in parse_app_xml(replacements[app_name]).items():
+            metadata_dict.setdefault(key, value)
+    return metadata_dict
@@ -0,0 +1,636 @@
+"""Read a PDF's Info dictionary and XMP packet without parsing the whole file.
+
+Only the trailer at the end of the file, the cross-reference sections and
+the few objects that hold the metadata are read, so time and memory do not
+grow with the number of pages. Every incremental update keeps its own
+trailer, which makes the Info dictionary of each revision recoverable.
+
+Usage: python pdf_info.py FILE [--revisions] [--xmp]
+"""
+import argparse
+import json
+import os
+import re
+import zlib
+from collections import namedtuple
+
+from handlers import open_binary
+
+# How far from the end of the file to look for startxref
+TAIL_SIZE = 4096
+
+# Initial window read for one object, grown as needed up to the limit
+OBJECT_WINDOW = 4096
+MAX_OBJECT_SIZE = 16 * 1024 * 1024
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Classic xref table entries are exactly this long, end-of-line included
+XREF_ENTRY_SIZE = 20
+
+# Guards against /Prev loops in damaged files
+MAX_REVISIONS = 10000
+
+WHITESPACE = b'\x00\t\n\x0c\r '
+DELIMITERS = b'()<>[]{}/%'
+
+# PDFDocEncoding code points that differ from Latin-1
+PDFDOC_DIFFERENCES = {
+    0x18: '˘', 0x19: 'ˇ', 0x1a: 'ˆ', 0x1b: '˙',
+    0x1c: '˝', 0x1d: '˛', 0x1e: '˚', 0x1f: '˜',
+    0x80: '•', 0x81: '†', 0x82: '‡', 0x83: '…',
+    0x84: '—', 0x85: '–', 0x86: 'ƒ', 0x87: '⁄',
+    0x88: '‹', 0x89: '›', 0x8a: '−', 0x8b: '‰',
+    0x8c: '„', 0x8d: '“', 0x8e: '”', 0x8f: '‘',
+    0x90: '’', 0x91: '‚', 0x92: '™', 0x93: 'ﬁ',
+    0x94: 'ﬂ', 0x95: 'Ł', 0x96: 'Œ', 0x97: 'Š',
+    0x98: 'Ÿ', 0x99: 'Ž', 0x9a: 'ı', 0x9b: 'ł',
+    0x9c: 'œ', 0x9d: 'š', 0x9e: 'ž', 0xa0: '€',
+}
+
+ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t', ord('b'): b'\b', ord('f'): b'\f',
+           ord('('): b'(', ord(')'): b')', ord('\\'): b'\\'}
+
+Ref = namedtuple('Ref', 'num gen')
+
+
+class PdfInfoError(ValueError):
+    """Raised when the fast reader cannot make sense of a PDF; callers fall back to PyPDF2."""
+
+
+class Name(str):
+    """A PDF name object, stored without its leading slash."""
+
+
+class Keyword(str):
+    """A bare PDF keyword such as obj, stream or R."""
+
+
+class Stream:
+    def __init__(self, dictionary, data_offset):
+        self.dict = dictionary
+        self.data_offset = data_offset
+
+
+class _Truncated(Exception):
+    """The object runs past the end of the window that was read."""
+
+
+def decode_text(value):
+    """Decode a PDF text string (UTF-16BE or UTF-8 with BOM, else PDFDocEncoding)."""
+    if value.startswith(b'\xfe\xff'):
+        return value[2:].decode('utf-16-be', errors='replace')
+    if value.startswith(b'\xef\xbb\xbf'):
+        return value[3:].decode('utf-8', errors='replace')
+    return ''.join(PDFDOC_DIFFERENCES.get(byte, chr(byte)) for byte in value)
+
+
+class _Lexer:
+    """Parse PDF objects out of an in-memory window of the file."""
+
+    def __init__(self, data, at_eof=False):
+        self.data = data
+        self.at_eof = at_eof
+
+    def _need(self, pos):
+        if pos >= len(self.data):
+            if self.at_eof:
+                raise PdfInfoError("Unexpected end of file")
+            raise _Truncated()
+
+    def skip_space(self, pos):
+        data = self.data
+        while True:
+            self._need(pos)
+            byte = data[pos]
+            if byte in WHITESPACE:
+                pos += 1
+            elif byte == 0x25:  # % comment runs to end of line
+                while pos < len(data) and data[pos] not in b'\r\n':
+                    pos += 1
+            else:
+                return pos
+
+    def _token_end(self, pos):
+        data = self.data
+        while pos < len(data) and data[pos] not in WHITESPACE and data[pos] not in DELIMITERS:
+            pos += 1
+        if pos >= len(data) and not self.at_eof:
+            raise _Truncated()
+        return pos
+
+    def parse(self, pos):
+        """Return (object, position after it)."""
+        pos = self.skip_space(pos)
+        data = self.data
+        byte = data[pos]
+
+        if byte == 0x3c:  # <
+            self._need(pos + 1)
+            if data[pos + 1] == 0x3c:
+                return self._parse_dict(pos + 2)
+            end = data.find(b'>', pos)
+            if end < 0:
+                self._need(len(data))
+            hex_digits = re.sub(rb'\s', b'', data[pos + 1:end])
+            if len(hex_digits) % 2:
+                hex_digits += b'0'
+            return bytes.fromhex(hex_digits.decode('ascii')), end + 1
+        if byte == 0x5b:  # [
+            items = []
+            pos += 1
+            while True:
+                pos = self.skip_space(pos)
+                if data[pos] == 0x5d:
+                    return items, pos + 1
+                item, pos = self.parse(pos)
+                items.append(item)
+        if byte == 0x28:  # (
+            return self._parse_string(pos + 1)
+        if byte == 0x2f:  # /
+            end = self._token_end(pos + 1)
+            name = re.sub(rb'#([0-9A-Fa-f]{2})', lambda m: bytes([int(m.group(1), 16)]), data[pos + 1:end])
+            return Name(name.decode('latin-1')), end
+        if byte in b')>]}':
+            raise PdfInfoError(f"Unexpected delimiter {chr(byte)!r}")
+
+        end = self._token_end(pos)
+        token = data[pos:end]
+        if re.fullmatch(rb'[+-]?\d+', token):
+            number = int(token)
+            # "num gen R" is an indirect reference
+            match = re.compile(rb'\s+(\d+)\s+R(?=[\s()<>\[\]{}/%]|$)').match(data, end)
+            if match:
+                return Ref(number, int(match.group(1))), match.end()
+            if len(data) - end < 16 and not self.at_eof:
+                raise _Truncated()
+            return number, end
+        if re.fullmatch(rb'[+-]?(\d+\.?\d*|\.\d+)', token):
+            return float(token), end
+        if token == b'true':
+            return True, end
+        if token == b'false':
+            return False, end
+        if token == b'null':
+            return None, end
+        return Keyword(token.decode('latin-1')), end
+
+    def _parse_dict(self, pos):
+        result = {}
+        while True:
+            pos = self.skip_space(pos)
+            self._need(pos + 1)
+            if self.data[pos:pos + 2] == b'>>':
+                return result, pos + 2
+            key, pos = self.parse(pos)
+            if not isinstance(key, Name):
+                raise PdfInfoError(f"Dictionary key is not a name: {key!r}")
+            value, pos = self.parse(pos)
+            result[str(key)] = value
+
+    def _parse_string(self, pos):
+        data = self.data
+        out = bytearray()
+        depth = 1
+        while True:
+            self._need(pos)
+            byte = data[pos]
+            if byte == 0x5c:  # backslash
+                self._need(pos + 1)
+                nxt = data[pos + 1]
+                if nxt in ESCAPES:
+                    out += ESCAPES[nxt]
+                    pos += 2
+                elif 0x30 <= nxt <= 0x37:
+                    match = re.compile(rb'[0-7]{1,3}').match(data, pos + 1)
+                    out.append(int(match.group(), 8) & 0xff)
+                    pos = match.end()
+                elif nxt == 0x0d:  # line continuation
+                    pos += 3 if data[pos + 2:pos + 3] == b'\n' else 2
+                elif nxt == 0x0a:
+                    pos += 2
+                else:
+                    out.append(nxt)
+                    pos += 2
+                continue
+            if byte == 0x28:
+                depth += 1
+            elif byte == 0x29:
+                depth -= 1
+                if depth == 0:
+                    return bytes(out), pos + 1
+            out.append(byte)
+            pos += 1
+
+
+class _XrefTable:
+    """A classic xref section; only the subsection headers are kept in memory."""
+
+    def __init__(self, offset, subsections, trailer):
+        self.offset = offset
+        self.subsections = subsections  # (first object number, count, file offset of first entry)
+        self.trailer = trailer
+        self.hybrid = None  # _XrefStream named by /XRefStm in hybrid-reference files
+
+
+class _XrefStream:
+    """A cross-reference stream (PDF 1.5+); rows are decoded on demand."""
+
+    def __init__(self, offset, stream):
+        self.offset = offset
+        self.stream = stream
+        self.trailer = stream.dict
+        widths, size = stream.dict.get('W'), stream.dict.get('Size')
+        if not isinstance(widths, list) or not isinstance(size, int):
+            raise PdfInfoError(f"xref stream at offset {offset} has no valid /W or /Size")
+        self.widths = [int(width) for width in widths]
+        index = stream.dict.get('Index') or [0, size]
+        self.ranges = list(zip(index[0::2], index[1::2]))
+
+
+class PdfInfoReader:
+    """Random-access reader for the metadata objects of one PDF file."""
+
+    def __init__(self, f):
+        self.f = f
+        self.f.seek(0, os.SEEK_END)
+        self.size = self.f.tell()
+        self.sections = self._read_sections()
+        self._objstm_cache = {}
+
+    # -- low level ---------------------------------------------------------
+
+    def _read_at(self, offset, size):
+        self.f.seek(offset)
+        return self.f.read(size)
+
+    def _parse_at(self, offset, parse):
+        """Run parse(lexer) on a window starting at offset, growing it until the object fits."""
+        window = OBJECT_WINDOW
+        while True:
+            data = self._read_at(offset, window)
+            lexer = _Lexer(data, at_eof=offset + len(data) >= self.size)
+            try:
+                return parse(lexer)
+            except _Truncated:
+                if window >= MAX_OBJECT_SIZE:
+                    raise PdfInfoError(f"Object at offset {offset} is too large") from None
+                window *= 4
+            except (IndexError, ValueError) as e:
+                if isinstance(e, PdfInfoError):
+                    raise
+                raise PdfInfoError(f"Cannot parse object at offset {offset}: {e}") from e
+
+    def _parse_indirect(self, offset):
+        """Parse "num gen obj ..." at offset; returns the object (a Stream for streams)."""
+        def parse(lexer):
+            num, pos = lexer.parse(0)
+            gen, pos = lexer.parse(pos)
+            keyword, pos = lexer.parse(pos)
+            if not isinstance(num, int) or not isinstance(gen, int) or keyword != 'obj':
+                raise PdfInfoError(f"No object at offset {offset}")
+            value, pos = lexer.parse(pos)
+            if isinstance(value, dict):
+                after = lexer.skip_space(pos)
+                lexer._need(after + 6)
+                if lexer.data[after:after + 6] == b'stream':
+                    after += 6
+                    if lexer.data[after:after + 2] == b'\r\n':
+                        after += 2
+                    elif lexer.data[after:after + 1] in (b'\n', b'\r'):
+                        after += 1
+                    return Stream(value, offset + after)
+            return value
+        return self._parse_at(offset, parse)
+
+    # -- cross-reference chain ---------------------------------------------
+
+    def _startxref(self):
+        tail_start = max(0, self.size - TAIL_SIZE)
+        tail = self._read_at(tail_start, TAIL_SIZE)
+        index = tail.rfind(b'startxref')
+        if index < 0:
+            raise PdfInfoError("startxref not found")
+        match = re.compile(rb'startxref\s+(\d+)').match(tail, index)
+        if not match:
+            raise PdfInfoError("Malformed startxref")
+        return int(match.group(1))
+
+    def _read_table(self, offset):
+        def parse(lexer):
+            pos = lexer.skip_space(0)
+            if lexer.data[pos:pos + 4] != b'xref':
+                return None
+            pos += 4
+            subsections = []
+            while True:
+                token, pos = lexer.parse(pos)
+                if token == 'trailer':
+                    trailer, _ = lexer.parse(pos)
+                    return subsections, trailer
+                count, pos = lexer.parse(pos)
+                if not isinstance(token, int) or not isinstance(count, int):
+                    raise PdfInfoError(f"Malformed xref subsection at offset {offset}")
+                pos = lexer.skip_space(pos)
+                subsections.append((token, count, offset + pos))
+                pos += count * XREF_ENTRY_SIZE
+        return self._parse_at(offset, parse)
+
+    def _read_section(self, offset):
+        if not 0 <= offset < self.size:
+            raise PdfInfoError(f"xref offset {offset} is outside the file")
+        table = self._read_table(offset)
+        if table is not None:
+            if not isinstance(table[1], dict):
+                raise PdfInfoError(f"No trailer dictionary after the xref table at offset {offset}")
+            section = _XrefTable(offset, *table)
+            if isinstance(section.trailer.get('XRefStm'), int):
+                section.hybrid = self._read_section(section.trailer['XRefStm'])
+            return section
+        stream = self._parse_indirect(offset)
+        if not isinstance(stream, Stream) or stream.dict.get('Type') != 'XRef':
+            raise PdfInfoError(f"No xref section at offset {offset}")
+        return _XrefStream(offset, stream)
+
+    def _read_sections(self):
+        """Return the xref sections newest first, following /Prev."""
+        sections = []
+        seen = set()
+        offset = self._startxref()
+        while offset is not None and offset not in seen and len(sections) < MAX_REVISIONS:
+            seen.add(offset)
+            section = self._read_section(offset)
+            sections.append(section)
+            prev = section.trailer.get('Prev')
+            offset = prev if isinstance(prev, int) else None
+        return sections
+
+    def _table_entry(self, section, num):
+        for first, count, entries_offset in section.subsections:
+            if first <= num < first + count:
+                entry = self._read_at(entries_offset + (num - first) * XREF_ENTRY_SIZE, XREF_ENTRY_SIZE)
+                match = re.match(rb'(\d{10}) (\d{5}) ([nf])', entry)
+                if not match:
+                    raise PdfInfoError(f"Malformed xref entry for object {num}")
+                if match.group(3) == b'f':
+                    return (0, 0, 0)
+                return (1, int(match.group(1)), int(match.group(2)))
+        return None
+
+    def _stream_entry(self, section, num):
+        row = 0
+        for first, count in section.ranges:
+            if first <= num < first + count:
+                row += num - first
+                break
+            row += count
+        else:
+            return None
+        row_size = sum(section.widths)
+        data = self._stream_prefix(section.stream, (row + 1) * row_size, row_size)
+        record = data[row * row_size:(row + 1) * row_size]
+        if len(record) < row_size:
+            return None
+        fields = []
+        pos = 0
+        for width in section.widths:
+            fields.append(int.from_bytes(record[pos:pos + width], 'big') if width else None)
+            pos += width
+        kind = 1 if fields[0] is None else fields[0]
+        return (kind, fields[1] or 0, fields[2] or 0)
+
+    def lookup(self, num, start=0):
+        """Return the xref entry (type, field2, field3) for object num as of sections[start]."""
+        for section in self.sections[start:]:
+            entry = None
+            if isinstance(section, _XrefTable):
+                entry = self._table_entry(section, num)
+                if entry is None and section.hybrid is not None:
+                    entry = self._stream_entry(section.hybrid, num)
+            else:
+                entry = self._stream_entry(section, num)
+            if entry is not None:
+                return entry
+        return None
+
+    # -- objects -----------------------------------------------------------
+
+    def _stream_length(self, stream, start):
+        length = stream.dict.get('Length')
+        if isinstance(length, Ref):
+            length = self.resolve(length, start)
+        if not isinstance(length, int):
+            raise PdfInfoError("Stream has no usable /Length")
+        return length
+
+    def _stream_prefix(self, stream, needed, row_size=None, start=0):
+        """Decode a stream, stopping once `needed` decoded bytes are available (None = all)."""
+        filters = stream.dict.get('Filter')
+        params = stream.dict.get('DecodeParms')
+        if isinstance(filters, list):
+            if len(filters) > 1:
+                raise PdfInfoError(f"Unsupported filter chain {filters}")
+            filters = filters[0] if filters else None
+            params = params[0] if isinstance(params, list) and params else params
+        if filters not in (None, 'FlateDecode'):
+            raise PdfInfoError(f"Unsupported filter {filters}")
+
+        length = self._stream_length(stream, start)
+        predictor = (params or {}).get('Predictor', 1) if isinstance(params, dict) else 1
+        columns = (params or {}).get('Columns', 1) if isinstance(params, dict) else 1
+        if predictor >= 10:
+            row_size = columns
+        elif predictor != 1:
+            raise PdfInfoError(f"Unsupported predictor {predictor}")
+
+        decompressor = zlib.decompressobj() if filters == 'FlateDecode' else None
+        out = bytearray()
+        raw = bytearray()
+        previous = bytearray(row_size or 0)
+        remaining = length
+        self.f.seek(stream.data_offset)
+        while remaining and (needed is None or len(out) < needed):
+            chunk = self.f.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            try:
+                chunk = decompressor.decompress(chunk) if decompressor else chunk
+            except zlib.error as e:
+                raise PdfInfoError(f"Corrupt stream data: {e}") from e
+            if predictor < 10:
+                out += chunk
+                continue
+            raw += chunk
+            while len(raw) >= row_size + 1:
+                previous = _png_unfilter(raw[0], raw[1:row_size + 1], previous)
+                out += previous
+                del raw[:row_size + 1]
+        return bytes(out)
+
+    def _object_from_stream(self, objstm_num, index, start):
+        objstm = self._objstm_cache.get(objstm_num)
+        if objstm is None:
+            stream = self.resolve(Ref(objstm_num, 0), start)
+            if not isinstance(stream, Stream):
+                raise PdfInfoError(f"Object stream {objstm_num} not found")
+            data = self._stream_prefix(stream, None, start=start)
+            count = stream.dict.get('N', 0)
+            lexer = _Lexer(data, at_eof=True)
+            pos = 0
+            offsets = []
+            for _ in range(count):
+                num, pos = lexer.parse(pos)
+                rel, pos = lexer.parse(pos)
+                offsets.append(rel)
+            objstm = (data, stream.dict.get('First', 0), offsets)
+            # Only the most recent object stream is kept, so memory stays bounded
+            self._objstm_cache = {objstm_num: objstm}
+        data, first, offsets = objstm
+        if index >= len(offsets):
+            raise PdfInfoError(f"Object index {index} out of range in stream {objstm_num}")
+        value, _ = _Lexer(data, at_eof=True).parse(first + offsets[index])
+        return value
+
+    def resolve(self, value, start=0):
+        """Follow an indirect reference as of sections[start]; other values pass through."""
+        depth = 0
+        while isinstance(value, Ref):
+            depth += 1
+            if depth > 32:
+                raise PdfInfoError("Reference chain too deep")
+            entry = self.lookup(value.num, start)
+            if entry is None or entry[0] == 0:
+                return None
+            if entry[0] == 1:
+                value = self._parse_indirect(entry[1])
+            else:
+                value = self._object_from_stream(entry[1], entry[2], start)
+        return value
+
+    # -- metadata ----------------------------------------------------------
+
+    def _check_encryption(self):
+        if self.sections and self.sections[0].trailer.get('Encrypt') is not None:
+            raise PdfInfoError("Encrypted PDF")
+
+    def info(self, start=0):
+        """Return the Info dictionary as of sections[start], with text values decoded."""
+        self._check_encryption()
+        info = self.resolve(self.sections[start].trailer.get('Info'), start)
+        if not isinstance(info, dict):
+            return {}
+        return {key: _python_value(self.resolve(value, start)) for key, value in info.items()}
+
+    def revisions(self):
+        """Return one dict per revision, oldest first, with its xref offset and Info."""
+        self._check_encryption()
+        result = []
+        for start in range(len(self.sections) - 1, -1, -1):
+            result.append({
+                'revision': len(self.sections) - start,
+                'xref_offset': self.sections[start].offset,
+                'info': self.info(start),
+            })
+        return result
+
+    def xmp(self):
+        """Return the document's XMP packet as text, or None."""
+        self._check_encryption()
+        root = self.resolve(self.sections[0].trailer.get('Root'))
+        if not isinstance(root, dict):
+            return None
+        stream = self.resolve(root.get('Metadata'))
+        if not isinstance(stream, Stream):
+            return None
+        data = self._stream_prefix(stream, None)
+        for encoding in ('utf-8', 'utf-16'):
+            try:
+                return data.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        return data.decode('latin-1')
+
+
+def _png_unfilter(filter_type, row, previous):
+    """Undo one row of PNG prediction (bytes per pixel of 1, as used by xref streams)."""
+    out = bytearray(row)
+    if filter_type == 0:
+        return out
+    for i in range(len(out)):
+        left = out[i - 1] if i else 0
+        up = previous[i] if i < len(previous) else 0
+        if filter_type == 1:
+            out[i] = (out[i] + left) & 0xff
+        elif filter_type == 2:
+            out[i] = (out[i] + up) & 0xff
+        elif filter_type == 3:
+            out[i] = (out[i] + ((left + up) >> 1)) & 0xff
+        elif filter_type == 4:
+            up_left = previous[i - 1] if i and i - 1 < len(previous) else 0
+            p = left + up - up_left
+            pa, pb, pc = abs(p - left), abs(p - up), abs(p - up_left)
+            predicted = left if pa <= pb and pa <= pc else up if pb <= pc else up_left
+            out[i] = (out[i] + predicted) & 0xff
+        else:
+            raise PdfInfoError(f"Unknown PNG filter type {filter_type}")
+    return out
+
+
+def _python_value(value):
+    if isinstance(value, bytes):
+        return decode_text(value)
+    if isinstance(value, Name):
+        return '/' + value
+    if isinstance(value, list):
+        return [_python_value(item) for item in value]
+    return value
+
+
+def _read(file_path, method):
+    """Call method(reader), turning whatever a damaged file makes the parser trip over into PdfInfoError."""
+    with open_binary(file_path) as f:
+        try:
+            return method(PdfInfoReader(f))
+        except PdfInfoError:
+            raise
+        except (AttributeError, KeyError, TypeError, ValueError, IndexError) as e:
+            raise PdfInfoError(f"Damaged PDF: {type(e).__name__}: {e}") from e
+
+
+def read_pdf_info(file_path):
+    """Retrieve the Info dictionary of a PDF (path or seekable file), keyed like get_pdf_metadata."""
+    return _read(file_path, PdfInfoReader.info)
+
+
+def read_pdf_revisions(file_path):
+    """Retrieve the Info dictionary of every revision of a PDF, oldest first."""
+    return _read(file_path, PdfInfoReader.revisions)
+
+
+def read_pdf_xmp(file_path):
+    """Retrieve the XMP metadata packet of a PDF as text, or None if it has none."""
+    return _read(file_path, PdfInfoReader.xmp)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print a PDF's Info dictionary without a full parse.")
+    parser.add_argument('file')
+    parser.add_argument('--revisions', action='store_true', help="print the Info of every incremental update")
+    parser.add_argument('--xmp', action='store_true', help="also print the XMP packet")
+    args = parser.parse_args(argv)
+
+    with open(args.file, 'rb') as f:
+        reader = PdfInfoReader(f)
+        if args.revisions:
+            for revision in reader.revisions():
+                print(json.dumps(revision, default=str))
+        else:
+            for key, value in reader.info().items():
+                print(f"{key}: {value}")
+        if args.xmp:
+            print(reader.xmp() or "(no XMP metadata)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""Compact per-file metadata records and streaming exporters.
+
+A MetadataRecord keeps the core document properties in __slots__ instead of
+a dict keyed by display strings, stores Created/Modified as int64
+nanoseconds since the epoch and interns values that repeat across a corpus
+(authors, categories, issue messages). Exporters buffer at most chunk_size
+records before writing, so a whole scan can be written to CSV, JSONL or
+Parquet without holding it in memory. Every format stores Issues and Extra
+as JSON objects. Parquet needs pyarrow, which is only imported when a
+.parquet file is opened.
+"""
+import abc
+import csv
+import datetime
+import json
+import os
+import sys
+
+from timestamps import to_ns, from_ns
+
+CORE_FIELDS = ('Title', 'Subject', 'Creator', 'Keywords', 'Description', 'Last Modified By', 'Revision',
+               'Created', 'Modified', 'Category', 'Content Status', 'Language', 'Identifier')
+DATE_FIELDS = ('Created', 'Modified')
+
+# Fields whose values repeat across many files and are worth interning
+INTERNED_FIELDS = ('Creator', 'Last Modified By', 'Revision', 'Category', 'Content Status', 'Language')
+
+# 'Last Modified By' -> 'last_modified_by'
+FIELD_SLOTS = tuple(field.lower().replace(' ', '_') for field in CORE_FIELDS)
+
+COLUMNS = ('Path', 'Size', 'File Modified', 'Error') + CORE_FIELDS + ('Issues', 'Extra')
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class MetadataRecord:
+    """One file's metadata, issues and error in a fixed set of slots."""
+
+    __slots__ = ('path', 'size', 'mtime_ns', 'error', 'issues', 'extra', 'has_core') + FIELD_SLOTS
+
+    def __init__(self, path, size=None, metadata=None, issues=None, error=None, mtime_ns=None):
+        self.path = path
+        self.size = size
+        # Filesystem modification time, kept next to the embedded dates for timeline checks
+        self.mtime_ns = mtime_ns
+        self.error = error
+        # Issues as a tuple of (key, message) pairs; both sides repeat a lot
+        self.issues = tuple((_intern(key), _intern(message)) for key, message in issues.items()) if issues else None
+        metadata = metadata or {}
+        # OOXML readers report every core field, even empty ones; remember that so the
+        # original dict can be rebuilt with the same keys
+        self.has_core = bool(metadata) and all(field in metadata for field in CORE_FIELDS)
+        for field, slot in zip(CORE_FIELDS, FIELD_SLOTS):
+            value = metadata.get(field)
+            if field in DATE_FIELDS and isinstance(value, datetime.datetime):
+                value = to_ns(value)
+            elif field in INTERNED_FIELDS:
+                value = _intern(value)
+            setattr(self, slot, value)
+        extra = {key: value for key, value in metadata.items() if key not in CORE_FIELDS}
+        self.extra = extra or None
+
+    @classmethod
+    def from_scan(cls, record):
+        """Build a record from a scanner.scan_file result dict."""
+        return cls(record['path'], record.get('size'), record.get('metadata'), record.get('issues'),
+                   record.get('error'), record.get('mtime_ns'))
+
+    def __repr__(self):
+        return f"MetadataRecord({self.path!r})"
+
+    def metadata(self):
+        """Rebuild the display-keyed metadata dict the readers returned."""
+        result = {}
+        for field, slot in zip(CORE_FIELDS, FIELD_SLOTS):
+            value = getattr(self, slot)
+            if field in DATE_FIELDS and isinstance(value, int):
+                value = from_ns(value)
+            if value is not None or self.has_core:
+                result[field] = value
+        if self.extra:
+            result.update(self.extra)
+        return result
+
+    def issues_dict(self):
+        return dict(self.issues) if self.issues else {}
+
+    def issues_json(self):
+        """Return the issues as a JSON object string, or None when there are none."""
+        return json.dumps(dict(self.issues)) if self.issues else None
+
+    def as_scan(self):
+        """Return the record in scanner.scan_file's dict shape."""
+        return {'path': self.path, 'size': self.size, 'mtime_ns': self.mtime_ns,
+                'metadata': None if self.error else self.metadata(), 'issues': self.issues_dict(), 'error': self.error}
+
+    def get(self, field):
+        """Return one display-keyed value, as metadata().get(field) would."""
+        if field in CORE_FIELDS:
+            value = getattr(self, FIELD_SLOTS[CORE_FIELDS.index(field)])
+            return from_ns(value) if field in DATE_FIELDS and isinstance(value, int) else value
+        return self.extra.get(field) if self.extra else None
+
+    def row(self):
+        """Return the record as a tuple of plain values, one per COLUMNS entry."""
+        values = [self.path, self.size, from_ns(self.mtime_ns).isoformat() if self.mtime_ns is not None else None,
+                  self.error]
+        for field, slot in zip(CORE_FIELDS, FIELD_SLOTS):
+            value = getattr(self, slot)
+            if field in DATE_FIELDS and isinstance(value, int):
+                value = from_ns(value).isoformat()
+            values.append(value)
+        values.append(self.issues_json())
+        values.append(json.dumps(self.extra, default=str) if self.extra else None)
+        return tuple(values)
+
+
+class _Exporter(abc.ABC):
+    """Buffer records and write them out chunk_size at a time."""
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.buffer = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record):
+        if isinstance(record, dict):
+            record = MetadataRecord.from_scan(record)
+        self.buffer.append(record)
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self._write_chunk(self.buffer)
+            self.count += len(self.buffer)
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    @abc.abstractmethod
+    def _write_chunk(self, records):
+        """Write a list of MetadataRecords to the output."""
+
+    def _close(self):
+        pass
+
+
+class CsvExporter(_Exporter):
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(path, chunk_size)
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def _write_chunk(self, records):
+        self.writer.writerows(record.row() for record in records)
+        self.file.flush()
+
+    def _close(self):
+        self.file.close()
+
+
+class JsonlExporter(_Exporter):
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(path, chunk_size)
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def _write_chunk(self, records):
+        self.file.write(''.join(json.dumps(record.as_scan(), default=str) + '\n' for record in records))
+        self.file.flush()
+
+    def _close(self):
+        self.file.close()
+
+
+class ParquetExporter(_Exporter):
+    """Write one Parquet row group per chunk."""
+
+    def __init__(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        super().__init__(path, chunk_size)
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow (pip install pyarrow)") from e
+        self.pa = pyarrow
+        fields = [pyarrow.field('Path', pyarrow.string()), pyarrow.field('Size', pyarrow.int64()),
+                  pyarrow.field('File Modified', pyarrow.timestamp('ns')), pyarrow.field('Error', pyarrow.string())]
+        for field in CORE_FIELDS:
+            fields.append(pyarrow.field(field, pyarrow.timestamp('ns') if field in DATE_FIELDS else pyarrow.string()))
+        fields += [pyarrow.field('Issues', pyarrow.string()), pyarrow.field('Extra', pyarrow.string())]
+        self.schema = pyarrow.schema(fields)
+        self.writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def _write_chunk(self, records):
+        columns = [[record.path for record in records], [record.size for record in records],
+                   [record.mtime_ns for record in records], [record.error for record in records]]
+        for field, slot in zip(CORE_FIELDS, FIELD_SLOTS):
+            if field in DATE_FIELDS:
+                columns.append([getattr(record, slot) if isinstance(getattr(record, slot), int) else None
+                                for record in records])
+            else:
+                columns.append([None if getattr(record, slot) is None else str(getattr(record, slot))
+                                for record in records])
+        columns.append([record.issues_json() for record in records])
+        columns.append([json.dumps(record.extra, default=str) if record.extra else None for record in records])
+        arrays = [self.pa.array(column, type=field.type) for column, field in zip(columns, self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def _close(self):
+        self.writer.close()
+
+
+EXPORTERS = {'.csv': CsvExporter, '.jsonl': JsonlExporter, '.parquet': ParquetExporter}
+
+
+def open_exporter(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return the exporter matching path's extension (.csv, .jsonl or .parquet)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORTERS:
+        raise ValueError(f"Unsupported export format {extension!r}; use one of {', '.join(EXPORTERS)}")
+    return EXPORTERS[extension](path, chunk_size)
+
+
+def export_records(records, path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Stream records (MetadataRecord or scan dicts) to path; returns the number written."""
+    with open_exporter(path, chunk_size) as exporter:
+        for record in records:
+            exporter.write(record)
+    return exporter.count
@@ -0,0 +1,311 @@
+"""Virtualized Tk table for metadata results covering many files."""
+import bisect
+import tkinter as tk
+from tkinter import ttk
+
+from records import MetadataRecord
+
+SUMMARY_COLUMNS = ('Path', 'Creator', 'Last Modified By', 'Created', 'Modified', 'Revision', 'Issues')
+
+# Columns compared as numbers when sorting, so that '10' comes after '9'
+NUMERIC_COLUMNS = ('Revision',)
+
+# Treeview header height in pixels, used to work out how many rows fit
+HEADER_HEIGHT = 25
+
+
+def _issues_text(record):
+    if record.error:
+        return f"Error: {record.error}"
+    return '; '.join(f"{key}: {issue}" for key, issue in record.issues or ())
+
+
+def sort_key(column, value):
+    """Key for a display value; numeric columns order numbers first, by value, then anything else."""
+    if column in NUMERIC_COLUMNS:
+        try:
+            return (0, float(value), value)
+        except ValueError:
+            return (1, 0.0, value)
+    return (value,)
+
+
+class ResultsModel:
+    """Scan records with a filtered, sorted view over them.
+
+    Records are kept as compact MetadataRecords plus their display strings;
+    the view is a list of indices into them, so sorting and filtering never
+    copy the rows themselves. A sorted view is kept in ascending order next
+    to its sort keys: new batches are inserted with bisect instead of
+    re-sorting, and a descending sort only reads the view backwards.
+    """
+
+    def __init__(self, columns=SUMMARY_COLUMNS):
+        self.columns = columns
+        self.records = []
+        self.rows = []
+        self.view = []
+        self.keys = []
+        self.sort_column = None
+        self.sort_reverse = False
+        self.filter_column = None
+        self.filter_text = ''
+        self.issues_only = False
+
+    def __len__(self):
+        return len(self.view)
+
+    def _row(self, record):
+        values = []
+        for column in self.columns:
+            if column == 'Path':
+                values.append(record.path)
+            elif column == 'Issues':
+                values.append(_issues_text(record))
+            else:
+                value = record.get(column)
+                values.append('' if value is None else str(value))
+        return tuple(values)
+
+    def _matches(self, row):
+        if self.issues_only and not row[self.columns.index('Issues')]:
+            return False
+        if not self.filter_text:
+            return True
+        needle = self.filter_text.lower()
+        if self.filter_column is None:
+            return any(needle in value.lower() for value in row)
+        return needle in row[self.columns.index(self.filter_column)].lower()
+
+    def clear(self):
+        self.records = []
+        self.rows = []
+        self.view = []
+        self.keys = []
+
+    def extend(self, records):
+        """Add a batch of scan records, keeping the current filter and sort."""
+        start = len(self.rows)
+        for record in records:
+            if isinstance(record, dict):
+                record = MetadataRecord.from_scan(record)
+            self.records.append(record)
+            self.rows.append(self._row(record))
+        new = [index for index in range(start, len(self.rows)) if self._matches(self.rows[index])]
+        if self.sort_column is None:
+            self.view.extend(new)
+            return
+        position = self.columns.index(self.sort_column)
+        for index in new:
+            key = (sort_key(self.sort_column, self.rows[index][position]), index)
+            at = bisect.bisect_right(self.keys, key)
+            self.keys.insert(at, key)
+            self.view.insert(at, index)
+
+    def set_filter(self, text, column=None, issues_only=False):
+        self.filter_text = text
+        self.filter_column = column
+        self.issues_only = issues_only
+        self.view = [index for index, row in enumerate(self.rows) if self._matches(row)]
+        if self.sort_column is not None:
+            self._sort()
+
+    def sort_by(self, column):
+        """Sort by column, flipping the direction when it is already the sort column."""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+            return
+        self.sort_reverse = False
+        self.sort_column = column
+        self._sort()
+
+    def _sort(self):
+        position = self.columns.index(self.sort_column)
+        rows = self.rows
+        self.keys = sorted((sort_key(self.sort_column, rows[index][position]), index) for index in self.view)
+        self.view = [index for _, index in self.keys]
+
+    def _index(self, position):
+        return self.view[-1 - position] if self.sort_reverse else self.view[position]
+
+    def row(self, position):
+        return self.rows[self._index(position)]
+
+    def record(self, position):
+        return self.records[self._index(position)]
+
+
+class VirtualTable(ttk.Frame):
+    """A Treeview that only ever holds the rows currently on screen.
+
+    The scrollbar drives an offset into the model and the visible item
+    slots are refilled in place, so the cost of showing or scrolling does
+    not depend on how many rows the model holds.
+    """
+
+    def __init__(self, parent, model, on_activate=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.model = model
+        self.on_activate = on_activate
+        self.offset = 0
+        self.slots = []
+        self.selected = None
+
+        self.tree = ttk.Treeview(self, columns=model.columns, show='headings', selectmode='browse')
+        for column in model.columns:
+            self.tree.heading(column, text=column, command=lambda c=column: self._sort(c))
+            self.tree.column(column, width=300 if column in ('Path', 'Issues') else 120, stretch=True)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._on_scrollbar)
+        self.tree.grid(row=0, column=0, sticky='nsew')
+        self.scrollbar.grid(row=0, column=1, sticky='ns')
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+
+        self.tree.bind('<Configure>', self._on_configure)
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda event: self.scroll(-3))
+        self.tree.bind('<Button-5>', lambda event: self.scroll(3))
+        self.tree.bind('<<TreeviewSelect>>', self._on_select)
+        self.tree.bind('<Double-1>', self._on_activate)
+        self.tree.bind('<Return>', self._on_activate)
+        self.tree.bind('<Up>', lambda event: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda event: self._move_selection(1))
+
+    def _visible_rows(self):
+        row_height = int(ttk.Style().lookup('Treeview', 'rowheight') or 20)
+        return max(1, (self.tree.winfo_height() - HEADER_HEIGHT) // row_height)
+
+    def _on_configure(self, event=None):
+        wanted = self._visible_rows()
+        while len(self.slots) < wanted:
+            self.slots.append(self.tree.insert('', 'end'))
+        while len(self.slots) > wanted:
+            self.tree.delete(self.slots.pop())
+        self.refresh()
+
+    def refresh(self):
+        """Refill the visible slots from the model at the current offset."""
+        total = len(self.model)
+        self.offset = max(0, min(self.offset, total - len(self.slots)))
+        selected_slot = None
+        for i, iid in enumerate(self.slots):
+            position = self.offset + i
+            if position < total:
+                self.tree.item(iid, values=self.model.row(position))
+                self.tree.move(iid, '', i)
+                if position == self.selected:
+                    selected_slot = iid
+            else:
+                self.tree.detach(iid)
+        if selected_slot is not None:
+            self.tree.selection_set(selected_slot)
+        else:
+            self.tree.selection_set(())
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + len(self.slots)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll(self, rows):
+        self.offset += rows
+        self.refresh()
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == 'moveto':
+            self.offset = int(float(amount) * len(self.model))
+        elif unit == 'pages':
+            self.offset += int(amount) * len(self.slots)
+        else:
+            self.offset += int(amount)
+        self.refresh()
+
+    def _on_mousewheel(self, event):
+        # Windows reports multiples of 120, macOS small deltas
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.scroll(-delta * 3)
+
+    def _slot_position(self, iid):
+        return self.offset + self.slots.index(iid) if iid in self.slots else None
+
+    def _on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            self.selected = self._slot_position(selection[0])
+
+    def _move_selection(self, step):
+        if not len(self.model):
+            return 'break'
+        position = 0 if self.selected is None else min(max(self.selected + step, 0), len(self.model) - 1)
+        self.selected = position
+        if position < self.offset:
+            self.offset = position
+        elif position >= self.offset + len(self.slots):
+            self.offset = position - len(self.slots) + 1
+        self.refresh()
+        return 'break'
+
+    def _on_activate(self, event=None):
+        if self.selected is not None and self.on_activate is not None and self.selected < len(self.model):
+            self.on_activate(self.model.record(self.selected))
+
+    def _sort(self, column):
+        self.model.sort_by(column)
+        self.selected = None
+        self.refresh()
+
+    def reset(self):
+        self.offset = 0
+        self.selected = None
+        self.refresh()
+
+
+class ResultsView(ttk.Frame):
+    """Filter bar plus VirtualTable over a ResultsModel."""
+
+    def __init__(self, parent, on_activate=None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.model = ResultsModel()
+
+        bar = ttk.Frame(self)
+        bar.pack(fill='x', pady=(0, 5))
+        ttk.Label(bar, text="Filter:").pack(side='left')
+        self.filter_var = tk.StringVar()
+        entry = ttk.Entry(bar, textvariable=self.filter_var, width=30)
+        entry.pack(side='left', padx=5)
+        self.column_var = tk.StringVar(value='Any column')
+        ttk.Combobox(bar, textvariable=self.column_var, state='readonly', width=16,
+                     values=('Any column',) + self.model.columns).pack(side='left', padx=5)
+        self.issues_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="Only files with issues", variable=self.issues_var,
+                        command=self.apply_filter).pack(side='left', padx=5)
+        self.count_label = ttk.Label(bar, text="0 files")
+        self.count_label.pack(side='right')
+
+        entry.bind('<Return>', lambda event: self.apply_filter())
+        self.column_var.trace_add('write', lambda *args: self.apply_filter())
+
+        self.table = VirtualTable(self, self.model, on_activate=on_activate)
+        self.table.pack(fill='both', expand=True)
+
+    def _update_count(self):
+        shown, total = len(self.model), len(self.model.rows)
+        self.count_label.config(text=f"{total} files" if shown == total else f"{shown} of {total} files")
+
+    def clear(self):
+        self.model.clear()
+        self.table.reset()
+        self._update_count()
+
+    def add_records(self, records):
+        """Append a batch of scan records and redraw only the visible rows."""
+        self.model.extend(records)
+        self.table.refresh()
+        self._update_count()
+
+    def apply_filter(self):
+        column = self.column_var.get()
+        self.model.set_filter(self.filter_var.get().strip(),
+                              None if column == 'Any column' else column,
+                              self.issues_var.get())
+        self.table.reset()
+        self._update_count()
@@ -0,0 +1,411 @@
+"""Declarative metadata compliance rules, checked one file at a time or in bulk.
+
+Rules are listed in a YAML or JSON file, either as a top-level list or
+under a 'rules' key:
+
+    rules:
+      - {type: required, field: Creator, message: Missing creator}
+      - {type: regex, field: Revision, pattern: '[0-9]+', allow_missing: false}
+      - {type: allowed, field: Language, values: [en-US, en-GB]}
+      - {type: order, before: Created, after: Modified}
+      - {type: mismatch, field: Creator, other: Last Modified By}
+
+RuleSet.check() evaluates one metadata dict, as the GUI and scanner do.
+An empty string counts as missing, like None, in both paths: a CSV export
+cannot tell the two apart, and the verdict must not depend on the format.
+RuleSet.evaluate() checks a whole pandas DataFrame (one row per file,
+display-keyed columns) with one vectorized pass per rule and reports hit
+counts and timings; numpy and pandas are only imported for that path.
+
+Usage: python rules.py INPUT.parquet|.csv|.jsonl [--rules RULES.yaml] [--violations OUT.csv]
+"""
+import abc
+import argparse
+import datetime
+import json
+import os
+import re
+import sys
+import time
+
+
+class RuleError(ValueError):
+    """Raised for an invalid rule definition."""
+
+
+def _missing(value):
+    return value is None or value != value or value == ''  # NaN from pandas counts as missing
+
+
+def _missing_mask(column):
+    """Boolean numpy array, True where a DataFrame column is missing (None, NaN or '')."""
+    return (column.isna() | (column.astype(object) == '')).to_numpy()
+
+
+def _codes(*columns, normalize=str):
+    """Map each row to an id shared by equal normalized values (-1 for missing).
+
+    Metadata values repeat heavily across a corpus, so work is done once per
+    distinct value instead of once per row.
+    """
+    import numpy as np
+    import pandas as pd
+    codes, uniques = pd.factorize(pd.concat(columns, ignore_index=True))
+    canonical = pd.factorize(pd.Index([normalize(value) for value in uniques], dtype=object))[0]
+    # One extra slot, picked by code -1, so NaN maps to -1 like the missing uniques
+    canonical = np.append(np.where([_missing(value) for value in uniques], -1, canonical), -1)
+    ids = canonical[codes]
+    return np.split(ids, np.cumsum([len(column) for column in columns])[:-1])
+
+
+class Rule(abc.ABC):
+    """One check; `key` is the issue dict key a violation is reported under."""
+
+    type = None
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.field = spec.get('field')
+        self.message = spec.get('message') or self.default_message()
+        self.id = spec.get('id') or f"{self.type}:{self.field}"
+        self.key = self.field
+
+    def default_message(self):
+        return f"Failed {self.type} check"
+
+    def _require(self, *names):
+        for name in names:
+            if self.spec.get(name) in (None, ''):
+                raise RuleError(f"Rule {self.spec!r} needs '{name}'")
+
+    def fields(self):
+        return (self.field,)
+
+    @abc.abstractmethod
+    def check_one(self, metadata):
+        """Return True when metadata violates the rule."""
+
+    @abc.abstractmethod
+    def check_frame(self, frame):
+        """Return a boolean numpy array, True for each violating row."""
+
+
+class RequiredRule(Rule):
+    type = 'required'
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self._require('field')
+
+    def default_message(self):
+        return f"Missing {self.spec.get('field', '').lower()}"
+
+    def check_one(self, metadata):
+        return _missing(metadata.get(self.field))
+
+    def check_frame(self, frame):
+        return _missing_mask(frame[self.field])
+
+
+class RegexRule(Rule):
+    """Value must fully match pattern; missing values pass unless allow_missing is false."""
+
+    type = 'regex'
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self._require('field', 'pattern')
+        try:
+            self.pattern = re.compile(spec['pattern'])
+        except re.error as e:
+            raise RuleError(f"Bad pattern in rule {self.id}: {e}") from e
+        self.allow_missing = spec.get('allow_missing', True)
+
+    def default_message(self):
+        return f"Invalid {self.spec.get('field', '').lower()}"
+
+    def check_one(self, metadata):
+        value = metadata.get(self.field)
+        if _missing(value):
+            return not self.allow_missing
+        return self.pattern.fullmatch(str(value)) is None
+
+    def check_frame(self, frame):
+        import numpy as np
+        import pandas as pd
+        codes, uniques = pd.factorize(frame[self.field])
+        failed = np.array([not self.allow_missing if _missing(value) else self.pattern.fullmatch(str(value)) is None
+                           for value in uniques] + [not self.allow_missing])
+        return failed[codes]  # code -1 (missing) picks the last entry
+
+
+class AllowedRule(Rule):
+    """Value must be one of `values`; missing values pass unless allow_missing is false."""
+
+    type = 'allowed'
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self._require('field', 'values')
+        self.values = list(spec['values'])
+        self.allowed = set(self.values)
+        self.allow_missing = spec.get('allow_missing', True)
+
+    def default_message(self):
+        return f"{self.spec.get('field')} is not an allowed value"
+
+    def check_one(self, metadata):
+        value = metadata.get(self.field)
+        if _missing(value):
+            return not self.allow_missing
+        return value not in self.allowed
+
+    def check_frame(self, frame):
+        column = frame[self.field]
+        present = ~_missing_mask(column)
+        bad = ~column.isin(self.values).to_numpy()
+        return (bad & present) | (~present if not self.allow_missing else False)
+
+
+class OrderRule(Rule):
+    """`before` must not be later than `after` (e.g. Created <= Modified) when both are set."""
+
+    type = 'order'
+
+    def __init__(self, spec):
+        spec = dict(spec)
+        spec.setdefault('field', spec.get('after'))
+        super().__init__(spec)
+        self._require('before', 'after')
+        self.before = spec['before']
+        self.after = spec['after']
+        self.id = spec.get('id') or f"order:{self.before}<={self.after}"
+
+    def default_message(self):
+        return f"{self.spec.get('before')} is later than {self.spec.get('after')}"
+
+    def fields(self):
+        return (self.before, self.after)
+
+    def check_one(self, metadata):
+        before, after = metadata.get(self.before), metadata.get(self.after)
+        if not isinstance(before, datetime.datetime) or not isinstance(after, datetime.datetime):
+            return False
+        return before > after
+
+    def check_frame(self, frame):
+        before = frame[self.before].to_numpy(dtype='datetime64[ns]')
+        after = frame[self.after].to_numpy(dtype='datetime64[ns]')
+        return before > after  # NaT compares False
+
+
+class MismatchRule(Rule):
+    """Flag files where `field` and `other` are both set but differ."""
+
+    type = 'mismatch'
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self._require('field', 'other')
+        self.other = spec['other']
+        self.key = self.other
+        self.ignore_case = spec.get('ignore_case', False)
+        self.id = spec.get('id') or f"mismatch:{self.field}!={self.other}"
+
+    def default_message(self):
+        return f"{self.spec.get('other')} differs from {self.spec.get('field')}"
+
+    def fields(self):
+        return (self.field, self.other)
+
+    def check_one(self, metadata):
+        a, b = metadata.get(self.field), metadata.get(self.other)
+        if _missing(a) or _missing(b):
+            return False
+        a, b = str(a), str(b)
+        if self.ignore_case:
+            a, b = a.casefold(), b.casefold()
+        return a != b
+
+    def check_frame(self, frame):
+        normalize = (lambda value: str(value).casefold()) if self.ignore_case else str
+        a, b = _codes(frame[self.field], frame[self.other], normalize=normalize)
+        return (a >= 0) & (b >= 0) & (a != b)
+
+
+RULE_TYPES = {cls.type: cls for cls in (RequiredRule, RegexRule, AllowedRule, OrderRule, MismatchRule)}
+
+# The checks compare_to_industry_standards has always made
+DEFAULT_RULE_SPECS = [
+    {'id': 'creator-required', 'type': 'required', 'field': 'Creator', 'message': 'Missing creator'},
+    {'id': 'revision-numeric', 'type': 'regex', 'field': 'Revision', 'pattern': '[0-9]+',
+     'allow_missing': False, 'message': 'Invalid revision number'},
+]
+
+
+class RuleReport:
+    """Per-rule violation masks, hit counts and timings from RuleSet.evaluate()."""
+
+    def __init__(self, rules, masks, timings, rows):
+        self.rules = rules
+        self.masks = masks
+        self.timings = timings
+        self.rows = rows
+
+    def summary(self):
+        return [{'id': rule.id, 'type': rule.type, 'hits': int(mask.sum()), 'seconds': round(seconds, 4)}
+                for rule, mask, seconds in zip(self.rules, self.masks, self.timings)]
+
+    def any_violation(self):
+        """Boolean array, True for rows that break at least one rule."""
+        import numpy as np
+        if not self.masks:
+            return np.zeros(self.rows, dtype=bool)
+        return np.logical_or.reduce(self.masks)
+
+    def issues(self, row):
+        """Return the issues dict for one row, as RuleSet.check would."""
+        return {rule.key: rule.message for rule, mask in zip(self.rules, self.masks) if mask[row]}
+
+
+class RuleSet:
+    def __init__(self, specs):
+        self.rules = []
+        for spec in specs:
+            rule_type = spec.get('type')
+            if rule_type not in RULE_TYPES:
+                raise RuleError(f"Unknown rule type {rule_type!r}; expected one of {', '.join(RULE_TYPES)}")
+            self.rules.append(RULE_TYPES[rule_type](spec))
+
+    def __len__(self):
+        return len(self.rules)
+
+    def fields(self):
+        seen = []
+        for rule in self.rules:
+            seen.extend(field for field in rule.fields() if field not in seen)
+        return seen
+
+    def check(self, metadata):
+        """Return {key: message} for every rule one metadata dict violates."""
+        return {rule.key: rule.message for rule in self.rules if rule.check_one(metadata)}
+
+    def evaluate(self, frame):
+        """Check every row of a DataFrame; returns a RuleReport."""
+        missing = [field for field in self.fields() if field not in frame.columns]
+        if missing:
+            frame = frame.assign(**{field: None for field in missing})
+        masks, timings = [], []
+        for rule in self.rules:
+            start = time.perf_counter()
+            masks.append(rule.check_frame(frame))
+            timings.append(time.perf_counter() - start)
+        return RuleReport(self.rules, masks, timings, len(frame))
+
+
+def load_rules(path):
+    """Load a RuleSet from a .json, .yaml or .yml file."""
+    with open(path, encoding='utf-8') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            import yaml
+            specs = yaml.safe_load(f)
+        else:
+            specs = json.load(f)
+    if isinstance(specs, dict):
+        specs = specs.get('rules', [])
+    if not isinstance(specs, list):
+        raise RuleError(f"{path}: expected a list of rules")
+    return RuleSet(specs)
+
+
+DEFAULT_RULES = RuleSet(DEFAULT_RULE_SPECS)
+
+
+def records_to_frame(records, fields=None):
+    """Build a DataFrame (display-keyed columns) from MetadataRecords or scan dicts."""
+    import numpy as np
+    import pandas as pd
+    from records import MetadataRecord, CORE_FIELDS, FIELD_SLOTS, DATE_FIELDS
+
+    records = [MetadataRecord.from_scan(record) if isinstance(record, dict) else record for record in records]
+    nat = np.iinfo(np.int64).min
+    columns = {'Path': [record.path for record in records],
+               'File Modified': np.array([nat if record.mtime_ns is None else record.mtime_ns for record in records],
+                                         dtype=np.int64).view('datetime64[ns]')}
+    for field, slot in zip(CORE_FIELDS, FIELD_SLOTS):
+        if fields is not None and field not in fields:
+            continue
+        values = [getattr(record, slot) for record in records]
+        if field in DATE_FIELDS:
+            ints = np.array([value if isinstance(value, int) else nat for value in values], dtype=np.int64)
+            columns[field] = ints.view('datetime64[ns]')
+        else:
+            columns[field] = pd.Series(values, dtype=object)
+    return pd.DataFrame(columns)
+
+
+def read_frame(path, fields=None):
+    """Load exported records (.parquet, .csv or .jsonl) as a DataFrame."""
+    import pandas as pd
+    from records import DATE_FIELDS
+
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.parquet':
+        return pd.read_parquet(path)
+    if extension == '.csv':
+        frame = pd.read_csv(path, dtype=str, keep_default_na=False)
+        for field in DATE_FIELDS + ('File Modified',):
+            if field in frame.columns:
+                frame[field] = pd.to_datetime(frame[field], errors='coerce')
+        return frame
+    if extension == '.jsonl':
+        from records import MetadataRecord
+        with open(path, encoding='utf-8') as f:
+            records = []
+            for line in f:
+                record = json.loads(line)
+                metadata = record.get('metadata') or {}
+                for field in DATE_FIELDS:
+                    if isinstance(metadata.get(field), str):
+                        try:
+                            metadata[field] = datetime.datetime.fromisoformat(metadata[field])
+                        except ValueError:
+                            pass
+                records.append(MetadataRecord.from_scan(record))
+        return records_to_frame(records, fields)
+    raise ValueError(f"Unsupported input format {extension!r}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check exported metadata records against a rule set.")
+    parser.add_argument('input', help="records written by scanner.py --output")
+    parser.add_argument('--rules', metavar='FILE', default=None, help="YAML/JSON rules (default: built-in)")
+    parser.add_argument('--violations', metavar='CSV', default=None,
+                        help="write Path plus one column per violated rule for every failing file")
+    args = parser.parse_args(argv)
+
+    rules = load_rules(args.rules) if args.rules else DEFAULT_RULES
+    start = time.perf_counter()
+    frame = read_frame(args.input, rules.fields())
+    loaded = time.perf_counter() - start
+    report = rules.evaluate(frame)
+
+    print(f"{report.rows} records loaded in {loaded:.2f}s")
+    print(f"{'rule':40} {'hits':>10} {'seconds':>9}")
+    for row in report.summary():
+        print(f"{row['id']:40} {row['hits']:>10} {row['seconds']:>9.4f}")
+    failing = report.any_violation()
+    print(f"{int(failing.sum())} of {report.rows} records violate at least one rule "
+          f"({sum(report.timings):.3f}s checking)")
+
+    if args.violations:
+        import pandas as pd
+        out = pd.DataFrame({'Path': frame['Path'] if 'Path' in frame.columns else frame.index})
+        for rule, mask in zip(report.rules, report.masks):
+            out[rule.id] = mask
+        out[failing].to_csv(args.violations, index=False)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""Scan directory trees for metadata in parallel, headless.
+
+Usage: python scanner.py ROOT [--include GLOB] [--exclude GLOB] [--max-files N] [--workers N]
+                          [--cache DB] [--cache-max-entries N] [--cache-max-age DAYS]
+                          [--output FILE.csv|.jsonl|.parquet] [--trace TRACE.jsonl]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+
+from metadata_core import get_metadata, compare_to_industry_standards, SUPPORTED_EXTENSIONS
+from metadata_cache import MetadataCache, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_AGE_DAYS
+import tracing
+
+# Files handed to a worker per task; large enough to amortize pickling,
+# small enough that results keep streaming back.
+BATCH_SIZE = 32
+
+
+class ScanStats:
+    """Running totals for a scan, with throughput figures."""
+
+    def __init__(self):
+        self.files = 0
+        self.bytes = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def files_per_second(self):
+        return self.files / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def mb_per_second(self):
+        return self.bytes / (1024 * 1024) / self.elapsed if self.elapsed else 0.0
+
+    def as_dict(self):
+        return {
+            'files': self.files,
+            'bytes': self.bytes,
+            'errors': self.errors,
+            'elapsed': round(self.elapsed, 3),
+            'files_per_second': round(self.files_per_second, 1),
+            'mb_per_second': round(self.mb_per_second, 2),
+        }
+
+
+def matches_any(patterns, name, rel_path):
+    """Return True if any glob in patterns matches the file name or its path relative to the scan root."""
+    return any(fnmatch(name, pattern) or fnmatch(rel_path, pattern) for pattern in patterns)
+
+
+def iter_files(root, include=None, exclude=None, max_files=None):
+    """Yield (path, stat_result) for supported files under root in a stable, sorted order.
+
+    include/exclude are glob patterns matched against the file name and the
+    path relative to root; excluded directories are not descended into.
+    Without include, every file with a supported extension is yielded.
+    """
+    include = list(include or [])
+    exclude = list(exclude or [])
+    count = 0
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:
+            continue
+
+        subdirectories = []
+        for entry in entries:
+            rel_path = os.path.relpath(entry.path, root)
+            if exclude and matches_any(exclude, entry.name, rel_path):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+            if include:
+                if not matches_any(include, entry.name, rel_path):
+                    continue
+            elif not entry.name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                st = None
+            yield entry.path, st
+            count += 1
+            if max_files is not None and count >= max_files:
+                return
+        # Reversed so the stack pops subdirectories in name order
+        stack.extend(reversed(subdirectories))
+
+
+def scan_file(file_path, size=None):
+    """Extract metadata and issues for one file, capturing any error in the record."""
+    start = time.perf_counter()
+    record = {'path': file_path, 'size': size, 'metadata': None, 'issues': {}, 'error': None, 'cached': False}
+    try:
+        if size is None:
+            record['size'] = os.path.getsize(file_path)
+        metadata = get_metadata(file_path)
+        record['metadata'] = metadata
+        record['issues'] = compare_to_industry_standards(metadata)
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    record['elapsed'] = time.perf_counter() - start
+    return record
+
+
+def _scan_batch(batch):
+    """Scan a batch in a worker; returns the records and the worker's timing histograms."""
+    with tracing.span('batch', fmt='', nbytes=sum(size or 0 for _, size in batch), files=len(batch)):
+        records = [scan_file(file_path, size) for file_path, size in batch]
+    return records, tracing.drain()
+
+
+def _batches(files, batch_size):
+    batch = []
+    for item in files:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _cached_record(file_path, st, cache):
+    if cache is None or st is None:
+        return None
+    cached = cache.get(file_path, st)
+    if cached is None:
+        return None
+    metadata, issues = cached
+    return {'path': file_path, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'metadata': metadata,
+            'issues': issues, 'error': None, 'cached': True, 'elapsed': 0.0}
+
+
+def _submit(executor, batch, cache):
+    """Answer what the cache can and send the rest of the batch to the pool."""
+    slots = [_cached_record(file_path, st, cache) for file_path, st in batch]
+    misses = [(file_path, st.st_size if st is not None else None)
+              for (file_path, st), slot in zip(batch, slots) if slot is None]
+    future = executor.submit(_scan_batch, misses) if misses else None
+    return batch, slots, future
+
+
+def _collect(batch, slots, future, cache):
+    results = ()
+    if future is not None:
+        results, timings = future.result()
+        tracing.merge(timings)
+    results = iter(results)
+    for (file_path, st), slot in zip(batch, slots):
+        if slot is not None:
+            yield slot
+            continue
+        record = next(results)
+        record['mtime_ns'] = st.st_mtime_ns if st is not None else None
+        if cache is not None and st is not None and record['error'] is None:
+            cache.put(file_path, record['metadata'], record['issues'], st)
+        yield record
+
+
+def scan_tree(root, include=None, exclude=None, max_files=None, workers=None, stats=None,
+              batch_size=BATCH_SIZE, cache=None):
+    """Scan every supported file under root in a process pool, yielding records in walk order.
+
+    Each record is a dict with path, size, mtime_ns, metadata, issues,
+    error, cached and elapsed. A file that fails to parse yields a record with error set
+    instead of stopping the scan. Only a bounded window of batches is in
+    flight, so memory stays flat however large the tree is. Pass a
+    ScanStats to collect throughput figures, and a MetadataCache to skip
+    files that have not changed since they were last scanned.
+    """
+    stats = stats if stats is not None else ScanStats()
+    workers = workers or os.cpu_count() or 1
+    files = iter_files(root, include, exclude, max_files)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        batches = _batches(files, batch_size)
+        for batch in batches:
+            pending.append(_submit(executor, batch, cache))
+            if len(pending) >= workers * 2:
+                break
+
+        while pending:
+            for record in _collect(*pending.popleft(), cache):
+                stats.files += 1
+                stats.bytes += record['size'] or 0
+                stats.errors += record['error'] is not None
+                yield record
+            batch = next(batches, None)
+            if batch is not None:
+                pending.append(_submit(executor, batch, cache))
+
+    if cache is not None:
+        cache.commit()
+    stats.finished = time.perf_counter()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scan a directory tree and print one JSON record per file.")
+    parser.add_argument('root')
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB',
+                        help="only scan files matching GLOB (repeatable)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="skip files and directories matching GLOB (repeatable)")
+    parser.add_argument('--max-files', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--cache', metavar='DB', default=None,
+                        help="SQLite metadata cache; unchanged files are not re-parsed")
+    parser.add_argument('--cache-max-entries', type=int, default=DEFAULT_MAX_ENTRIES, metavar='N',
+                        help="keep at most N recently used cache entries; 0 for no limit (default: %(default)s)")
+    parser.add_argument('--cache-max-age', type=float, default=DEFAULT_MAX_AGE_DAYS, metavar='DAYS',
+                        help="drop cache entries stored more than DAYS ago; 0 for no limit (default: %(default)s)")
+    parser.add_argument('--output', metavar='FILE', default=None,
+                        help="write records to a .csv, .jsonl or .parquet file instead of stdout")
+    parser.add_argument('--trace', metavar='TRACE.jsonl', default=None,
+                        help="append per-stage timing spans (see tracing.py)")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        tracing.configure(trace_path=args.trace)
+
+    stats = ScanStats()
+    cache = None
+    if args.cache:
+        cache = MetadataCache(args.cache, max_entries=args.cache_max_entries or None,
+                              max_age=args.cache_max_age * 86400 if args.cache_max_age else None)
+    records = scan_tree(args.root, args.include, args.exclude, args.max_files, args.workers, stats, cache=cache)
+    if args.output:
+        from records import export_records
+        export_records(records, args.output)
+    else:
+        for record in records:
+            print(json.dumps(record, default=str))
+
+    summary = stats.as_dict()
+    print(f"Scanned {summary['files']} files ({summary['errors']} errors) in {summary['elapsed']}s: "
+          f"{summary['files_per_second']} files/s, {summary['mb_per_second']} MB/s", file=sys.stderr)
+    if cache is not None:
+        cache_stats = cache.stats()
+        print(f"Cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, "
+              f"{cache_stats['entries']} entries", file=sys.stderr)
+        cache.evict()
+        cache.close()
+
+
+if __name__ == '__main__':
+    main()
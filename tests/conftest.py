@@ -0,0 +1,37 @@
+import os
+import shutil
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'benchmarks'))
+
+import corpus
+
+SAMPLE_DOCX = os.path.join(REPO_ROOT, 'Project TVI Planning Notes.docx')
+SAMPLE_XLSX = os.path.join(REPO_ROOT, 'Timesheet record CSCIL.xlsx')
+
+
+@pytest.fixture(autouse=True)
+def _audit_log(monkeypatch, tmp_path_factory):
+    # Writes are audited, as they are by default; keep the entries out of the user's log
+    monkeypatch.setenv('METADATA_AUDIT_LOG', str(tmp_path_factory.mktemp('audit')))
+
+
+@pytest.fixture(scope='session')
+def corpus_files(tmp_path_factory):
+    """{kind: path} of the small synthetic corpus (xlsx, docx, pdf, png, jpg)."""
+    directory = tmp_path_factory.mktemp('corpus')
+    return {entry['kind']: entry['path'] for entry in corpus.generate(str(directory), ('small',))}
+
+
+@pytest.fixture
+def copy_of(tmp_path):
+    """Return a function copying a corpus kind or a file path into tmp_path."""
+    def copy(source, name=None):
+        target = tmp_path / (name or os.path.basename(source))
+        shutil.copyfile(source, target)
+        return str(target)
+    return copy
@@ -0,0 +1,82 @@
+import datetime
+import io
+import tarfile
+import time
+import zipfile
+
+import pytest
+
+from archives import scan_archive, iter_members, SEPARATOR
+from timestamps import to_ns
+
+
+def _zip_bytes(members):
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as zf:
+        for name, data, date_time in members:
+            zf.writestr(zipfile.ZipInfo(name, date_time=date_time), data)
+    return out.getvalue()
+
+
+@pytest.fixture
+def new_york(monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip("needs time.tzset")
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def test_zip_times_are_local_wall_clock(tmp_path, new_york):
+    path = tmp_path / 'a.zip'
+    path.write_bytes(_zip_bytes([('note.txt', b'x', (2021, 7, 1, 12, 0, 0))]))
+    [(name, size, mtime_ns, _)] = list(iter_members(str(path)))
+    assert (name, size) == ('note.txt', 1)
+    # Noon in New York (EDT) is 16:00 UTC
+    assert mtime_ns == to_ns(datetime.datetime(2021, 7, 1, 16, 0, 0))
+
+
+def test_zero_dos_date_does_not_hide_later_members(tmp_path):
+    path = tmp_path / 'zero.zip'
+    path.write_bytes(_zip_bytes([('first.txt', b'1', (2021, 7, 1, 12, 0, 0)),
+                                 ('zero.txt', b'2', (1980, 0, 0, 0, 0, 0)),
+                                 ('last.txt', b'3', (2021, 7, 1, 12, 0, 0))]))
+    records = list(scan_archive(str(path), all_members=True))
+    assert [record['path'].rsplit(SEPARATOR, 1)[1] for record in records] == ['first.txt', 'zero.txt', 'last.txt']
+    assert all(record['error'] is None for record in records)
+    assert records[1]['mtime_ns'] is None and records[2]['mtime_ns'] is not None
+
+
+def test_nested_archives_are_scanned_without_extracting(tmp_path, corpus_files):
+    with open(corpus_files['docx'], 'rb') as f:
+        docx = f.read()
+    inner = _zip_bytes([('docs/report.docx', docx, (2020, 1, 2, 3, 4, 6)),
+                        ('readme.txt', b'hello', (2020, 1, 2, 3, 4, 6))])
+    archive = tmp_path / 'evidence.tar.gz'
+    with tarfile.open(archive, 'w:gz') as tf:
+        info = tarfile.TarInfo('mail/attachments.zip')
+        info.size = len(inner)
+        info.mtime = 1600000000
+        tf.addfile(info, io.BytesIO(inner))
+
+    records = list(scan_archive(str(archive)))
+    paths = [record['path'] for record in records]
+    outer = str(archive) + SEPARATOR + 'mail/attachments.zip'
+    assert paths == [outer + SEPARATOR + 'docs/report.docx', outer]
+    report, nested = records
+    assert report['error'] is None and report['metadata']['Title']
+    assert len(report['digests']['sha256']) == 64 and report['size'] == len(docx)
+    assert nested['metadata'] is None and nested['mtime_ns'] == 1600000000 * 10 ** 9
+
+    everything = [record['path'] for record in scan_archive(str(archive), all_members=True)]
+    assert outer + SEPARATOR + 'readme.txt' in everything
+    assert [record['path'] for record in scan_archive(str(archive), max_depth=0)] == []
+
+
+def test_unreadable_archive_yields_one_error_record(tmp_path):
+    path = tmp_path / 'broken.zip'
+    path.write_bytes(b'PK\x03\x04 not really')
+    [record] = list(scan_archive(str(path)))
+    assert record['path'] == str(path) and record['error']
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import async_metadata
+from async_metadata import AsyncMetadata
+
+
+class _Recorder:
+    """Stands in for set_metadata and records the most writes to one path running at once."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.most = 0
+        self.calls = 0
+
+    def __call__(self, file_path, new_metadata):
+        with self.lock:
+            self.active[file_path] = self.active.get(file_path, 0) + 1
+            self.calls += 1
+            self.most = max(self.most, self.active[file_path])
+        time.sleep(0.02)
+        with self.lock:
+            self.active[file_path] -= 1
+        return new_metadata
+
+
+@pytest.fixture
+def threaded(monkeypatch):
+    """An AsyncMetadata whose 'process' pool is threads, so a patched writer is seen by it."""
+    meta = AsyncMetadata(concurrency=8)
+    pool = ThreadPoolExecutor(8)
+    monkeypatch.setattr(meta, '_process_pool', lambda: pool)
+    yield meta
+    pool.shutdown()
+
+
+def test_writes_to_one_path_never_overlap(threaded, monkeypatch, tmp_path):
+    recorder = _Recorder()
+    monkeypatch.setattr(async_metadata, 'set_metadata', recorder)
+    path = str(tmp_path / 'a.docx')
+
+    async def run():
+        # Three writes queue up at once, more arrive while earlier ones still wait
+        first = [asyncio.ensure_future(threaded.set_metadata(path, {'Title': str(i)})) for i in range(3)]
+        await asyncio.sleep(0.03)
+        later = [asyncio.ensure_future(threaded.set_metadata(path, {'Title': str(i)})) for i in range(3, 6)]
+        other = threaded.set_metadata(str(tmp_path / 'b.docx'), {'Title': 'b'})
+        return await asyncio.gather(*first, *later, other)
+
+    results = asyncio.run(run())
+    assert [result['Title'] for result in results] == ['0', '1', '2', '3', '4', '5', 'b']
+    assert recorder.calls == 7 and recorder.most == 1
+    assert threaded._write_locks == {}
+
+
+def test_iter_metadata_reads_and_hashes_every_file(corpus_files, tmp_path):
+    missing = str(tmp_path / 'missing.docx')
+    paths = list(corpus_files.values()) + [missing]
+
+    async def run():
+        async with AsyncMetadata(concurrency=2, process_workers=1) as meta:
+            return [result async for result in meta.iter_metadata(paths, hash=True)]
+
+    results = {result['path']: result for result in asyncio.run(run())}
+    assert set(results) == set(paths)
+    assert results[missing]['error'] and results[missing]['metadata'] is None
+    assert results[corpus_files['docx']]['metadata']['Title']
+    assert all(len(results[path]['sha256']) == 64 for path in corpus_files.values())
+
+
+def test_cancelled_hash_stops_its_thread(tmp_path, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_hash(file_path, algorithm, cancelled):
+        started.set()
+        release.wait(5)
+        if cancelled.is_set():
+            raise async_metadata.HashCancelled(file_path)
+        return 'done'
+
+    monkeypatch.setattr(async_metadata, '_hash', slow_hash)
+
+    async def run():
+        meta = AsyncMetadata()
+        task = asyncio.ensure_future(meta.hash(str(tmp_path / 'x')))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait)
+        task.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await meta.close()
+
+    asyncio.run(run())
@@ -0,0 +1,90 @@
+import datetime
+import json
+
+import pytest
+
+import audit_log
+import cli
+from audit_log import AuditLog, AuditLogError, default_log, recording
+from metadata_core import set_metadata
+from ooxml_props import write_core_properties
+
+
+def test_writes_are_logged_by_default(tmp_path, monkeypatch, copy_of, corpus_files):
+    monkeypatch.delenv('METADATA_AUDIT_LOG')
+    monkeypatch.setattr(audit_log, 'DEFAULT_LOG_DIR', str(tmp_path / 'home-audit'))
+    path = copy_of(corpus_files['docx'])
+    assert cli.main(['set', path, 'Creator=Default']) == 0
+
+    log = default_log()
+    assert log.directory == str(tmp_path / 'home-audit')
+    [change] = log.changes(path=path, prop='Creator')
+    assert change['new'] == 'Default'
+
+
+def test_the_environment_moves_or_turns_off_the_log(tmp_path, monkeypatch, copy_of, corpus_files):
+    monkeypatch.setenv('METADATA_AUDIT_LOG', str(tmp_path / 'case'))
+    assert default_log().directory == str(tmp_path / 'case')
+    monkeypatch.setenv('METADATA_AUDIT_LOG', 'off')
+    assert default_log() is None
+    set_metadata(copy_of(corpus_files['docx']), {'Creator': 'Nobody'})
+    assert not (tmp_path / 'case' / '00000001.log').exists()
+
+
+def test_set_metadata_logs_the_change(tmp_path, monkeypatch, copy_of, corpus_files):
+    monkeypatch.setenv('METADATA_AUDIT_LOG', str(tmp_path / 'audit'))
+    path = copy_of(corpus_files['docx'])
+    set_metadata(path, {'Creator': 'Auditor'})
+
+    log = default_log()
+    assert log.head()[0] == 1
+    entry = log.entry(1)
+    assert entry['path'] == path and entry['source'] == 'set_metadata'
+    assert entry['changes']['Creator'][1] == 'Auditor'
+    assert entry['sha256_before'] != entry['sha256_after']
+
+
+def _log_writes(log, path, creators):
+    for creator in creators:
+        with recording(path, 'test', log=log):
+            write_core_properties(path, {'Creator': creator})
+
+
+def test_verify_detects_a_tampered_entry(tmp_path, copy_of, corpus_files):
+    path = copy_of(corpus_files['docx'])
+    with AuditLog(str(tmp_path / 'audit')) as log:
+        _log_writes(log, path, ['First', 'Second', 'Third'])
+        head = log.verify()
+        assert head == log.head() and head[0] == 3
+        with pytest.raises(AuditLogError):
+            log.verify((4, head[1]))
+
+    segment = tmp_path / 'audit' / '00000001.log'
+    lines = segment.read_bytes().splitlines(keepends=True)
+    entry = json.loads(lines[1])
+    entry['changes']['Creator'][1] = 'Forged'
+    lines[1] = (json.dumps(entry) + '\n').encode('utf-8')
+    segment.write_bytes(b''.join(lines))
+    with AuditLog(str(tmp_path / 'audit')) as log:
+        with pytest.raises(AuditLogError, match='Entry 2'):
+            log.verify()
+
+
+def test_changes_queries_and_index_rebuild(tmp_path, copy_of, corpus_files):
+    docx = copy_of(corpus_files['docx'])
+    xlsx = copy_of(corpus_files['xlsx'])
+    with AuditLog(str(tmp_path / 'audit')) as log:
+        _log_writes(log, docx, ['Alice', 'Bob'])
+        with recording(xlsx, 'test', log=log):
+            write_core_properties(xlsx, {'Title': 'Sheet'})
+
+        assert [change['new'] for change in log.changes(path=docx, prop='Creator')] == ['Alice', 'Bob']
+        assert [change['path'] for change in log.changes(prop='Title')] == [xlsx]
+        assert {change['path'] for change in log.changes(under=str(tmp_path))} == {docx, xlsx}
+        assert list(log.changes(under=str(tmp_path / 'elsewhere'))) == []
+        assert list(log.changes(since=datetime.datetime(2000, 1, 1), limit=1))[0]['seq'] == 1
+        expected = list(log.changes())
+
+        assert log.rebuild_index() == 3
+        assert list(log.changes()) == expected
+        log.verify()
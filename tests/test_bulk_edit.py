@@ -0,0 +1,45 @@
+import json
+
+from bulk_edit import plan_changes, edit_file, bulk_edit, load_manifest, resolve_manifest
+from conftest import SAMPLE_DOCX
+from ooxml_props import read_core_properties
+
+
+def test_plan_only_lists_real_changes_and_bumps_revision():
+    current = {'Creator': 'A', 'Category': 'x', 'Revision': '4'}
+    assert plan_changes(current, {'Creator': 'A'}) == {}
+    assert plan_changes(current, {'Creator': 'B'}) == {'Creator': ('A', 'B'), 'Revision': ('4', '5')}
+    assert plan_changes({}, {'Creator': 'B'})['Revision'] == (None, '1')
+    assert 'Revision' not in plan_changes(current, {'Creator': 'B'}, bump_revision=False)
+
+
+def test_non_numeric_revision_is_left_alone():
+    assert plan_changes({'Revision': '1.2'}, {'Creator': 'B'}) == {'Creator': (None, 'B')}
+
+
+def test_manifest_globs_merge_in_order(tmp_path):
+    for name in ('a.docx', 'b.docx', 'notes.txt'):
+        (tmp_path / name).write_bytes(b'')
+    manifest = tmp_path / 'manifest.json'
+    manifest.write_text(json.dumps([{'path': '*', 'properties': {'Company': 'Acme', 'Category': 'old'}},
+                                    {'path': 'b.docx', 'properties': {'Category': 'new'}}]))
+    targets = resolve_manifest(load_manifest(str(manifest)), str(tmp_path))
+    assert targets == {str(tmp_path / 'a.docx'): {'Company': 'Acme', 'Category': 'old'},
+                       str(tmp_path / 'b.docx'): {'Company': 'Acme', 'Category': 'new'}}
+
+
+def test_company_on_a_document_without_app_xml(copy_of):
+    path = copy_of(SAMPLE_DOCX)
+    record = edit_file(path, {'Company': 'Acme', 'Category': 'Plans'})
+    assert record['status'] == 'changed', record['error']
+    properties = read_core_properties(path, include_app=True)
+    assert (properties['Company'], properties['Category']) == ('Acme', 'Plans')
+
+
+def test_failures_are_reported_per_file(copy_of, tmp_path):
+    good = copy_of(SAMPLE_DOCX)
+    bad = tmp_path / 'bad.docx'
+    bad.write_bytes(b'not a zip')
+    records = list(bulk_edit({str(bad): {'Creator': 'X'}, good: {'Creator': 'X'}}, workers=2))
+    assert [record['status'] for record in records] == ['failed', 'changed']
+    assert read_core_properties(good)['Creator'] == 'X'
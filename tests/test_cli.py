@@ -0,0 +1,22 @@
+import datetime
+
+import pytest
+
+import cli
+from ooxml_props import read_core_properties
+
+
+@pytest.mark.parametrize('text', ['2024-01-01 10:00:00', '2024-01-01T10:00:00', '2024-01-01T11:00:00+01:00'])
+def test_set_accepts_dates_as_show_prints_them(corpus_files, copy_of, text):
+    path = copy_of(corpus_files['docx'])
+    assert cli.main(['set', path, f'Created={text}', 'Title=Dated']) == 0
+    metadata = read_core_properties(path)
+    assert metadata['Created'] == datetime.datetime(2024, 1, 1, 10, 0, 0)
+    assert metadata['Title'] == 'Dated'
+
+
+def test_set_rejects_a_date_it_cannot_read(corpus_files, copy_of):
+    path = copy_of(corpus_files['docx'])
+    with pytest.raises(SystemExit):
+        cli.main(['set', path, 'Modified=last tuesday'])
+    assert read_core_properties(path) == read_core_properties(corpus_files['docx'])
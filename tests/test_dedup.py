@@ -0,0 +1,40 @@
+import shutil
+import zipfile
+
+from dedup import find_duplicates, member_signature, DedupStats
+from ooxml_props import find_part, write_core_properties, CORE_PART, CORE_REL_TYPE
+
+
+def test_find_part_follows_the_package_relationships(tmp_path):
+    path = tmp_path / 'moved.docx'
+    rels = ('<?xml version="1.0" encoding="UTF-8"?><Relationships '
+            'xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'<Relationship Id="rId1" Type="{CORE_REL_TYPE}" Target="/meta/core.xml"/></Relationships>')
+    with zipfile.ZipFile(path, 'w') as zf:
+        zf.writestr('_rels/.rels', rels)
+        zf.writestr('meta/core.xml', '<x/>')
+    with zipfile.ZipFile(path) as zf:
+        assert find_part(zf, CORE_PART, CORE_REL_TYPE) == 'meta/core.xml'
+        assert find_part(zf, 'docProps/app.xml', 'urn:none') is None
+
+
+def test_exact_and_near_duplicates(tmp_path, corpus_files):
+    original = tmp_path / 'a.docx'
+    shutil.copyfile(corpus_files['docx'], original)
+    shutil.copyfile(original, tmp_path / 'a copy.docx')
+    near = tmp_path / 'b.docx'
+    shutil.copyfile(original, near)
+    write_core_properties(str(near), {'Creator': 'Someone else'})
+    shutil.copyfile(corpus_files['xlsx'], tmp_path / 'other.xlsx')
+    assert member_signature(str(original)) == member_signature(str(near))
+
+    stats = DedupStats()
+    clusters = find_duplicates(str(tmp_path), workers=1, stats=stats)
+    exact = [cluster for cluster in clusters if cluster['kind'] == 'exact']
+    assert [cluster['paths'] for cluster in exact] == [[str(tmp_path / 'a copy.docx'), str(original)]]
+    near_clusters = [cluster for cluster in clusters if cluster['kind'] == 'near']
+    assert len(near_clusters) == 1 and str(near) in near_clusters[0]['paths']
+    assert near_clusters[0]['differences']['Creator'][str(near)] == 'Someone else'
+    assert stats.files == 4 and stats.ooxml == 4
+
+    assert all(cluster['kind'] == 'exact' for cluster in find_duplicates(str(tmp_path), workers=1, near=False))
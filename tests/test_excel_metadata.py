@@ -0,0 +1,23 @@
+import excel_metadata
+import metadata_core
+from excel_metadata import set_excel_metadata
+from ooxml_props import read_core_properties, write_core_properties
+
+
+def test_set_counts_a_numeric_revision_up(corpus_files, copy_of):
+    path = copy_of(corpus_files['xlsx'])
+    write_core_properties(path, {'Revision': '7'})
+    metadata = set_excel_metadata(path, {'Creator': 'Someone'})
+    assert metadata['Creator'] == 'Someone' and metadata['Revision'] == '8'
+
+
+def test_set_keeps_a_non_numeric_revision(corpus_files, copy_of):
+    path = copy_of(corpus_files['xlsx'])
+    write_core_properties(path, {'Revision': 'draft'})
+    metadata = set_excel_metadata(path, {'Title': 'Quarterly'})
+    assert metadata['Title'] == 'Quarterly' and metadata['Revision'] == 'draft'
+    assert read_core_properties(path)['Revision'] == 'draft'
+
+
+def test_reader_is_the_registered_one():
+    assert excel_metadata.get_excel_metadata is metadata_core.get_excel_metadata
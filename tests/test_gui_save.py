@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip('tkinter')
+
+from MetaToolGui import save_metadata, edited_values
+from ooxml_props import read_core_properties, write_core_properties, next_revision
+
+
+class Task:
+    def set_total(self, total):
+        pass
+
+    def set_stage(self, stage):
+        pass
+
+    def advance(self, amount):
+        pass
+
+
+def _table(metadata):
+    """What the GUI table holds for metadata, as on_save reads it back."""
+    return {key: 'None' if value is None else str(value) for key, value in metadata.items()}
+
+
+def test_edited_values_keeps_only_real_edits():
+    displayed = {'Title': 'Old', 'Subject': '', 'Language': ''}
+    current = {'Title': 'New', 'Subject': '', 'Language': 'None'}
+    assert edited_values(displayed, current) == {'Title': 'New'}
+
+
+def test_saving_the_whole_table_does_not_write_none_text(corpus_files, copy_of):
+    path = copy_of(corpus_files['docx'])
+    write_core_properties(path, {'Content Status': None, 'Language': None, 'Identifier': None})
+    table = _table(read_core_properties(path))
+    table['Title'] = 'Edited'
+    save_metadata(path, table, Task())
+
+    metadata = read_core_properties(path)
+    assert metadata['Title'] == 'Edited'
+    assert metadata['Content Status'] is None
+    assert metadata['Language'] is None
+    assert metadata['Identifier'] is None
+
+
+def test_xlsx_without_dates_saves(corpus_files, copy_of):
+    path = copy_of(corpus_files['xlsx'])
+    write_core_properties(path, {'Created': None, 'Modified': None})
+    revision = read_core_properties(path)['Revision']
+    table = _table(read_core_properties(path))
+    table['Creator'] = 'Someone'
+    save_metadata(path, table, Task())
+
+    metadata = read_core_properties(path)
+    assert metadata['Creator'] == 'Someone'
+    assert metadata['Created'] is None
+    assert metadata['Revision'] == revision
+
+
+def test_xlsx_keeps_a_typed_non_numeric_revision(corpus_files, copy_of):
+    path = copy_of(corpus_files['xlsx'])
+    save_metadata(path, {'Revision': '1.2'}, Task())
+    assert read_core_properties(path)['Revision'] == '1.2'
+    save_metadata(path, {'Creator': 'Someone'}, Task())
+    assert read_core_properties(path)['Revision'] == '1.2'
+
+
+def test_xlsx_revision_counts_up_when_not_edited(corpus_files, copy_of):
+    path = copy_of(corpus_files['xlsx'])
+    revision = read_core_properties(path)['Revision']
+    save_metadata(path, {'Creator': 'Someone'}, Task())
+    assert read_core_properties(path)['Revision'] == next_revision(revision)
+
+
+def test_only_sent_fields_change(corpus_files, copy_of):
+    path = copy_of(corpus_files['docx'])
+    before = read_core_properties(path)
+    save_metadata(path, {'Keywords': 'a, b'}, Task())
+    after = read_core_properties(path)
+    assert after['Keywords'] == 'a, b'
+    assert {key: value for key, value in after.items() if key != 'Keywords'} == \
+        {key: value for key, value in before.items() if key != 'Keywords'}
@@ -0,0 +1,57 @@
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cli
+import handlers
+from conftest import REPO_ROOT, SAMPLE_DOCX
+from metadata_core import get_metadata, set_metadata, UnsupportedFileError
+
+
+def test_registering_a_handler_imports_nothing():
+    code = "import sys, metadata_core; print(sorted({'openpyxl', 'docx', 'PyPDF2', 'PIL'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True,
+                            check=True).stdout
+    assert output.strip() == '[]'
+
+
+@pytest.mark.parametrize('kind, name', [('xlsx', 'excel'), ('docx', 'word'), ('pdf', 'pdf'), ('png', 'image'),
+                                        ('jpg', 'image')])
+def test_content_decides_when_the_extension_is_wrong(corpus_files, copy_of, kind, name):
+    path = copy_of(corpus_files[kind], 'renamed.bin')
+    assert handlers.handler_for(path).name == name
+    assert handlers.handler_for(path, sniff=False) is None
+
+
+def test_reading_from_a_file_object(corpus_files):
+    with open(corpus_files['docx'], 'rb') as f:
+        from_stream = get_metadata('member.docx', fileobj=io.BytesIO(f.read()))
+    assert from_stream == get_metadata(corpus_files['docx'])
+
+
+def test_unsupported_files_raise(tmp_path, corpus_files):
+    path = tmp_path / 'notes.txt'
+    path.write_text('plain text')
+    with pytest.raises(UnsupportedFileError):
+        get_metadata(str(path))
+    with pytest.raises(UnsupportedFileError):
+        set_metadata(corpus_files['pdf'], {'Title': 'x'})
+
+
+def test_cli_set_then_show(copy_of, capsys):
+    path = copy_of(SAMPLE_DOCX)
+    assert cli.main(['set', path, 'Creator=CLI user', 'Category=Notes']) == 0
+    capsys.readouterr()
+    assert cli.main(['show', path, '--json']) == 0
+    shown = json.loads(capsys.readouterr().out)
+    assert (shown['metadata']['Creator'], shown['metadata']['Category']) == ('CLI user', 'Notes')
+
+
+def test_cli_reports_unknown_commands_and_unreadable_files(tmp_path, capsys):
+    assert cli.main(['frobnicate']) == 2
+    assert cli.main(['show', os.path.join(str(tmp_path), 'missing.docx')]) == 1
+    assert 'missing.docx' in capsys.readouterr().err
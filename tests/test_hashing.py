@@ -0,0 +1,51 @@
+import hashlib
+
+from hashing import hash_file, hash_files, partial_hash, PARTIAL_CHUNK_SIZE
+from metadata_cache import MetadataCache
+
+
+def test_hash_file_matches_hashlib(tmp_path):
+    data = bytes(range(256)) * 9000
+    path = tmp_path / 'blob.bin'
+    path.write_bytes(data)
+    seen = []
+    digests = hash_file(str(path), ('sha256', 'md5'), progress=seen.append)
+    assert digests == {'sha256': hashlib.sha256(data).hexdigest(), 'md5': hashlib.md5(data).hexdigest()}
+    assert sum(seen) == len(data)
+
+
+def test_partial_hash_sees_head_tail_and_size(tmp_path):
+    body = b'x' * (PARTIAL_CHUNK_SIZE * 3)
+    a, b, c = tmp_path / 'a', tmp_path / 'b', tmp_path / 'c'
+    a.write_bytes(body)
+    b.write_bytes(body[:-1] + b'y')
+    c.write_bytes(body[:PARTIAL_CHUNK_SIZE] + b'y' + body[PARTIAL_CHUNK_SIZE + 1:])
+    assert partial_hash(str(a)) != partial_hash(str(b))
+    # A change in the middle is invisible to the fingerprint by design
+    assert partial_hash(str(a)) == partial_hash(str(c))
+
+
+def test_hash_files_keeps_order_and_reports_errors(tmp_path):
+    paths = []
+    for i in range(20):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(str(i).encode())
+        paths.append(str(path))
+    paths.insert(5, str(tmp_path / 'missing.bin'))
+    records = list(hash_files(paths, ('sha1',), workers=4))
+    assert [record['path'] for record in records] == paths
+    assert records[5]['error'] and records[5]['digests'] is None
+    assert records[0]['digests'] == {'sha1': hashlib.sha1(b'0').hexdigest()}
+
+
+def test_digest_lookups_have_their_own_counters(tmp_path):
+    path = tmp_path / 'a.bin'
+    path.write_bytes(b'abc')
+    with MetadataCache(str(tmp_path / 'cache.sqlite')) as cache:
+        first = list(hash_files([str(path)], ('sha256',), cache=cache))
+        second = list(hash_files([str(path)], ('sha256',), cache=cache))
+        assert not first[0]['cached'] and second[0]['cached']
+        assert first[0]['digests'] == second[0]['digests']
+        stats = cache.stats()
+    assert (stats['digest_hits'], stats['digest_misses']) == (1, 1)
+    assert (stats['hits'], stats['misses']) == (0, 0)
@@ -0,0 +1,75 @@
+import io
+import struct
+
+import pytest
+
+from image_info import read_image_metadata, read_image_headers, parse_tiff, parse_iptc, ImageMetadataError
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def _jpeg_with_exif():
+    exif = Image.Exif()
+    exif[0x010f] = 'TestCam'
+    exif[0x0110] = 'Model 7'
+    exif[0x0132] = '2021:05:06 07:08:09'
+    exif.get_ifd(0x8769)[0x9003] = '2021:05:06 07:08:00'
+    exif.get_ifd(0x8825)[0x0001] = 'N'
+    out = io.BytesIO()
+    Image.new('RGB', (8, 8)).save(out, 'JPEG', exif=exif.tobytes())
+    return out.getvalue()
+
+
+def test_jpeg_exif_with_sub_ifds():
+    metadata = read_image_metadata(io.BytesIO(_jpeg_with_exif()))
+    assert (metadata['Make'], metadata['Model']) == ('TestCam', 'Model 7')
+    assert metadata['DateTimeOriginal'] == '2021:05:06 07:08:00'
+    assert metadata['GPSInfo'] == {'GPSLatitudeRef': 'N'}
+
+
+def test_matches_pillow_on_the_corpus(corpus_files):
+    with Image.open(corpus_files['jpg']) as image:
+        exif = image.getexif()
+        expected = dict(exif)
+        expected.update(exif.get_ifd(0x8769))
+    from PIL.ExifTags import TAGS
+    metadata = read_image_metadata(corpus_files['jpg'])
+    for tag, value in expected.items():
+        # Pillow gives sub-IFD offsets where image_info nests the IFD itself
+        if isinstance(value, (str, int)) and tag not in (0x8769, 0x8825):
+            assert metadata[TAGS[tag]] == value, TAGS[tag]
+
+
+def test_png_text_and_xmp():
+    from PIL.PngImagePlugin import PngInfo
+    info = PngInfo()
+    info.add_text('Author', 'Someone')
+    info.add_itxt('XML:com.adobe.xmp', '<x:xmpmeta/>')
+    out = io.BytesIO()
+    Image.new('RGB', (4, 4)).save(out, 'PNG', pnginfo=info)
+    headers = read_image_headers(io.BytesIO(out.getvalue()))
+    assert headers['Text'] == {'Author': 'Someone'}
+    assert headers['XMP'] == '<x:xmpmeta/>'
+
+
+def test_big_endian_rationals_and_user_comment():
+    comment = b'ASCII\x00\x00\x00hello'
+    entries = [(0x011a, 5, 1, 38), (0x9286, 7, len(comment), 46)]
+    ifd = struct.pack('>H', len(entries)) + b''.join(struct.pack('>HHLL', *entry) for entry in entries)
+    data = b'MM\x00*' + struct.pack('>L', 8) + ifd + struct.pack('>L', 0) + struct.pack('>LL', 300, 2) + comment
+    assert parse_tiff(data) == {'XResolution': 150.0, 'UserComment': 'hello'}
+
+
+def test_iptc_records():
+    def dataset(number, value):
+        return struct.pack('>BBBH', 0x1c, 2, number, len(value)) + value
+    block = dataset(5, b'Headline title') + dataset(25, b'one') + dataset(25, b'two')
+    resource = b'8BIM' + struct.pack('>H', 0x0404) + b'\x00\x00' + struct.pack('>L', len(block)) + block
+    assert parse_iptc(resource) == {'ObjectName': 'Headline title', 'Keywords': ['one', 'two']}
+
+
+def test_unknown_files_raise_and_truncated_headers_are_tolerated():
+    with pytest.raises(ImageMetadataError):
+        read_image_metadata(io.BytesIO(b'plain text, not an image'))
+    # An EXIF block cut short yields what could be read, not an exception
+    assert read_image_headers(io.BytesIO(_jpeg_with_exif()[:40])) == {'Exif': {}}
@@ -0,0 +1,75 @@
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+import scanner
+from metadata_cache import MetadataCache, dumps, loads
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with MetadataCache(str(tmp_path / 'cache.sqlite')) as cache:
+        yield cache
+
+
+def _file(tmp_path, name, text='data'):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_values_round_trip():
+    metadata = {'Created': datetime(2020, 1, 2, 3, 4, 5), 'Thumb': b'\x00\xff', 'Pages': 3, 'Tags': ['a', 'b']}
+    assert loads(dumps(metadata)) == metadata
+
+
+def test_hit_miss_rename_and_edit(cache, tmp_path):
+    path = _file(tmp_path, 'a.docx')
+    assert cache.get(path) is None
+    cache.put(path, {'Title': 'A'}, {'Author': 'missing'})
+    assert cache.get(path) == ({'Title': 'A'}, {'Author': 'missing'})
+
+    renamed = str(tmp_path / 'b.docx')
+    os.rename(path, renamed)
+    assert cache.get(renamed) == ({'Title': 'A'}, {'Author': 'missing'})
+
+    with open(renamed, 'a') as f:
+        f.write('more')
+    assert cache.get(renamed) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_evict_applies_entry_and_age_limits(tmp_path):
+    paths = [_file(tmp_path, f"{i}.docx") for i in range(5)]
+    with MetadataCache(str(tmp_path / 'cache.sqlite'), max_entries=3) as cache:
+        for path in paths:
+            cache.put(path, {}, {})
+            time.sleep(0.001)
+        cache.get(paths[0])
+        assert cache.evict() == 2
+        assert cache.get(paths[0]) is not None and cache.get(paths[1]) is None
+
+    with MetadataCache(str(tmp_path / 'cache.sqlite'), max_age=60) as cache:
+        cache._conn.execute('UPDATE entries SET stored_at = stored_at - 120')
+        assert cache.evict() == 3 and len(cache) == 0
+
+
+def test_scanner_cli_bounds_the_cache(tmp_path, monkeypatch, corpus_files):
+    created = []
+
+    class Recording(MetadataCache):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            created.append(self)
+
+    monkeypatch.setattr(scanner, 'MetadataCache', Recording)
+    root = os.path.dirname(corpus_files['docx'])
+    db = str(tmp_path / 'cache.sqlite')
+    scanner.main([root, '--workers', '1', '--cache', db, '--output', str(tmp_path / 'out.jsonl')])
+    scanner.main([root, '--workers', '1', '--cache', db, '--output', str(tmp_path / 'out.jsonl'),
+                  '--cache-max-entries', '2', '--cache-max-age', '0'])
+    assert created[0].max_entries and created[0].max_age
+    assert (created[1].max_entries, created[1].max_age) == (2, None)
+    assert len(MetadataCache(db)) == 2
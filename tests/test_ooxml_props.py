@@ -0,0 +1,103 @@
+import datetime
+import zipfile
+
+import pytest
+
+from conftest import SAMPLE_DOCX
+from ooxml_props import (read_core_properties, write_core_properties, parse_core_xml, next_revision,
+                         CORE_PROPERTIES, CorePropertiesError)
+
+MISSING_CORE_XML = (b'<?xml version="1.0" encoding="UTF-8"?>'
+                    b'<cp:coreProperties xmlns:cp="http://schemas.openxmlformats.org/package/2006/metadata/'
+                    b'core-properties" xmlns:dc="http://purl.org/dc/elements/1.1/">'
+                    b'<dc:title>Only a title</dc:title><dc:creator></dc:creator></cp:coreProperties>')
+
+
+def test_missing_elements_are_none_and_empty_elements_are_empty_strings():
+    metadata = parse_core_xml(MISSING_CORE_XML)
+    assert list(metadata) == list(CORE_PROPERTIES)
+    assert metadata['Title'] == 'Only a title'
+    assert metadata['Creator'] == ''
+    assert metadata['Subject'] is None
+    assert metadata['Created'] is None
+
+
+def test_read_matches_python_docx(corpus_files):
+    docx = pytest.importorskip('docx')
+    props = docx.Document(corpus_files['docx']).core_properties
+    metadata = read_core_properties(corpus_files['docx'])
+    assert metadata['Title'] == props.title
+    assert metadata['Creator'] == props.author
+    assert metadata['Created'] == props.created.replace(tzinfo=None)
+
+
+def test_include_app_adds_extended_properties(corpus_files):
+    assert read_core_properties(corpus_files['docx'], include_app=True)['Application'] == 'Microsoft Office Word'
+
+
+def test_not_a_zip_raises(tmp_path):
+    path = tmp_path / 'broken.docx'
+    path.write_bytes(b'not a zip')
+    with pytest.raises(CorePropertiesError):
+        read_core_properties(str(path))
+
+
+def test_write_rewrites_only_the_properties_part(corpus_files, copy_of):
+    path = copy_of(corpus_files['docx'])
+    with zipfile.ZipFile(path) as zf:
+        before = {info.filename: (info.CRC, zf.read(info)) for info in zf.infolist()}
+    created = datetime.datetime(2020, 1, 2, 3, 4, 5)
+    write_core_properties(path, {'Title': 'New title', 'Created': created, 'Subject': None})
+
+    metadata = read_core_properties(path)
+    assert metadata['Title'] == 'New title'
+    assert metadata['Created'] == created
+    assert metadata['Subject'] is None
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert [info.filename for info in zf.infolist()] == list(before)
+        for name, (crc, data) in before.items():
+            if name != 'docProps/core.xml':
+                assert zf.getinfo(name).CRC == crc and zf.read(name) == data
+
+
+def test_failed_write_leaves_the_file_untouched(corpus_files, copy_of):
+    path = copy_of(corpus_files['xlsx'])
+    with open(path, 'rb') as f:
+        original = f.read()
+
+    def progress(_):
+        raise RuntimeError('stop')
+
+    with pytest.raises(RuntimeError):
+        write_core_properties(path, {'Title': 'Never written'}, progress=progress)
+    with open(path, 'rb') as f:
+        assert f.read() == original
+
+
+def test_sample_document_round_trips(copy_of):
+    path = copy_of(SAMPLE_DOCX)
+    write_core_properties(path, {'Creator': 'Reviewer'})
+    assert read_core_properties(path)['Creator'] == 'Reviewer'
+
+
+def test_app_property_creates_the_missing_app_part(copy_of):
+    path = copy_of(SAMPLE_DOCX)
+    with zipfile.ZipFile(path) as zf:
+        assert 'docProps/app.xml' not in zf.namelist()
+        original = zf.namelist()
+    write_core_properties(path, {'Company': 'Acme'})
+    assert read_core_properties(path, include_app=True)['Company'] == 'Acme'
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist()[:len(original)] == original
+        assert b'extended-properties+xml' in zf.read('[Content_Types].xml')
+        assert b'Target="docProps/app.xml"' in zf.read('_rels/.rels')
+    docx = pytest.importorskip('docx')
+    assert docx.Document(path).core_properties.title == read_core_properties(path)['Title']
+
+
+@pytest.mark.parametrize('revision, expected', [(None, '1'), ('', '1'), ('4', '5'), (' 9 ', '10'),
+                                                ('1.2', '1.2'), ('draft', 'draft')])
+def test_next_revision(revision, expected):
+    assert next_revision(revision) == expected
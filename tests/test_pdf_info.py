@@ -0,0 +1,136 @@
+import io
+import zlib
+
+import pytest
+
+from pdf_info import read_pdf_info, read_pdf_revisions, read_pdf_xmp, decode_text, PdfInfoError
+
+XMP = b'<x:xmpmeta xmlns:x="adobe:ns:meta/"><dc:title>From XMP</dc:title></x:xmpmeta>'
+
+
+def _classic(objects, trailer, prefix=b'', prev=None):
+    """Append numbered objects, a classic xref table and a trailer to prefix."""
+    out = bytearray(prefix or b'%PDF-1.4\n')
+    offsets = {}
+    for num, body in objects.items():
+        offsets[num] = len(out)
+        out += b'%d 0 obj\n' % num + body + b'\nendobj\n'
+    xref = len(out)
+    out += b'xref\n'
+    if not prefix:
+        out += b'0 1\n0000000000 65535 f \n'
+    for num, offset in offsets.items():
+        out += b'%d 1\n%010d 00000 n \n' % (num, offset)
+    if prev is not None:
+        trailer += b' /Prev %d' % prev
+    out += b'trailer\n<< ' + trailer + b' >>\nstartxref\n%d\n%%%%EOF\n' % xref
+    return bytes(out), xref
+
+
+def _stream(dictionary, data):
+    return b'<< ' + dictionary + b' /Length %d >>\nstream\n' % len(data) + data + b'\nendstream'
+
+
+def _base():
+    objects = {
+        1: b'<< /Type /Catalog /Pages 2 0 R /Metadata 5 0 R >>',
+        2: b'<< /Type /Pages /Count 0 /Kids [] >>',
+        3: b'<< /Title (First \\(draft\\)) /Author <FEFF004A006F00EB> /Producer 4 0 R '
+           b'/CreationDate (D:20200102030405Z) >>',
+        4: b'(Indirect producer)',
+        5: _stream(b'/Type /Metadata /Subtype /XML', XMP),
+    }
+    return _classic(objects, b'/Size 6 /Root 1 0 R /Info 3 0 R')
+
+
+def test_info_strings_references_and_utf16():
+    data, _ = _base()
+    info = read_pdf_info(io.BytesIO(data))
+    assert info['Title'] == 'First (draft)'
+    assert info['Author'] == 'Joë'
+    assert info['Producer'] == 'Indirect producer'
+    assert info['CreationDate'] == 'D:20200102030405Z'
+    assert read_pdf_xmp(io.BytesIO(data)) == XMP.decode()
+
+
+def test_matches_pypdf2_on_the_corpus(corpus_files):
+    PdfReader = pytest.importorskip('PyPDF2').PdfReader
+    expected = {key[1:]: str(value) for key, value in PdfReader(corpus_files['pdf']).metadata.items()}
+    assert {key: str(value) for key, value in read_pdf_info(corpus_files['pdf']).items()} == expected
+
+
+def test_incremental_updates_keep_every_revision():
+    base, xref = _base()
+    data, _ = _classic({3: b'<< /Title (Second) >>'}, b'/Size 6 /Root 1 0 R /Info 3 0 R', prefix=base, prev=xref)
+    assert read_pdf_info(io.BytesIO(data)) == {'Title': 'Second'}
+    revisions = read_pdf_revisions(io.BytesIO(data))
+    assert [revision['revision'] for revision in revisions] == [1, 2]
+    assert [revision['info']['Title'] for revision in revisions] == ['First (draft)', 'Second']
+    assert revisions[0]['xref_offset'] == xref
+
+
+def test_xref_stream_with_predictor_and_object_stream():
+    out = bytearray(b'%PDF-1.5\n')
+    offsets = {}
+
+    def obj(num, body):
+        offsets[num] = len(out)
+        out.extend(b'%d 0 obj\n' % num + body + b'\nendobj\n')
+
+    obj(1, b'<< /Type /Catalog >>')
+    # Object 3 (the Info dictionary) lives at index 0 of object stream 2
+    info = b'<< /Title (Packed) /Keywords (a, b) >>'
+    header = b'3 0 '
+    obj(2, _stream(b'/Type /ObjStm /N 1 /First %d /Filter /FlateDecode' % len(header),
+                   zlib.compress(header + info)))
+    xref_offset = len(out)
+    rows = [(0, 0, 255), (1, offsets[1], 0), (1, offsets[2], 0), (2, 2, 0), (1, xref_offset, 0)]
+    raw = bytearray()
+    previous = bytes(4)
+    for kind, field2, field3 in rows:
+        row = bytes([kind]) + field2.to_bytes(2, 'big') + bytes([field3])
+        raw += b'\x02' + bytes((a - b) % 256 for a, b in zip(row, previous))  # PNG "Up" filter
+        previous = row
+    obj(4, _stream(b'/Type /XRef /Size 5 /W [1 2 1] /Root 1 0 R /Info 3 0 R /Filter /FlateDecode '
+                   b'/DecodeParms << /Predictor 12 /Columns 4 >>', zlib.compress(bytes(raw))))
+    out += b'startxref\n%d\n%%%%EOF\n' % xref_offset
+    assert read_pdf_info(io.BytesIO(bytes(out))) == {'Title': 'Packed', 'Keywords': 'a, b'}
+    assert read_pdf_xmp(io.BytesIO(bytes(out))) is None
+
+
+@pytest.mark.parametrize('data', [b'not a pdf at all', b'%PDF-1.4\nstartxref\n999999\n%%EOF\n'])
+def test_damaged_files_raise(data):
+    with pytest.raises(PdfInfoError):
+        read_pdf_info(io.BytesIO(data))
+
+
+def _without_trailer_dict():
+    data, _ = _base()
+    return data.replace(b'trailer\n<<', b'trailer\nbroken <<')
+
+
+def _xref_stream_without_widths():
+    out = b'%PDF-1.5\n'
+    xref_offset = len(out)
+    out += b'1 0 obj\n' + _stream(b'/Type /XRef /Size 2', b'') + b'\nendobj\n'
+    return out + b'startxref\n%d\n%%%%EOF\n' % xref_offset
+
+
+@pytest.mark.parametrize('make', [_without_trailer_dict, _xref_stream_without_widths])
+def test_damaged_trailers_raise_pdf_info_error(make):
+    data = make()
+    for read in (read_pdf_info, read_pdf_revisions, read_pdf_xmp):
+        with pytest.raises(PdfInfoError):
+            read(io.BytesIO(data))
+
+
+def test_encrypted_files_raise():
+    data, _ = _classic({1: b'<< /Type /Catalog >>', 2: b'<< /Filter /Standard >>'},
+                       b'/Size 3 /Root 1 0 R /Encrypt 2 0 R')
+    with pytest.raises(PdfInfoError):
+        read_pdf_info(io.BytesIO(data))
+
+
+def test_decode_text():
+    assert decode_text(b'\xfe\xff\x00A\x00B') == 'AB'
+    assert decode_text(b'plain') == 'plain'
@@ -0,0 +1,62 @@
+import csv
+import datetime
+import json
+
+import pytest
+
+from records import MetadataRecord, export_records, open_exporter, _Exporter
+from timestamps import to_ns, from_ns
+
+SCANS = [
+    {'path': '/docs/a.docx', 'size': 10, 'mtime_ns': 1600000000000000000, 'error': None,
+     'metadata': {'Title': 'A', 'Creator': 'Ann', 'Revision': '3', 'Created': datetime.datetime(2020, 1, 2, 3, 4, 5),
+                  'Company': 'Acme'},
+     'issues': {'Creator': 'Creator field is missing', 'Revision': 'Revision; "odd"'}},
+    {'path': '/docs/b.pdf', 'size': 20, 'mtime_ns': None, 'error': None, 'metadata': {'Producer': 'x'}, 'issues': {}},
+    {'path': '/docs/c.xlsx', 'size': 0, 'mtime_ns': None, 'error': 'BadZipFile: nope', 'metadata': None,
+     'issues': {}},
+]
+
+
+def test_ns_round_trip():
+    moment = datetime.datetime(2021, 3, 4, 5, 6, 7, 890123)
+    assert from_ns(to_ns(moment)) == moment
+    aware = moment.replace(tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+    assert from_ns(to_ns(aware)) == moment - datetime.timedelta(hours=2)
+
+
+def test_record_round_trips_the_scan_dict():
+    record = MetadataRecord.from_scan(SCANS[0])
+    assert record.as_scan()['metadata'] == SCANS[0]['metadata']
+    assert record.issues_dict() == SCANS[0]['issues']
+    assert record.get('Created') == datetime.datetime(2020, 1, 2, 3, 4, 5) and record.get('Company') == 'Acme'
+
+
+def test_exporter_base_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        _Exporter(str(tmp_path / 'out'))
+    with pytest.raises(ValueError):
+        open_exporter(str(tmp_path / 'out.txt'))
+
+
+def _issues_from_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        return [json.loads(row['Issues']) if row['Issues'] else {} for row in csv.DictReader(f)]
+
+
+def _issues_from_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line)['issues'] for line in f]
+
+
+def _issues_from_parquet(path):
+    parquet = pytest.importorskip('pyarrow.parquet')
+    return [json.loads(value) if value else {} for value in parquet.read_table(path).column('Issues').to_pylist()]
+
+
+@pytest.mark.parametrize('extension, read', [('.csv', _issues_from_csv), ('.jsonl', _issues_from_jsonl),
+                                             ('.parquet', _issues_from_parquet)])
+def test_every_format_stores_issues_as_json(tmp_path, extension, read):
+    path = str(tmp_path / f"out{extension}")
+    assert export_records(iter(SCANS), path, chunk_size=2) == len(SCANS)
+    assert read(path) == [scan['issues'] for scan in SCANS]
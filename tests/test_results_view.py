@@ -0,0 +1,49 @@
+import random
+
+from results_view import ResultsModel
+
+
+def _scan(i, revision, creator):
+    return {'path': f"/docs/{i:03}.docx", 'size': 1, 'metadata': {'Revision': revision, 'Creator': creator},
+            'issues': {}, 'error': None}
+
+
+def _column(model, column):
+    position = model.columns.index(column)
+    return [model.row(i)[position] for i in range(len(model))]
+
+
+def test_revision_sorts_numerically_with_blanks_last():
+    model = ResultsModel()
+    model.extend([_scan(0, '10', 'a'), _scan(1, '9', 'b'), _scan(2, None, 'c'), _scan(3, '2', 'd')])
+    model.sort_by('Revision')
+    assert _column(model, 'Revision') == ['2', '9', '10', '']
+    model.sort_by('Revision')
+    assert _column(model, 'Revision') == ['', '10', '9', '2']
+
+
+def test_batches_inserted_into_a_sorted_view_match_a_full_sort():
+    rng = random.Random(7)
+    scans = [_scan(i, str(rng.randrange(50)), rng.choice('xyz')) for i in range(600)]
+    incremental = ResultsModel()
+    incremental.sort_by('Revision')
+    for start in range(0, len(scans), 256):
+        incremental.extend(scans[start:start + 256])
+    full = ResultsModel()
+    full.extend(scans)
+    full.sort_by('Revision')
+    assert [incremental.row(i) for i in range(len(scans))] == [full.row(i) for i in range(len(scans))]
+    revisions = [int(value) for value in _column(incremental, 'Revision')]
+    assert revisions == sorted(revisions)
+
+
+def test_filter_keeps_the_sort():
+    model = ResultsModel()
+    model.extend([_scan(i, str(i), 'alice' if i % 2 else 'bob') for i in range(12)])
+    model.sort_by('Revision')
+    model.sort_by('Revision')
+    model.set_filter('alice', 'Creator')
+    assert _column(model, 'Revision') == ['11', '9', '7', '5', '3', '1']
+    model.extend([_scan(20, '4', 'alice'), _scan(21, '4', 'bob')])
+    assert _column(model, 'Revision') == ['11', '9', '7', '5', '4', '3', '1']
+    assert model.record(0).path == '/docs/011.docx'
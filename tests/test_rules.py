@@ -0,0 +1,82 @@
+import datetime
+
+import pytest
+
+from records import export_records
+from rules import RuleSet, RuleError, Rule, DEFAULT_RULES, load_rules, read_frame, records_to_frame
+
+SPECS = [
+    {'type': 'required', 'field': 'Creator'},
+    {'type': 'regex', 'field': 'Revision', 'pattern': '[0-9]+', 'allow_missing': False},
+    {'type': 'regex', 'field': 'Identifier', 'pattern': 'ID-[0-9]+'},
+    {'type': 'allowed', 'field': 'Language', 'values': ['en-US', 'en-GB']},
+    {'type': 'order', 'before': 'Created', 'after': 'Modified'},
+    {'type': 'mismatch', 'field': 'Creator', 'other': 'Last Modified By', 'ignore_case': True},
+]
+
+EARLY, LATE = datetime.datetime(2020, 1, 1), datetime.datetime(2021, 6, 1)
+
+METADATA = [
+    {'Creator': 'Ann', 'Last Modified By': 'ann', 'Revision': '2', 'Language': 'en-US', 'Created': EARLY,
+     'Modified': LATE, 'Identifier': 'ID-1'},
+    {'Creator': '', 'Last Modified By': 'Bob', 'Revision': '', 'Language': '', 'Identifier': ''},
+    {'Creator': None, 'Revision': None, 'Language': None, 'Created': LATE, 'Modified': EARLY},
+    {'Creator': 'Cy', 'Last Modified By': 'Dee', 'Revision': 'v3', 'Language': 'fr-FR', 'Identifier': 'X'},
+    {'Creator': 'Eve', 'Last Modified By': '', 'Revision': '10', 'Language': 'en-GB', 'Created': EARLY},
+]
+
+
+@pytest.fixture(scope='module')
+def rules():
+    return RuleSet(SPECS)
+
+
+def _scans():
+    return [{'path': f"/docs/{i}.docx", 'size': 1, 'mtime_ns': None, 'metadata': metadata, 'issues': {},
+             'error': None} for i, metadata in enumerate(METADATA)]
+
+
+def test_check_one(rules):
+    assert rules.check(METADATA[0]) == {}
+    assert set(rules.check(METADATA[1])) == {'Creator', 'Revision'}
+    assert set(rules.check(METADATA[2])) == {'Creator', 'Revision', 'Modified'}
+    assert set(rules.check(METADATA[3])) == {'Revision', 'Identifier', 'Language', 'Last Modified By'}
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.jsonl', '.parquet'])
+def test_vectorized_and_per_record_evaluators_agree_on_an_export(rules, tmp_path, extension):
+    if extension == '.parquet':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f"records{extension}")
+    export_records(_scans(), path)
+    frame = read_frame(path, rules.fields())
+    report = rules.evaluate(frame)
+    for row, metadata in enumerate(METADATA):
+        expected = rules.check(metadata)
+        assert report.issues(row) == expected, (extension, row)
+        assert rules.check(frame.iloc[row].to_dict()) == expected, (extension, row)
+
+
+def test_evaluate_from_records_and_summary(rules):
+    report = rules.evaluate(records_to_frame(_scans()))
+    hits = {row['id']: row['hits'] for row in report.summary()}
+    assert hits['required:Creator'] == 2 and hits['order:Created<=Modified'] == 1
+    assert report.any_violation().tolist() == [False, True, True, True, False]
+
+
+def test_default_rules_match_the_old_checks():
+    assert DEFAULT_RULES.check({'Creator': 'A', 'Revision': '3'}) == {}
+    assert DEFAULT_RULES.check({'Revision': 'x'}) == {'Creator': 'Missing creator',
+                                                       'Revision': 'Invalid revision number'}
+
+
+def test_invalid_rules_are_rejected(tmp_path):
+    with pytest.raises(RuleError):
+        RuleSet([{'type': 'nonsense', 'field': 'Creator'}])
+    with pytest.raises(RuleError):
+        RuleSet([{'type': 'regex', 'field': 'Creator', 'pattern': '('}])
+    with pytest.raises(TypeError):
+        Rule({'field': 'Creator'})
+    path = tmp_path / 'rules.yaml'
+    path.write_text("rules:\n  - {type: required, field: Title}\n")
+    assert load_rules(str(path)).check({}) == {'Title': 'Missing title'}
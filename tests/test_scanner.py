@@ -0,0 +1,51 @@
+import os
+import shutil
+
+import pytest
+
+from metadata_cache import MetadataCache
+from scanner import iter_files, scan_tree, ScanStats
+
+
+@pytest.fixture
+def tree(tmp_path, corpus_files):
+    for kind, source in corpus_files.items():
+        shutil.copyfile(source, tmp_path / f"a.{kind}")
+    (tmp_path / 'sub').mkdir()
+    shutil.copyfile(corpus_files['docx'], tmp_path / 'sub' / 'b.docx')
+    (tmp_path / 'skip').mkdir()
+    shutil.copyfile(corpus_files['pdf'], tmp_path / 'skip' / 'c.pdf')
+    (tmp_path / 'broken.xlsx').write_bytes(b'not a workbook')
+    (tmp_path / 'notes.txt').write_text('ignored')
+    return tmp_path
+
+
+def test_iter_files_is_sorted_and_honours_patterns(tree):
+    names = [os.path.relpath(path, tree) for path, _ in iter_files(str(tree), exclude=['skip'])]
+    assert names == sorted(name for name in names if os.sep not in name) + [os.path.join('sub', 'b.docx')]
+    assert 'notes.txt' not in names
+    assert [os.path.basename(path) for path, _ in iter_files(str(tree), include=['*.docx'])] == \
+        ['a.docx', 'b.docx']
+
+
+def test_scan_tree_reports_errors_per_file(tree):
+    stats = ScanStats()
+    records = list(scan_tree(str(tree), workers=2, batch_size=2, stats=stats))
+    by_name = {os.path.basename(record['path']): record for record in records}
+    assert by_name['broken.xlsx']['error']
+    assert by_name['a.docx']['error'] is None and by_name['a.docx']['metadata']['Title']
+    assert stats.files == len(records) and stats.errors == 1
+    assert [record['path'] for record in records] == [path for path, _ in iter_files(str(tree))]
+
+
+def test_second_scan_is_answered_from_the_cache(tree, tmp_path_factory):
+    db = str(tmp_path_factory.mktemp('cache') / 'cache.sqlite')
+    with MetadataCache(db) as cache:
+        first = list(scan_tree(str(tree), workers=1, cache=cache))
+    with MetadataCache(db) as cache:
+        second = list(scan_tree(str(tree), workers=1, cache=cache))
+    ok = [record for record in second if record['error'] is None]
+    assert ok and all(record['cached'] for record in ok)
+    # EXIF rationals come back as strings; document metadata round-trips exactly
+    documents = [i for i, record in enumerate(first) if record['path'].endswith(('.docx', '.xlsx'))]
+    assert documents and all(first[i]['metadata'] == second[i]['metadata'] for i in documents)
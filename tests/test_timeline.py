@@ -0,0 +1,78 @@
+import datetime
+
+import numpy as np
+
+from timeline import Timeline, NAT, load_timeline
+from timestamps import to_ns
+
+HOUR = 3600 * 10 ** 9
+
+
+def _ns(*args):
+    return to_ns(datetime.datetime(*args))
+
+
+def _timeline():
+    base = _ns(2022, 3, 1)
+    paths = ['ok.docx', 'reversed.xlsx', 'backdated.docx', 'ancient.docx', 'drifted.pdf', 'future.png', 'blank.jpg']
+    created = [base, base + 2 * HOUR, base, _ns(2001, 1, 1), base, base, NAT]
+    modified = [base + HOUR, base + HOUR, base + 5 * HOUR, _ns(2001, 1, 2), base, base, NAT]
+    fs_modified = [base + HOUR, base + HOUR, base + 4 * HOUR, _ns(2001, 1, 2), base + 48 * HOUR,
+                   _ns(2200, 1, 1), NAT]
+    return Timeline(paths, created, modified, fs_modified)
+
+
+def _names(timeline, indices):
+    return sorted(timeline.paths[i] for i in indices)
+
+
+def test_between_uses_each_kind_and_skips_missing():
+    timeline = _timeline()
+    start, end = datetime.datetime(2022, 3, 1), datetime.datetime(2022, 3, 1, 1)
+    assert _names(timeline, timeline.between(start, end, 'created')) == \
+        ['backdated.docx', 'drifted.pdf', 'future.png', 'ok.docx']
+    assert _names(timeline, timeline.between(start, end, 'modified')) == \
+        ['drifted.pdf', 'future.png', 'ok.docx', 'reversed.xlsx']
+    assert 'blank.jpg' not in _names(timeline, timeline.between(datetime.datetime(1900, 1, 1),
+                                                                 datetime.datetime(3000, 1, 1)))
+
+
+def test_anomaly_checks():
+    timeline = _timeline()
+    assert _names(timeline, timeline.modified_before_created()) == ['reversed.xlsx']
+    assert _names(timeline, timeline.backdated()) == ['ancient.docx', 'backdated.docx']
+    indices, deltas = timeline.drift()
+    # The far-future file time drifts too
+    assert _names(timeline, indices) == ['drifted.pdf', 'future.png']
+    assert deltas[timeline.paths[indices] == 'drifted.pdf'].tolist() == [48 * 3600]
+    assert _names(timeline, timeline.future(now=datetime.datetime(2023, 1, 1))) == ['future.png']
+
+
+def test_bursts_merge_overlapping_windows():
+    base = _ns(2022, 1, 1)
+    modified = [base + i * 60 * 10 ** 9 for i in range(30)] + [base + 100 * HOUR]
+    timeline = Timeline([f"{i}.docx" for i in range(31)], [NAT] * 31, modified, [NAT] * 31)
+    bursts = timeline.bursts(window=600, min_count=5)
+    assert len(bursts) == 1
+    start, end, members = bursts[0]
+    assert (start, end) == (modified[0], modified[29]) and sorted(members.tolist()) == list(range(30))
+    assert timeline.bursts(window=60, min_count=5) == []
+
+
+def test_save_and_load(tmp_path):
+    timeline = _timeline()
+    path = str(tmp_path / 'index.npz')
+    timeline.save(path)
+    loaded = load_timeline(path)
+    assert loaded.paths.tolist() == timeline.paths.tolist()
+    for kind, times in timeline.times.items():
+        assert np.array_equal(loaded.times[kind], times)
+
+
+def test_from_records():
+    records = [{'path': 'a.docx', 'size': 1, 'mtime_ns': 5 * 10 ** 18, 'error': None, 'issues': {},
+                'metadata': {'Created': datetime.datetime(2020, 1, 1), 'Modified': None}}]
+    timeline = Timeline.from_records(records)
+    assert timeline.times['created'].tolist() == [_ns(2020, 1, 1)]
+    assert timeline.times['modified'].tolist() == [NAT]
+    assert timeline.times['fs_modified'].tolist() == [5 * 10 ** 18]
@@ -0,0 +1,39 @@
+import datetime
+import os
+
+from timestamps import set_file_times, summarize, to_ns, birthtime_support, FS_RESOLUTION_NS
+
+
+def test_to_ns_accepts_datetimes_strings_ints_and_floats():
+    moment = datetime.datetime(2020, 5, 6, 7, 8, 9, 123456)
+    assert to_ns(moment) == 1588748889123456000
+    assert to_ns(moment.replace(tzinfo=datetime.timezone(datetime.timedelta(hours=1)))) == \
+        1588748889123456000 - 3600 * 10 ** 9
+    assert to_ns(5) == 5 and to_ns(1.5) == 1500000000 and to_ns(None) is None
+    assert to_ns('2020-05-06 07:08:09.123456') == to_ns('2020-05-06T08:08:09.123456+01:00') == to_ns(moment)
+
+
+def test_sets_and_verifies_modification_time(tmp_path):
+    path = tmp_path / 'a.docx'
+    path.write_bytes(b'x')
+    modified = datetime.datetime(2019, 1, 2, 3, 4, 5, 678901)
+    report = set_file_times(str(path), modified=modified)
+    assert report['error'] is None
+    assert report['status']['mtime'] in ('set', 'rounded') and report['status']['atime'] in ('set', 'rounded')
+    assert abs(os.stat(path).st_mtime_ns - to_ns(modified)) < FS_RESOLUTION_NS
+
+
+def test_created_only_keeps_the_modification_time(tmp_path):
+    path = tmp_path / 'a.docx'
+    path.write_bytes(b'x')
+    os.utime(path, ns=(10 ** 18, 10 ** 18))
+    report = set_file_times(str(path), created=datetime.datetime(2001, 1, 1))
+    if birthtime_support() is None:
+        assert report['status'] == {'birthtime': 'unsupported'}
+        assert os.stat(path).st_mtime_ns == 10 ** 18
+
+
+def test_missing_files_are_reported_not_raised(tmp_path):
+    report = set_file_times(str(tmp_path / 'missing.docx'), modified=datetime.datetime(2020, 1, 1))
+    assert report['error'].startswith('FileNotFoundError')
+    assert summarize([report]) == ({}, 1)
@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import tracing
+
+
+@pytest.fixture(autouse=True)
+def _fresh_histograms():
+    tracing.drain()
+    yield
+    tracing.drain()
+
+
+def _worker_spans(n):
+    for _ in range(n):
+        with tracing.span('worker', fmt='test'):
+            pass
+    return tracing.drain()
+
+
+def _count(states, stage):
+    return sum(state[1] for (span_stage, _), state in states.items() if span_stage == stage)
+
+
+def test_spans_fill_histograms_and_drain_resets_them():
+    for _ in range(3):
+        with tracing.span('read', 'a.docx') as s:
+            s.add_bytes(10)
+    rows = {(row['stage'], row['format']): row for row in tracing.summary()}
+    assert rows[('read', 'docx')]['count'] == 3
+    states = tracing.drain()
+    assert _count(states, 'read') == 3 and tracing.drain() == {}
+    tracing.merge(states)
+    tracing.merge(states)
+    assert _count(tracing.drain(), 'read') == 6
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="needs fork")
+def test_forked_worker_drains_only_its_own_spans():
+    for _ in range(10):  # left in the parent's histograms on purpose
+        with tracing.span('worker', fmt='test'):
+            pass
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('fork')) as executor:
+        states = executor.submit(_worker_spans, 1).result()
+    assert _count(states, 'worker') == 1
+    tracing.merge(states)
+    assert _count(tracing.drain(), 'worker') == 11
+
+
+def test_prometheus_output():
+    with tracing.span('hash', 'a.pdf', nbytes=5):
+        pass
+    text = tracing.format_prometheus(sorted(tracing._tracer.histograms.items()))
+    assert 'stage="hash"' in text and 'format="pdf"' in text
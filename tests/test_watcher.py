@@ -0,0 +1,68 @@
+import os
+import shutil
+import threading
+import time
+
+import pytest
+
+from scanner import matches_any
+from watcher import Watcher, PollingSource, FILE
+
+
+def test_matches_any_checks_name_and_relative_path():
+    assert matches_any(['*.docx'], 'a.docx', os.path.join('sub', 'a.docx'))
+    assert matches_any(['sub/*'], 'a.docx', 'sub/a.docx')
+    assert not matches_any(['*.pdf', 'other/*'], 'a.docx', 'sub/a.docx')
+
+
+@pytest.fixture
+def watched(tmp_path, corpus_files):
+    shutil.copyfile(corpus_files['docx'], tmp_path / 'a.docx')
+    (tmp_path / 'skip').mkdir()
+    watcher = Watcher(str(tmp_path), exclude=['skip'], debounce=0, backend='poll')
+    watcher.baseline(workers=1)
+    return watcher
+
+
+def test_process_reports_added_modified_and_deleted(watched, corpus_files, copy_of):
+    from ooxml_props import write_core_properties
+    root = watched.root
+    path = os.path.join(root, 'a.docx')
+    assert watched.process(path) is None  # unchanged since the baseline
+
+    write_core_properties(path, {'Creator': 'Watcher test'})
+    record = watched.process(path)
+    assert record['event'] == 'modified' and record['changes']['Creator'][1] == 'Watcher test'
+    assert record['sha256'] and record['sha256'] != record['previous_sha256']
+
+    added = os.path.join(root, 'b.xlsx')
+    shutil.copyfile(corpus_files['xlsx'], added)
+    assert watched.process(added)['event'] == 'added'
+    os.remove(added)
+    assert watched.process(added)['event'] == 'deleted'
+
+
+def test_excluded_and_unsupported_paths_are_ignored(watched):
+    now = time.monotonic()
+    watched._mark(FILE, os.path.join(watched.root, 'skip', 'c.docx'), now)
+    watched._mark(FILE, os.path.join(watched.root, 'notes.txt'), now)
+    watched._mark(FILE, os.path.join(watched.root, 'a.docx'), now)
+    assert list(watched.pending) == [os.path.join(watched.root, 'a.docx')]
+
+
+def test_changes_from_the_polling_source(watched, corpus_files):
+    watched.source = PollingSource(watched.root, exclude=watched.exclude, interval=0.05)
+    records = []
+
+    def consume():
+        for record in watched.changes():
+            records.append(record)
+            watched.stop()
+
+    thread = threading.Thread(target=consume)
+    thread.start()
+    time.sleep(0.1)
+    shutil.copyfile(corpus_files['pdf'], os.path.join(watched.root, 'new.pdf'))
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+    assert [(os.path.basename(record['path']), record['event']) for record in records] == [('new.pdf', 'added')]
@@ -0,0 +1,240 @@
+"""Corpus-wide timeline of embedded and filesystem timestamps.
+
+Each file contributes its embedded Created and Modified dates and its
+filesystem modification time, held as int64 nanoseconds in numpy arrays.
+Every kind of timestamp gets a sorted copy plus the permutation back to the
+files, so a range query is two binary searches (np.searchsorted) however
+large the corpus. The same arrays drive the anomaly checks:
+
+- Modified earlier than Created
+- backdating: a filesystem time that predates the file's own embedded
+  Modified, or an OOXML Created date older than the format itself
+- drift: embedded Modified and filesystem time further apart than a threshold
+- future dates, later than the time of the check
+- bursts: many edits inside a short sliding window
+
+An index can be saved to .npz and reloaded without rescanning.
+
+Usage: python timeline.py RECORDS|INDEX.npz [--between START END] [--kind KIND] [--save INDEX.npz]
+"""
+import argparse
+import datetime
+import sys
+
+import numpy as np
+
+from timestamps import to_ns
+
+KINDS = ('created', 'modified', 'fs_modified')
+
+# Frame column for each kind of timestamp
+KIND_COLUMNS = {'created': 'Created', 'modified': 'Modified', 'fs_modified': 'File Modified'}
+
+NAT = np.iinfo(np.int64).min
+NS_PER_SECOND = 1000000000
+
+# Office Open XML was first shipped with Office 2007; earlier Created dates in
+# .docx/.xlsx/.pptx files cannot be genuine
+OOXML_EPOCH = datetime.datetime(2006, 11, 1)
+OOXML_EXTENSIONS = ('.docx', '.docm', '.xlsx', '.xlsm', '.pptx', '.pptm')
+
+# The embedded Modified is written just before the file is closed, so the
+# filesystem time may trail it slightly but should never lead it by more than this
+DEFAULT_TOLERANCE = 60
+DEFAULT_DRIFT = 24 * 3600
+DEFAULT_BURST_WINDOW = 3600
+DEFAULT_BURST_COUNT = 20
+
+
+def _ns(value):
+    """timestamps.to_ns, with NAT for a missing value."""
+    ns = to_ns(value)
+    return NAT if ns is None else ns
+
+
+def format_ns(ns):
+    return '' if ns == NAT else str(np.datetime64(int(ns), 'ns').astype('datetime64[s]')).replace('T', ' ')
+
+
+class Timeline:
+    """Sorted timestamp arrays over a corpus, with range queries and anomaly checks."""
+
+    def __init__(self, paths, created, modified, fs_modified):
+        self.paths = np.asarray(paths, dtype=str)
+        self.times = {
+            'created': np.asarray(created, dtype=np.int64),
+            'modified': np.asarray(modified, dtype=np.int64),
+            'fs_modified': np.asarray(fs_modified, dtype=np.int64),
+        }
+        self._sorted = {}
+
+    def __len__(self):
+        return len(self.paths)
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Build from a DataFrame with Path, Created, Modified and File Modified columns."""
+        def column(name):
+            if name not in frame.columns:
+                return np.full(len(frame), NAT, dtype=np.int64)
+            values = frame[name].to_numpy(dtype='datetime64[ns]')
+            return values.view(np.int64)
+        return cls(frame['Path'].to_numpy(dtype=str), *(column(KIND_COLUMNS[kind]) for kind in KINDS))
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from MetadataRecords or scanner records."""
+        from rules import records_to_frame
+        return cls.from_frame(records_to_frame(records, fields=('Created', 'Modified')))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['paths'], data['created'], data['modified'], data['fs_modified'])
+
+    def save(self, path):
+        np.savez(path, paths=self.paths, **self.times)
+
+    # -- range queries -----------------------------------------------------
+
+    def _index(self, kind):
+        """Return (sorted times, file indices) for the files that have this timestamp."""
+        if kind not in self._sorted:
+            times = self.times[kind]
+            valid = np.flatnonzero(times != NAT)
+            order = valid[np.argsort(times[valid], kind='stable')]
+            self._sorted[kind] = (times[order], order)
+        return self._sorted[kind]
+
+    def between(self, start, end, kind='any'):
+        """Return indices of files with a `kind` timestamp in [start, end]; 'any' checks every kind."""
+        start, end = _ns(start), _ns(end)
+        if kind == 'any':
+            hits = [self.between_ns(start, end, each) for each in KINDS]
+            return np.unique(np.concatenate(hits))
+        return np.sort(self.between_ns(start, end, kind))
+
+    def between_ns(self, start, end, kind):
+        times, order = self._index(kind)
+        return order[np.searchsorted(times, start, side='left'):np.searchsorted(times, end, side='right')]
+
+    # -- anomaly checks ----------------------------------------------------
+
+    def modified_before_created(self):
+        created, modified = self.times['created'], self.times['modified']
+        return np.flatnonzero((created != NAT) & (modified != NAT) & (modified < created))
+
+    def backdated(self, tolerance=DEFAULT_TOLERANCE):
+        """Files whose disk time predates their embedded Modified, or OOXML files created before OOXML existed."""
+        modified, fs_modified = self.times['modified'], self.times['fs_modified']
+        created = self.times['created']
+        disk_before_save = ((modified != NAT) & (fs_modified != NAT)
+                            & (fs_modified < modified - int(tolerance * NS_PER_SECOND)))
+        lowered = np.char.lower(self.paths)
+        ooxml = np.zeros(len(self), dtype=bool)
+        for extension in OOXML_EXTENSIONS:
+            ooxml |= np.char.endswith(lowered, extension)
+        before_format = ooxml & (created != NAT) & (created < to_ns(OOXML_EPOCH))
+        return np.flatnonzero(disk_before_save | before_format)
+
+    def drift(self, threshold=DEFAULT_DRIFT):
+        """Return (indices, drift in seconds) where |fs time - embedded Modified| exceeds threshold."""
+        modified, fs_modified = self.times['modified'], self.times['fs_modified']
+        valid = (modified != NAT) & (fs_modified != NAT)
+        delta = np.where(valid, fs_modified - modified, 0)
+        indices = np.flatnonzero(valid & (np.abs(delta) > int(threshold * NS_PER_SECOND)))
+        return indices, delta[indices] / NS_PER_SECOND
+
+    def future(self, now=None, tolerance=DEFAULT_TOLERANCE):
+        """Files with any timestamp later than now (plus tolerance)."""
+        limit = to_ns(now or datetime.datetime.now(datetime.timezone.utc)) + int(tolerance * NS_PER_SECOND)
+        mask = np.zeros(len(self), dtype=bool)
+        for times in self.times.values():
+            mask |= times > limit
+        return np.flatnonzero(mask)
+
+    def bursts(self, window=DEFAULT_BURST_WINDOW, min_count=DEFAULT_BURST_COUNT, kind='modified'):
+        """Return [(start_ns, end_ns, indices)] for runs of at least min_count edits within window seconds.
+
+        Overlapping windows are merged, so one busy afternoon is one burst.
+        """
+        times, order = self._index(kind)
+        if len(times) < min_count:
+            return []
+        # Number of edits in [t, t + window] for every edit t
+        counts = np.searchsorted(times, times + int(window * NS_PER_SECOND), side='right') - np.arange(len(times))
+        firsts = np.flatnonzero(counts >= min_count)
+        if not len(firsts):
+            return []
+        lasts = np.maximum.accumulate(firsts + counts[firsts] - 1)
+        # A window that starts after everything before it has ended opens a new burst
+        opens = np.concatenate(([True], firsts[1:] > lasts[:-1]))
+        closes = np.concatenate((opens[1:], [True]))
+        return [(int(times[first]), int(times[last]), order[first:last + 1])
+                for first, last in zip(firsts[opens], lasts[closes])]
+
+    def anomalies(self, tolerance=DEFAULT_TOLERANCE, drift_threshold=DEFAULT_DRIFT,
+                  burst_window=DEFAULT_BURST_WINDOW, burst_count=DEFAULT_BURST_COUNT, now=None):
+        """Run every check; returns {check name: list of (path, detail)}."""
+        result = {
+            'modified_before_created': [
+                (self.paths[i], f"Created {format_ns(self.times['created'][i])}, "
+                                f"Modified {format_ns(self.times['modified'][i])}")
+                for i in self.modified_before_created()],
+            'backdated': [
+                (self.paths[i], f"Created {format_ns(self.times['created'][i])}, "
+                                f"Modified {format_ns(self.times['modified'][i])}, "
+                                f"file {format_ns(self.times['fs_modified'][i])}")
+                for i in self.backdated(tolerance)],
+            'future': [(self.paths[i], "timestamp later than now") for i in self.future(now, tolerance)],
+        }
+        indices, deltas = self.drift(drift_threshold)
+        result['drift'] = [(self.paths[i], f"file time {delta / 3600:+.1f}h from embedded Modified")
+                           for i, delta in zip(indices, deltas)]
+        result['bursts'] = [
+            (self.paths[i], f"{len(members)} edits {format_ns(start)} - {format_ns(end)}")
+            for start, end, members in self.bursts(burst_window, burst_count) for i in members]
+        return result
+
+
+def load_timeline(path):
+    """Open a saved .npz index, or build one from exported scan records."""
+    if path.lower().endswith('.npz'):
+        return Timeline.load(path)
+    from rules import read_frame
+    return Timeline.from_frame(read_frame(path, fields=('Created', 'Modified')))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timestamp timeline and anomaly report over a scanned corpus.")
+    parser.add_argument('input', help="records from scanner.py --output, or a saved .npz index")
+    parser.add_argument('--between', nargs=2, metavar=('START', 'END'),
+                        help="list files with a timestamp in this ISO date/time range")
+    parser.add_argument('--kind', choices=KINDS + ('any',), default='any')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help="seconds (default: %(default)s)")
+    parser.add_argument('--drift-hours', type=float, default=DEFAULT_DRIFT / 3600)
+    parser.add_argument('--burst-window', type=float, default=DEFAULT_BURST_WINDOW, help="seconds")
+    parser.add_argument('--burst-count', type=int, default=DEFAULT_BURST_COUNT)
+    parser.add_argument('--save', metavar='INDEX.npz', help="save the timeline for fast reloading")
+    args = parser.parse_args(argv)
+
+    timeline = load_timeline(args.input)
+    if args.save:
+        timeline.save(args.save)
+
+    if args.between:
+        for index in timeline.between(args.between[0], args.between[1], args.kind):
+            times = ', '.join(f"{kind}={format_ns(timeline.times[kind][index])}" for kind in KINDS)
+            print(f"{timeline.paths[index]}\t{times}")
+        return 0
+
+    anomalies = timeline.anomalies(args.tolerance, args.drift_hours * 3600, args.burst_window, args.burst_count)
+    for check, hits in anomalies.items():
+        print(f"{check}: {len(hits)}")
+        for path, detail in hits:
+            print(f"  {path}: {detail}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
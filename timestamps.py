@@ -0,0 +1,225 @@
+"""Set filesystem timestamps in-process, in batch, and verify what was stored.
+
+Times are written with os.utime(ns=...), so nothing is truncated to whole
+seconds and no `touch` processes are spawned. Naive datetimes are taken as
+UTC, which is how the OOXML readers return dcterms:created/modified.
+
+Creation time (birthtime) has no portable API:
+
+- Windows: set through SetFileTime via ctypes.
+- macOS: APFS/HFS+ move the birthtime back when a file's mtime is set
+  earlier than it, so the mtime is set to the creation time first. A
+  birthtime can only be moved earlier this way, never later.
+- Elsewhere (Linux and others) it cannot be set and is reported as
+  'unsupported' rather than silently skipped.
+
+After writing, every timestamp is read back and reported as 'set' (exact),
+'rounded' (within the filesystem's resolution), 'failed' or 'unsupported'.
+
+Usage: python timestamps.py FILE [FILE ...] [--dry-run]
+    Sets each file's modification (and where possible creation) time from
+    its embedded Created/Modified metadata.
+"""
+import argparse
+import datetime
+import os
+import sys
+
+from tracing import span
+
+# Coarsest timestamp resolution among common filesystems (FAT stores 2 s)
+FS_RESOLUTION_NS = 2 * 1000000000
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+# 100 ns intervals between 1601-01-01 (FILETIME epoch) and 1970-01-01
+FILETIME_EPOCH_OFFSET = 116444736000000000
+
+
+def to_ns(value):
+    """Convert a datetime or ISO string (naive = UTC), int nanoseconds or float seconds to int nanoseconds.
+
+    None passes through. This is the conversion records, archives, the
+    audit log and the timeline share.
+    """
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value * 1000000000)
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    delta = value - EPOCH
+    return (delta.days * 86400 + delta.seconds) * 1000000000 + delta.microseconds * 1000
+
+
+def from_ns(ns):
+    """Convert int nanoseconds since the epoch back to a naive UTC datetime."""
+    if ns is None:
+        return None
+    return EPOCH + datetime.timedelta(microseconds=ns // 1000)
+
+
+def birthtime_support():
+    """Return how creation time can be set here: 'windows', 'macos' or None."""
+    if sys.platform == 'win32':
+        return 'windows'
+    if sys.platform == 'darwin':
+        return 'macos'
+    return None
+
+
+def birthtime_ns(st):
+    """Return a stat result's creation time in nanoseconds, or None where the OS does not expose it."""
+    value = getattr(st, 'st_birthtime_ns', None)
+    if value is not None:
+        return value
+    value = getattr(st, 'st_birthtime', None)
+    if value is not None:
+        return int(value * 1000000000)
+    if sys.platform == 'win32':
+        return st.st_ctime_ns  # creation time on Windows before Python 3.12
+    return None
+
+
+def _set_windows_birthtime(file_path, created_ns):
+    import ctypes
+    from ctypes import wintypes
+
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.CreateFileW.restype = wintypes.HANDLE
+    kernel32.CreateFileW.argtypes = (wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID,
+                                     wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE)
+    kernel32.SetFileTime.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.FILETIME),
+                                     ctypes.POINTER(wintypes.FILETIME), ctypes.POINTER(wintypes.FILETIME))
+    file_write_attributes, share_all, open_existing, backup_semantics = 0x100, 0x7, 3, 0x02000000
+
+    handle = kernel32.CreateFileW(file_path, file_write_attributes, share_all, None, open_existing,
+                                  backup_semantics, None)
+    if handle == wintypes.HANDLE(-1).value:
+        raise ctypes.WinError(ctypes.get_last_error())
+    try:
+        ticks = created_ns // 100 + FILETIME_EPOCH_OFFSET
+        filetime = wintypes.FILETIME(ticks & 0xFFFFFFFF, ticks >> 32)
+        if not kernel32.SetFileTime(handle, ctypes.byref(filetime), None, None):
+            raise ctypes.WinError(ctypes.get_last_error())
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _status(requested, actual):
+    if actual is None:
+        return 'unsupported'
+    if actual == requested:
+        return 'set'
+    if abs(actual - requested) < FS_RESOLUTION_NS:
+        return 'rounded'
+    return 'failed'
+
+
+def set_file_times(file_path, created=None, modified=None, accessed=None, verify=True):
+    """Set a file's timestamps and return a report dict.
+
+    created/modified/accessed are datetimes or int nanoseconds; accessed
+    defaults to modified. The report holds 'requested' and 'actual'
+    nanoseconds and a 'status' per timestamp ('set', 'rounded', 'failed' or
+    'unsupported'), plus 'error' if the file could not be updated.
+    """
+    created, modified, accessed = to_ns(created), to_ns(modified), to_ns(accessed)
+    if accessed is None:
+        accessed = modified
+    requested = {'mtime': modified, 'atime': accessed, 'birthtime': created}
+    requested = {kind: value for kind, value in requested.items() if value is not None}
+    report = {'path': file_path, 'requested': requested, 'actual': {}, 'status': {}, 'error': None}
+
+    support = birthtime_support()
+    with span('timestamps', file_path):
+        try:
+            # Unchanged times are kept from before the macOS birthtime step touches them
+            before = os.stat(file_path) if modified is None or accessed is None else None
+            if created is not None and support == 'macos':
+                os.utime(file_path, ns=(created, created))
+            if modified is not None or accessed is not None or support == 'macos':
+                os.utime(file_path, ns=(accessed if accessed is not None else before.st_atime_ns,
+                                        modified if modified is not None else before.st_mtime_ns))
+            if created is not None and support == 'windows':
+                _set_windows_birthtime(file_path, created)
+        except OSError as e:
+            report['error'] = f"{type(e).__name__}: {e}"
+            return report
+
+        if created is not None and support is None:
+            report['status']['birthtime'] = 'unsupported'
+        if not verify:
+            return report
+
+        st = os.stat(file_path)
+        actual = {'mtime': st.st_mtime_ns, 'atime': st.st_atime_ns,
+                  'birthtime': birthtime_ns(st) if support is not None else None}
+        for kind, value in requested.items():
+            report['actual'][kind] = actual[kind]
+            report['status'][kind] = _status(value, actual[kind])
+        return report
+
+
+def sync_timestamps(items, verify=True):
+    """Set timestamps for many files; items are (path, created, modified) tuples. Yields reports."""
+    for file_path, created, modified in items:
+        yield set_file_times(file_path, created, modified, verify=verify)
+
+
+def summarize(reports):
+    """Count report statuses per timestamp kind, e.g. {'mtime': {'set': 10}, 'birthtime': {'unsupported': 10}}."""
+    summary = {}
+    errors = 0
+    for report in reports:
+        errors += report['error'] is not None
+        for kind, status in report['status'].items():
+            counts = summary.setdefault(kind, {})
+            counts[status] = counts.get(status, 0) + 1
+    return summary, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Set file system dates from each file's embedded metadata.")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--dry-run', action='store_true', help="only print what would be set")
+    args = parser.parse_args(argv)
+
+    from metadata_core import get_metadata
+
+    items = []
+    for file_path in args.files:
+        try:
+            metadata = get_metadata(file_path)
+        except Exception as e:
+            print(f"{file_path}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        created, modified = metadata.get('Created'), metadata.get('Modified')
+        if not isinstance(created, datetime.datetime) and not isinstance(modified, datetime.datetime):
+            print(f"{file_path}: no embedded Created/Modified dates", file=sys.stderr)
+            continue
+        created = created if isinstance(created, datetime.datetime) else None
+        modified = modified if isinstance(modified, datetime.datetime) else None
+        if args.dry_run:
+            print(f"{file_path}: created={created} modified={modified} (UTC)")
+            continue
+        items.append((file_path, created, modified))
+
+    reports = list(sync_timestamps(items))
+    for report in reports:
+        if report['error']:
+            print(f"{report['path']}: {report['error']}", file=sys.stderr)
+            continue
+        statuses = ', '.join(f"{kind} {status}" for kind, status in report['status'].items())
+        print(f"{report['path']}: {statuses}")
+    summary, errors = summarize(reports)
+    if summary.get('birthtime', {}).get('unsupported'):
+        print("Creation time cannot be set on this platform; only modification and access times were changed.",
+              file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
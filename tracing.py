@@ -0,0 +1,359 @@
+"""Per-stage timing spans for reads, saves, hashes and scans.
+
+    with span('serialize', file_path) as s:
+        ...
+        s.add_bytes(n)
+
+Every span feeds an in-memory latency histogram per (stage, format), kept in
+log-scale buckets (8 per power of two, so percentiles are within ~9%), which
+costs a couple of microseconds and no allocation beyond the span itself;
+that is cheap enough to leave on. Spans nest: a span opened inside another
+records it as its parent, so one save breaks down into open, serialize,
+fsync, timestamps and hash.
+
+Set METADATA_TRACE=FILE.jsonl to also write one JSON line per span. The
+variable is inherited by the scanner's worker processes, which append to the
+same file, so a trace covers a whole multi-process scan; the workers also
+hand their histograms back with each batch (drain/merge). Set
+METADATA_PROMETHEUS=FILE.prom to write the histograms in Prometheus text
+format when the process exits.
+
+Usage: python tracing.py TRACE.jsonl [TRACE.jsonl ...] [--prometheus OUT.prom]
+    Prints p50/p95/p99 per stage and format from recorded traces.
+"""
+import atexit
+import itertools
+import math
+import os
+import sys
+import threading
+import time
+
+TRACE_ENV = 'METADATA_TRACE'
+PROMETHEUS_ENV = 'METADATA_PROMETHEUS'
+
+BUCKETS_PER_OCTAVE = 8
+# 2**48 ns is about 3 days; anything longer lands in the last bucket
+BUCKET_COUNT = 48 * BUCKETS_PER_OCTAVE + 1
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def format_of(path):
+    """Return the lower-case extension of path without the dot ('' when there is none)."""
+    if not path:
+        return ''
+    dot = path.rfind('.')
+    # Cheaper than os.path.splitext, which matters at one call per span
+    if dot <= max(path.rfind('/'), path.rfind(os.sep)):
+        return ''
+    return path[dot + 1:].lower()
+
+
+class Histogram:
+    """Log-scale latency histogram over nanosecond durations."""
+
+    __slots__ = ('counts', 'count', 'total_ns', 'bytes', 'errors')
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total_ns = 0
+        self.bytes = 0
+        self.errors = 0
+
+    def add(self, duration_ns, nbytes=0, error=False):
+        index = int(math.log2(duration_ns) * BUCKETS_PER_OCTAVE) + 1 if duration_ns > 1 else 0
+        self.counts[min(index, BUCKET_COUNT - 1)] += 1
+        self.count += 1
+        self.total_ns += duration_ns
+        self.bytes += nbytes
+        self.errors += error
+
+    def state(self):
+        """Return a compact picklable copy (non-empty buckets only)."""
+        return ({index: n for index, n in enumerate(self.counts) if n}, self.count, self.total_ns, self.bytes,
+                self.errors)
+
+    def merge_state(self, state):
+        counts, count, total_ns, nbytes, errors = state
+        for index, n in counts.items():
+            self.counts[index] += n
+        self.count += count
+        self.total_ns += total_ns
+        self.bytes += nbytes
+        self.errors += errors
+
+    def quantile(self, q):
+        """Return the upper bound in nanoseconds of the bucket holding quantile q."""
+        if not self.count:
+            return 0
+        rank = q * self.count
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return 2 ** (index / BUCKETS_PER_OCTAVE)
+        return 2 ** ((BUCKET_COUNT - 1) / BUCKETS_PER_OCTAVE)
+
+
+class Span:
+    """One timed stage; use through span() as a context manager."""
+
+    __slots__ = ('tracer', 'stage', 'path', 'format', 'bytes', 'fields', 'id', 'parent', 'start', 'wall')
+
+    def __init__(self, tracer, stage, path, fmt, nbytes, fields):
+        self.tracer = tracer
+        self.stage = stage
+        if hasattr(path, 'read'):
+            path = None  # A reader was handed an open file (e.g. an archive member) instead of a path
+        self.path = path
+        self.format = format_of(path) if fmt is None else fmt
+        self.bytes = nbytes
+        self.fields = fields
+
+    def add_bytes(self, n):
+        self.bytes += n
+
+    def __enter__(self):
+        stack = self.tracer._stack()
+        self.parent = stack[-1] if stack else None
+        stack.append(self)
+        self.id = next(self.tracer._ids)
+        self.wall = time.time()
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter_ns() - self.start
+        stack = self.tracer._stack()
+        stack.pop()
+        self.tracer._record(self, duration, exc_type, not stack)
+        return False
+
+
+class Tracer:
+    """Collects span histograms and, when a trace path is set, writes JSONL records."""
+
+    def __init__(self, trace_path=None):
+        self.histograms = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self.trace_path = trace_path
+        self.trace_file = open(trace_path, 'a', encoding='utf-8') if trace_path else None
+        self._pending = []
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, stage, path=None, fmt=None, nbytes=0, **fields):
+        """Return a context manager timing one stage of work on path."""
+        return Span(self, stage, path, fmt, nbytes, fields)
+
+    def _record(self, span, duration_ns, exc_type, outermost):
+        key = (span.stage, span.format)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.add(duration_ns, span.bytes, exc_type is not None)
+            if self.trace_file is None:
+                return
+            self._pending.append(self._trace_record(span, duration_ns, exc_type))
+            # Flush whenever a top-level operation ends: pool workers exit without
+            # running atexit handlers, so nothing may be left in a buffer
+            if outermost:
+                self._flush()
+
+    def _trace_record(self, span, duration_ns, exc_type):
+        record = {
+            'ts': round(span.wall, 6),
+            'pid': os.getpid(),
+            'thread': threading.get_ident(),
+            'id': span.id,
+            'parent': span.parent.id if span.parent is not None else None,
+            'stage': span.stage,
+            'format': span.format,
+            'path': span.path,
+            'ms': duration_ns / 1e6,
+            'bytes': span.bytes,
+            'error': exc_type.__name__ if exc_type is not None else None,
+        }
+        if span.fields:
+            record.update(span.fields)
+        return record
+
+    def _flush(self):
+        import json
+        if self._pending:
+            self.trace_file.write(''.join(json.dumps(record, default=str) + '\n' for record in self._pending))
+            self.trace_file.flush()
+            self._pending = []
+
+    def close(self):
+        with self._lock:
+            if self.trace_file is not None:
+                self._flush()
+                self.trace_file.close()
+                self.trace_file = None
+
+    def summary(self):
+        """Return one dict per (stage, format): count, errors, bytes, total seconds and p50/p95/p99 in ms."""
+        with self._lock:
+            items = sorted(self.histograms.items())
+        return summarize_histograms(items)
+
+
+def summarize_histograms(items):
+    rows = []
+    for (stage, fmt), histogram in items:
+        row = {'stage': stage, 'format': fmt, 'count': histogram.count, 'errors': histogram.errors,
+               'bytes': histogram.bytes, 'total_s': histogram.total_ns / 1e9}
+        for q in QUANTILES:
+            row[f"p{int(q * 100)}_ms"] = histogram.quantile(q) / 1e6
+        rows.append(row)
+    return rows
+
+
+def format_prometheus(items, prefix='metadata'):
+    """Render (stage, format) histograms as Prometheus text exposition format."""
+    lines = [f"# HELP {prefix}_stage_duration_seconds Time spent per processing stage.",
+             f"# TYPE {prefix}_stage_duration_seconds summary"]
+    for (stage, fmt), histogram in items:
+        labels = f'stage="{stage}",format="{fmt}"'
+        for q in QUANTILES:
+            lines.append(f'{prefix}_stage_duration_seconds{{{labels},quantile="{q}"}} '
+                         f'{histogram.quantile(q) / 1e9:.9f}')
+        lines.append(f'{prefix}_stage_duration_seconds_sum{{{labels}}} {histogram.total_ns / 1e9:.9f}')
+        lines.append(f'{prefix}_stage_duration_seconds_count{{{labels}}} {histogram.count}')
+    for name, attribute, help_text in (('bytes', 'bytes', 'Bytes processed per stage.'),
+                                       ('errors', 'errors', 'Stages that raised an exception.')):
+        lines.append(f"# HELP {prefix}_stage_{name}_total {help_text}")
+        lines.append(f"# TYPE {prefix}_stage_{name}_total counter")
+        for (stage, fmt), histogram in items:
+            lines.append(f'{prefix}_stage_{name}_total{{stage="{stage}",format="{fmt}"}} '
+                         f'{getattr(histogram, attribute)}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_prometheus(path, items=None):
+    """Write the current process's histograms (or the given items) to path, replacing it atomically."""
+    if items is None:
+        with _tracer._lock:
+            items = sorted(_tracer.histograms.items())
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(format_prometheus(items))
+    os.replace(tmp_path, path)
+
+
+def load_traces(paths):
+    """Rebuild (stage, format) histograms from JSONL trace files; returns sorted items."""
+    import json
+    histograms = {}
+    for path in paths:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = (record['stage'], record['format'])
+                histogram = histograms.get(key)
+                if histogram is None:
+                    histogram = histograms[key] = Histogram()
+                histogram.add(int(record['ms'] * 1e6), record.get('bytes') or 0, record.get('error') is not None)
+    return sorted(histograms.items())
+
+
+_tracer = Tracer(os.environ.get(TRACE_ENV) or None)
+
+
+def _after_fork():
+    # A forked worker starts with no open spans and must not write records buffered by its parent,
+    # nor hand the parent's histograms back to it through drain()
+    _tracer._local = threading.local()
+    _tracer._pending = []
+    _tracer._lock = threading.Lock()
+    _tracer.histograms = {}
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def span(stage, path=None, fmt=None, nbytes=0, **fields):
+    """Time one stage of work on path with the process-wide tracer."""
+    return Span(_tracer, stage, path, fmt, nbytes, fields)
+
+
+def summary():
+    return _tracer.summary()
+
+
+def drain():
+    """Return and reset this process's histogram states, for a worker to hand back to its parent."""
+    with _tracer._lock:
+        histograms, _tracer.histograms = _tracer.histograms, {}
+    return {key: histogram.state() for key, histogram in histograms.items()}
+
+
+def merge(states):
+    """Add histogram states returned by drain() in another process to this process's histograms."""
+    with _tracer._lock:
+        for key, state in states.items():
+            histogram = _tracer.histograms.get(key)
+            if histogram is None:
+                histogram = _tracer.histograms[key] = Histogram()
+            histogram.merge_state(state)
+
+
+def configure(trace_path=None, prometheus_path=None):
+    """Start writing JSONL traces and/or a Prometheus file at exit, for this process and its children."""
+    global _tracer
+    if trace_path is not None:
+        os.environ[TRACE_ENV] = trace_path
+        old, _tracer = _tracer, Tracer(trace_path)
+        _tracer.histograms = old.histograms
+        old.close()
+    if prometheus_path is not None:
+        os.environ[PROMETHEUS_ENV] = prometheus_path
+
+
+@atexit.register
+def _at_exit():
+    _tracer.close()
+    prometheus_path = os.environ.get(PROMETHEUS_ENV)
+    if prometheus_path and _tracer.histograms:
+        write_prometheus(prometheus_path)
+
+
+def format_summary(rows):
+    lines = [f"{'stage':12} {'format':6} {'count':>8} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} "
+             f"{'total s':>9} {'MB':>9} {'errors':>7}"]
+    for row in rows:
+        lines.append(f"{row['stage']:12} {row['format']:6} {row['count']:>8} {row['p50_ms']:>10.3f} "
+                     f"{row['p95_ms']:>10.3f} {row['p99_ms']:>10.3f} {row['total_s']:>9.3f} "
+                     f"{row['bytes'] / 1e6:>9.1f} {row['errors']:>7}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Summarize JSONL timing traces per stage and format.")
+    parser.add_argument('traces', nargs='+', metavar='TRACE.jsonl')
+    parser.add_argument('--prometheus', metavar='OUT.prom', help="also write the summary in Prometheus text format")
+    args = parser.parse_args(argv)
+
+    items = load_traces(args.traces)
+    print(format_summary(summarize_histograms(items)))
+    if args.prometheus:
+        write_prometheus(args.prometheus, items)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
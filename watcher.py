@@ -0,0 +1,389 @@
+"""Watch a directory tree and re-extract metadata only for files that change.
+
+On Linux the tree is watched with inotify (through ctypes, no extra
+package); elsewhere, or when inotify is unavailable or out of watches, the
+tree is polled by comparing (size, mtime_ns) snapshots. Events for a path
+are debounced: a file is only processed once it has been quiet for
+--debounce seconds, so a save that writes in many chunks (or a
+write-temp-then-rename) is handled once.
+
+Each processed file is re-read with scan_file (metadata plus the compliance
+issue checks) and hashed, and a change record is emitted with the fields
+that differ from the last known state. Records are printed as JSON lines
+and can be appended to a log file; with --cache the metadata cache is kept
+current, so a later scan of the tree starts warm.
+
+Usage: python watcher.py ROOT [--include GLOB] [--exclude GLOB] [--debounce S] [--poll S]
+                         [--backend auto|inotify|poll] [--cache DB] [--log CHANGES.jsonl]
+"""
+import argparse
+import datetime
+import json
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from metadata_core import calculate_hash
+from metadata_cache import MetadataCache
+from scanner import iter_files, scan_file, scan_tree, matches_any, SUPPORTED_EXTENSIONS
+import tracing
+
+DEFAULT_DEBOUNCE = 1.0
+DEFAULT_POLL_INTERVAL = 5.0
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+              | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+READ_SIZE = 64 * 1024
+
+# Kinds of event a source reports: a file path changed, everything under a
+# directory path may have changed, or events were lost and the tree must be rescanned
+FILE, TREE, RESCAN = 'file', 'tree', 'rescan'
+
+
+class InotifySource:
+    """Recursive inotify watch on a tree; wait() returns (kind, path) events."""
+
+    def __init__(self, root, exclude=None):
+        import ctypes
+        import ctypes.util
+
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        self.root = root
+        self.exclude = list(exclude or [])
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._libc.inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._ctypes = ctypes
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            self._raise_errno("inotify_init1")
+        self.directories = {}  # watch descriptor -> directory path
+        try:
+            self._watch_tree(root)
+        except OSError:
+            os.close(self.fd)
+            raise
+
+    def _raise_errno(self, call):
+        errno = self._ctypes.get_errno()
+        raise OSError(errno, f"{call}: {os.strerror(errno)}")
+
+    def _excluded(self, path):
+        return bool(self.exclude) and matches_any(self.exclude, os.path.basename(path),
+                                                  os.path.relpath(path, self.root))
+
+    def _watch_tree(self, top):
+        """Watch top and every directory below it (ENOSPC means the watch limit is exhausted)."""
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                if self._ctypes.get_errno() in (2, 20):  # ENOENT, ENOTDIR: gone already
+                    continue
+                self._raise_errno(f"inotify_add_watch({directory})")
+            self.directories[wd] = directory
+            try:
+                with os.scandir(directory) as it:
+                    stack.extend(entry.path for entry in it
+                                 if entry.is_dir(follow_symlinks=False) and not self._excluded(entry.path))
+            except OSError:
+                pass
+
+    def wait(self, timeout):
+        """Block up to timeout seconds (None = forever) and return the events read."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, READ_SIZE)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                events.append((RESCAN, self.root))
+                continue
+            directory = self.directories.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.directories[wd]
+                continue
+            if not name:
+                continue  # event on the watched directory itself; its parent reports it too
+            path = os.path.join(directory, os.fsdecode(name))
+            if self._excluded(path):
+                continue
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(path)
+                events.append((TREE, path))
+            else:
+                events.append((FILE, path))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingSource:
+    """Fallback source: diff (size, mtime_ns) snapshots of the tree every interval seconds."""
+
+    def __init__(self, root, include=None, exclude=None, interval=DEFAULT_POLL_INTERVAL):
+        self.root = root
+        self.include = include
+        self.exclude = exclude
+        self.interval = interval
+        self.snapshot = self._snapshot()
+        self.next_poll = time.monotonic() + interval
+        self._stop = threading.Event()
+
+    def _snapshot(self):
+        return {path: (st.st_size, st.st_mtime_ns) for path, st in iter_files(self.root, self.include, self.exclude)
+                if st is not None}
+
+    def wait(self, timeout):
+        delay = self.next_poll - time.monotonic()
+        if timeout is not None and timeout < delay:
+            self._stop.wait(max(timeout, 0))
+            return []
+        self._stop.wait(max(delay, 0))
+        self.next_poll = time.monotonic() + self.interval
+        snapshot = self._snapshot()
+        changed = [path for path, state in snapshot.items() if self.snapshot.get(path) != state]
+        changed += [path for path in self.snapshot if path not in snapshot]
+        self.snapshot = snapshot
+        return [(FILE, path) for path in changed]
+
+    def close(self):
+        self._stop.set()
+
+
+def open_source(root, include=None, exclude=None, backend='auto', poll_interval=DEFAULT_POLL_INTERVAL):
+    """Return an inotify source where possible (backend 'auto' or 'inotify'), else a polling one."""
+    if backend in ('auto', 'inotify'):
+        try:
+            return InotifySource(root, exclude)
+        except (OSError, AttributeError) as e:
+            if backend == 'inotify':
+                raise
+            print(f"inotify unavailable ({e}); polling every {poll_interval}s", file=sys.stderr)
+    return PollingSource(root, include, exclude, poll_interval)
+
+
+def _diff(old, new):
+    """Return {field: [old, new]} for every metadata field that differs."""
+    old, new = old or {}, new or {}
+    return {key: [old.get(key), new.get(key)] for key in sorted(set(old) | set(new), key=str)
+            if old.get(key) != new.get(key)}
+
+
+class Watcher:
+    """Keep per-file state for a tree and turn filesystem events into change records.
+
+    Each change record is a dict with time, path, event ('added', 'modified'
+    or 'deleted'), changes ({field: [old, new]}), issues, sha256,
+    previous_sha256 and error.
+    """
+
+    def __init__(self, root, include=None, exclude=None, debounce=DEFAULT_DEBOUNCE, backend='auto',
+                 poll_interval=DEFAULT_POLL_INTERVAL, cache=None):
+        self.root = os.path.abspath(root)
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self.debounce = debounce
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.cache = cache
+        self.state = {}  # path -> {'size', 'mtime_ns', 'metadata', 'sha256'}
+        self.pending = {}  # path -> monotonic time after which it is processed
+        self.source = None
+        self._stopped = threading.Event()
+
+    def _wanted(self, path):
+        rel_path = os.path.relpath(path, self.root)
+        name = os.path.basename(path)
+        if self.exclude:
+            # iter_files does not descend into excluded directories, so their files are never wanted
+            parts = rel_path.split(os.sep)
+            for depth in range(1, len(parts) + 1):
+                if matches_any(self.exclude, parts[depth - 1], os.path.join(*parts[:depth])):
+                    return False
+        if self.include:
+            return matches_any(self.include, name, rel_path)
+        return name.lower().endswith(SUPPORTED_EXTENSIONS)
+
+    def baseline(self, workers=None):
+        """Record the current state of the tree (through the cache when given); returns the file count."""
+        for record in scan_tree(self.root, self.include, self.exclude, workers=workers, cache=self.cache):
+            self.state[record['path']] = {
+                'size': record['size'], 'mtime_ns': record['mtime_ns'], 'metadata': record['metadata'],
+                'sha256': self.cache.get_hash(record['path']) if self.cache is not None else None,
+            }
+        return len(self.state)
+
+    def start(self):
+        """Subscribe to the tree; call before baseline() so changes made during it are not missed."""
+        self.source = open_source(self.root, self.include, self.exclude, self.backend, self.poll_interval)
+
+    def stop(self):
+        self._stopped.set()
+        if isinstance(self.source, PollingSource):
+            self.source.close()
+
+    def close(self):
+        self.stop()
+        if self.source is not None:
+            self.source.close()
+
+    def _mark(self, kind, path, now):
+        due = now + self.debounce
+        if kind == RESCAN:
+            paths = set(self.state)
+            paths.update(path for path, _ in iter_files(self.root, self.include, self.exclude))
+        elif kind == TREE:
+            prefix = path + os.sep
+            paths = {known for known in self.state if known.startswith(prefix)}
+            if os.path.isdir(path):
+                paths.update(found for found, _ in iter_files(path, None, self.exclude))
+        else:
+            paths = (path,)
+        for each in paths:
+            if self._wanted(each):
+                self.pending[each] = due
+
+    def process(self, path):
+        """Re-examine one path now; returns a change record or None when nothing changed."""
+        previous = self.state.get(path)
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            if previous is None:
+                return None
+            del self.state[path]
+            if self.cache is not None:
+                self.cache.invalidate(path)
+            return self._record(path, 'deleted', previous, None, {}, None)
+
+        if previous is not None and (previous['size'], previous['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+            return None  # attribute change or event for a write that was already handled
+
+        with tracing.span('watch', path, nbytes=st.st_size):
+            scanned = scan_file(path, st.st_size)
+            sha256 = error = None
+            if scanned['error'] is None:
+                try:
+                    sha256 = calculate_hash(path)
+                except OSError as e:
+                    error = f"{type(e).__name__}: {e}"
+        current = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'metadata': scanned['metadata'], 'sha256': sha256}
+        self.state[path] = current
+        if self.cache is not None and scanned['error'] is None:
+            self.cache.put(path, scanned['metadata'], scanned['issues'], st, sha256)
+            self.cache.commit()
+        return self._record(path, 'added' if previous is None else 'modified', previous, current,
+                            scanned['issues'], scanned['error'] or error)
+
+    def _record(self, path, event, previous, current, issues, error):
+        return {
+            'time': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'path': path,
+            'event': event,
+            'changes': _diff(previous and previous['metadata'], current and current['metadata']),
+            'issues': issues,
+            'sha256': current and current['sha256'],
+            'previous_sha256': previous and previous['sha256'],
+            'error': error,
+        }
+
+    def changes(self):
+        """Yield change records until stop() is called."""
+        if self.source is None:
+            self.start()
+        while not self._stopped.is_set():
+            now = time.monotonic()
+            timeout = max(min(self.pending.values()) - now, 0) if self.pending else None
+            # Wake up periodically so stop() from another thread is noticed
+            timeout = 1.0 if timeout is None else min(timeout, 1.0)
+            for kind, path in self.source.wait(timeout):
+                self._mark(kind, path, time.monotonic())
+
+            now = time.monotonic()
+            due = [path for path, deadline in self.pending.items() if deadline <= now]
+            for path in sorted(due):
+                del self.pending[path]
+                record = self.process(path)
+                if record is not None:
+                    yield record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a directory tree and report metadata changes as JSON lines.")
+    parser.add_argument('root')
+    parser.add_argument('--include', action='append', default=[], metavar='GLOB')
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB')
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE,
+                        help="seconds a file must be quiet before it is processed (default: %(default)s)")
+    parser.add_argument('--backend', choices=('auto', 'inotify', 'poll'), default='auto')
+    parser.add_argument('--poll', type=float, default=DEFAULT_POLL_INTERVAL, metavar='SECONDS',
+                        help="polling interval when inotify is not used (default: %(default)s)")
+    parser.add_argument('--cache', metavar='DB', default=None, help="SQLite metadata cache to keep current")
+    parser.add_argument('--log', metavar='CHANGES.jsonl', default=None, help="also append change records here")
+    args = parser.parse_args(argv)
+
+    cache = MetadataCache(args.cache) if args.cache else None
+    watcher = Watcher(args.root, args.include, args.exclude, args.debounce, args.backend, args.poll, cache)
+    # Subscribe before taking the baseline so nothing changed in between is missed
+    watcher.start()
+    count = watcher.baseline()
+    print(f"Watching {count} files under {watcher.root} ({type(watcher.source).__name__})", file=sys.stderr)
+    log = open(args.log, 'a', encoding='utf-8') if args.log else None
+    try:
+        for record in watcher.changes():
+            line = json.dumps(record, default=str)
+            print(line, flush=True)
+            if log is not None:
+                log.write(line + '\n')
+                log.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        if log is not None:
+            log.close()
+        if cache is not None:
+            cache.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())